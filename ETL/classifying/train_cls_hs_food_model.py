@@ -48,12 +48,10 @@ def keyword_feats(names):
 # DB에서 데이터 호출
 def load_from_db():
     conn_s, cur_s = utils.con_to_maria_service()
-    cur_s.execute("SELECT * FROM HOMESHOPPING_CLASSIFY WHERE CLS_FOOD IS NOT NULL")
-    cols = [desc[0] for desc in cur_s.description]  # 컬럼명 가져오기
-    rows = cur_s.fetchall()
+    df = utils.read_query(conn_s, "SELECT * FROM HOMESHOPPING_CLASSIFY WHERE CLS_FOOD IS NOT NULL")
     cur_s.close()
     conn_s.close()
-    return pd.DataFrame(rows, columns=cols)
+    return df
 # 훈련 정의
 def training_process(args):
     # 1. DB 데이터 로드
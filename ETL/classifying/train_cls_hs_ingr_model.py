@@ -114,15 +114,12 @@ def load_food_from_db():
     """
     conn, cur = utils.con_to_maria_service()
     try:
-        cur.execute("""
+        df = utils.read_query(conn, """
             SELECT PRODUCT_ID, PRODUCT_NAME, CLS_FOOD, CLS_ING
             FROM HOMESHOPPING_CLASSIFY
             WHERE PRODUCT_NAME IS NOT NULL
               AND CLS_FOOD = 1
         """)
-        cols = [d[0] for d in cur.description]
-        rows = cur.fetchall()
-        df = pd.DataFrame(rows, columns=cols)
     finally:
         cur.close()
         conn.close()
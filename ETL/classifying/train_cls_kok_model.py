@@ -110,14 +110,11 @@ def build_calibrated_svm():
 def load_kok_from_db(table: str = "KOK_CLASSIFY") -> pd.DataFrame:
     conn, cur = utils.con_to_maria_service()
     try:
-        cur.execute(f"""
+        df = utils.read_query(conn, f"""
             SELECT PRODUCT_ID, PRODUCT_NAME, CLS_ING
             FROM {table}
             WHERE PRODUCT_NAME IS NOT NULL
         """)
-        cols = [d[0] for d in cur.description]
-        rows = cur.fetchall()
-        df = pd.DataFrame(rows, columns=cols)
     finally:
         cur.close()
         conn.close()
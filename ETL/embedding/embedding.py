@@ -102,21 +102,16 @@ def kok_embed():
     model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
     conn_s, cur_s = utils.con_to_maria_service()
     conn_r, cur_r = utils.con_to_psql('REC_DB')
-    cur_r.execute(f'''
-        SELECT
-            DISTINCT "KOK_PRODUCT_ID"
-        FROM "KOK_VECTOR_TABLE";
-                  ''')
-    id_list = [row[0] for row in cur_r.fetchall()]
-    j = ','.join(map(str,id_list))
-    add_query = f"WHERE KOK_PRODUCT_ID NOT IN ({j})" if j else ""
-    # COOKING_NAME 임베딩 → VECTOR_NAME 컬럼에 저장
-    cur_s.execute(f"""
-                SELECT KOK_PRODUCT_ID, KOK_PRODUCT_NAME
-                FROM FCT_KOK_PRODUCT_INFO
-                {add_query};
-                """)
-    rows = cur_s.fetchall()
+    # 벡터 테이블에 없는 상품만 (임시 테이블 anti-join)
+    with utils.anti_join_filter(conn_s, "f.KOK_PRODUCT_ID", ref_conn=conn_r,
+                                ref_table="KOK_VECTOR_TABLE", ref_col="KOK_PRODUCT_ID") as cond:
+        # COOKING_NAME 임베딩 → VECTOR_NAME 컬럼에 저장
+        cur_s.execute(f"""
+                    SELECT KOK_PRODUCT_ID, KOK_PRODUCT_NAME
+                    FROM FCT_KOK_PRODUCT_INFO f
+                    WHERE {cond};
+                    """)
+        rows = cur_s.fetchall()
     if not rows :
         cur_r.close(); conn_r.close()
         cur_s.close(); conn_s.close()
@@ -139,21 +134,16 @@ def homeshop_embed():
     model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
     conn_s, cur_s = utils.con_to_maria_service()
     conn_r, cur_r = utils.con_to_psql('REC_DB')
-    cur_r.execute(f'''
-        SELECT
-            DISTINCT "PRODUCT_ID"
-        FROM "HOMESHOPPING_VECTOR_TABLE";
-                  ''')
-    id_list = [row[0] for row in cur_r.fetchall()]
-    j = ','.join(map(str,id_list))
-    add_query = f"WHERE PRODUCT_ID NOT IN ({j})" if j else ""
-    # COOKING_NAME 임베딩 → VECTOR_NAME 컬럼에 저장
-    cur_s.execute(f"""
-                SELECT DISTINCT PRODUCT_ID, PRODUCT_NAME
-                FROM FCT_HOMESHOPPING_LIST
-                {add_query};
-                """)
-    rows = cur_s.fetchall()
+    # 벡터 테이블에 없는 상품만 (임시 테이블 anti-join)
+    with utils.anti_join_filter(conn_s, "f.PRODUCT_ID", ref_conn=conn_r,
+                                ref_table="HOMESHOPPING_VECTOR_TABLE", ref_col="PRODUCT_ID") as cond:
+        # COOKING_NAME 임베딩 → VECTOR_NAME 컬럼에 저장
+        cur_s.execute(f"""
+                    SELECT DISTINCT PRODUCT_ID, PRODUCT_NAME
+                    FROM FCT_HOMESHOPPING_LIST f
+                    WHERE {cond};
+                    """)
+        rows = cur_s.fetchall()
     if not rows :
         cur_r.close(); conn_r.close()
         cur_s.close(); conn_s.close()
@@ -176,14 +166,15 @@ def del_hs_vec():
     conn_s, cur_s = utils.con_to_maria_service()
     conn_r, cur_r = utils.con_to_psql('REC_DB')
     cur_s.execute("""
-        SELECT PRODUCT_ID FROM FCT_HOMESHOPPING_LIST;
-                  """)
-    rows = cur_s.fetchall()
-    id_list = [r[0] for r in rows]
-    id_list_text = ','.join(map(str, id_list))
-    cur_r.execute(f"""
-        DELETE FROM "HOMESHOPPING_VECTOR_TABLE" WHERE "PRODUCT_ID" NOT IN ({id_list_text});
+        SELECT DISTINCT PRODUCT_ID FROM FCT_HOMESHOPPING_LIST;
                   """)
+    id_list = [r[0] for r in cur_s.fetchall()]
+    # 편성 목록이 비어 있으면 벡터 전체가 지워지므로 건너뜀
+    if id_list:
+        with utils.anti_join_filter(conn_r, 'v."PRODUCT_ID"', id_list) as cond:
+            cur_r.execute(f"""
+                DELETE FROM "HOMESHOPPING_VECTOR_TABLE" v WHERE {cond};
+                          """)
     cur_s.close()
     conn_s.close()
     cur_r.close()
@@ -0,0 +1,246 @@
+import os
+import atexit
+import threading
+from contextlib import contextmanager
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    # playwright 미설치 환경에서도 크롤러 모듈 import 가능 (풀 사용 시점에 오류)
+    sync_playwright = None
+import ETL.ingestion.crawl_utils as crawl_utils
+
+# 풀 설정 (환경변수로 조정)
+# BROWSER_POOL_PAGES: 프로세스 전체에서 동시에 열려 있을 수 있는 페이지 수 (스레드별 풀 합산, 0이면 제한 없음)
+# BROWSER_POOL_MAX_PAGES: 컨텍스트 하나로 처리할 페이지 수 (넘으면 컨텍스트 교체)
+BROWSER_POOL_PAGES = int(os.environ.get("BROWSER_POOL_PAGES", "4"))
+BROWSER_POOL_MAX_PAGES = int(os.environ.get("BROWSER_POOL_MAX_PAGES", "50"))
+BROWSER_POOL_MAX_RSS_MB = int(os.environ.get("BROWSER_POOL_MAX_RSS_MB", "1500"))
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+def _proc_table() -> tuple:
+    # /proc 기준 ({pid: 부모 pid}, {pid: RSS(KB)}). /proc 없는 환경이면 빈 dict
+    parents, rss = {}, {}
+    try:
+        page_kb = os.sysconf("SC_PAGE_SIZE") / 1024
+        for d in os.listdir("/proc"):
+            if not d.isdigit():
+                continue
+            try:
+                with open(f"/proc/{d}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                with open(f"/proc/{d}/statm") as f:
+                    rss[int(d)] = int(f.read().split()[1]) * page_kb
+                parents[int(d)] = int(fields[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    except Exception:
+        pass
+    return parents, rss
+
+def _child_pids(pid: int) -> set:
+    parents, _ = _proc_table()
+    return {c for c, pp in parents.items() if pp == pid}
+
+def _tree_rss_mb(roots) -> float:
+    """
+    roots 프로세스 + 그 자손 프로세스 RSS 합계(MB). /proc 없는 환경이면 0
+    """
+    parents, rss = _proc_table()
+    total, stack = 0.0, list(roots)
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(c for c, pp in parents.items() if pp == pid)
+    return total / 1024
+
+# Playwright 드라이버 기동 직렬화 (기동 전후 자식 프로세스 비교로 풀의 드라이버 pid를 찾음)
+_driver_lock = threading.Lock()
+
+# 동시에 열린 페이지 수 제한 (스레드별 풀이 공유)
+_page_slots = threading.BoundedSemaphore(BROWSER_POOL_PAGES) if BROWSER_POOL_PAGES > 0 else None
+
+class BrowserPool:
+    """
+    크롤러 공용 Chromium 풀 (Playwright sync API → 생성한 스레드에서만 사용)
+    - 브라우저 1개를 한 번만 띄우고 page()로 페이지를 빌려줌
+      (sync API는 스레드 하나가 한 번에 한 작업만 진행하므로 병렬 수집은 워커 스레드마다 풀 1개로 처리)
+    - 동시에 열린 페이지 수는 BROWSER_POOL_PAGES로 프로세스 전체에서 제한 (워커가 많아도 메모리 상한 유지)
+    - 컨텍스트는 프로필(user_agent, 리소스 차단/허용)별로 재사용, max_pages 페이지마다 새 컨텍스트로 교체
+    - 이 풀의 Playwright 드라이버 + 그 자손(Chromium) RSS가 max_rss_mb를 넘으면 브라우저 재기동 (다른 풀/파이썬 힙은 제외)
+    - 연결이 끊긴 브라우저도 재기동
+    - close() / close_pool() (워커는 finally에서 호출) / 프로세스 종료(atexit) 시 정리
+    """
+    def __init__(self, headless: bool = True, max_pages: int | None = None,
+                 max_rss_mb: int | None = None, name: str = "default"):
+        self.name = name
+        self.headless = headless
+        self.max_pages = max_pages or BROWSER_POOL_MAX_PAGES
+        self.max_rss_mb = max_rss_mb or BROWSER_POOL_MAX_RSS_MB
+        self._owner = threading.get_ident()
+        self._pw_cm = None
+        self._pw = None
+        self._driver_pids = set()
+        self._browser_obj = None
+        self._contexts = {}      # 프로필 -> [context, 사용 페이지 수]
+        self.pages_served = 0
+        self.recycled = 0
+
+    def _ensure_playwright(self):
+        if self._pw is None:
+            if sync_playwright is None:
+                raise RuntimeError("playwright is not installed")
+            with _driver_lock:
+                before = _child_pids(os.getpid())
+                self._pw_cm = sync_playwright()
+                self._pw = self._pw_cm.start()
+                self._driver_pids = _child_pids(os.getpid()) - before
+
+    def _browser(self):
+        self._ensure_playwright()
+        browser = self._browser_obj
+        if browser is None or not browser.is_connected():
+            if browser is not None:
+                print(f"[BROWSER-POOL] {self.name} 브라우저 연결 끊김 → 재기동")
+                self._drop_browser()
+            browser = self._pw.chromium.launch(headless=self.headless)
+            self._browser_obj = browser
+        return browser
+
+    def _drop_browser(self):
+        for ctx, _ in self._contexts.values():
+            try:
+                ctx.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+        browser = self._browser_obj
+        self._browser_obj = None
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception:
+                pass
+
+    def _context(self, profile: tuple):
+        entry = self._contexts.get(profile)
+        if entry is not None and entry[1] >= self.max_pages:
+            try:
+                entry[0].close()
+            except Exception:
+                pass
+            self._contexts.pop(profile)
+            self.recycled += 1
+            entry = None
+        if entry is None:
+            user_agent, block, allow_types = profile
+            ctx = self._browser().new_context(user_agent=user_agent)
+            if block:
+                crawl_utils.block_heavy_resources(ctx, allow_types=allow_types)
+            entry = [ctx, 0]
+            self._contexts[profile] = entry
+        entry[1] += 1
+        return entry[0]
+
+    def _check_memory(self):
+        rss = _tree_rss_mb(self._driver_pids)
+        if rss and rss > self.max_rss_mb:
+            print(f"[BROWSER-POOL] {self.name} RSS {rss:.0f}MB > {self.max_rss_mb}MB → 브라우저 재기동")
+            self._drop_browser()
+            self.recycled += 1
+
+    @contextmanager
+    def page(self, user_agent: str = DEFAULT_USER_AGENT, block: bool = True, allow_types: tuple = ()):
+        """
+        with pool.page(...) as page: ...  블록 종료 시 페이지만 닫고 브라우저/컨텍스트는 재사용
+        - 열린 페이지가 BROWSER_POOL_PAGES개면 다른 스레드의 페이지가 닫힐 때까지 대기
+        """
+        if threading.get_ident() != self._owner:
+            raise RuntimeError("BrowserPool is bound to the thread that created it")
+        if _page_slots is not None:
+            _page_slots.acquire()
+        try:
+            if self.pages_served and self.pages_served % self.max_pages == 0:
+                self._check_memory()
+            profile = (user_agent, block, tuple(allow_types))
+            try:
+                page = self._context(profile).new_page()
+            except Exception:
+                # 브라우저가 죽어 있던 경우 한 번 재기동 후 재시도
+                self._drop_browser()
+                page = self._context(profile).new_page()
+            self.pages_served += 1
+            try:
+                yield page
+            finally:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+        finally:
+            if _page_slots is not None:
+                _page_slots.release()
+
+    def close(self):
+        self._drop_browser()
+        if self._pw_cm is not None:
+            try:
+                self._pw_cm.__exit__(None, None, None)
+            except Exception:
+                pass
+        self._pw_cm = None
+        self._pw = None
+        self._driver_pids = set()
+
+_local = threading.local()
+_live_pools = set()      # 모든 스레드의 살아있는 풀 (프로세스 종료 시 일괄 정리)
+_pools_lock = threading.Lock()
+
+def _thread_pools() -> dict:
+    # 스레드별 풀 보관함 (threading.local → 스레드가 바뀌면 새 dict)
+    pools = getattr(_local, "pools", None)
+    if pools is None:
+        pools = _local.pools = {}
+    return pools
+
+def get_pool(name: str = "default", headless: bool = True, **opts) -> BrowserPool:
+    """
+    현재 스레드 전용 풀 (이름/headless별 1개). 처음 호출 시 생성, 이후 같은 풀 재사용
+    - threading.local에 보관하므로 스레드 id가 재사용돼도 이전 스레드의 풀을 물려받지 않음
+    """
+    pools = _thread_pools()
+    key = (name, headless)
+    pool = pools.get(key)
+    if pool is None:
+        pool = BrowserPool(headless=headless, name=name, **opts)
+        pools[key] = pool
+        with _pools_lock:
+            _live_pools.add(pool)
+    return pool
+
+def close_pool(name: str | None = None):
+    """
+    현재 스레드의 풀 정리 (name 미지정 시 현재 스레드의 모든 풀). 워커 스레드는 작업 끝에 호출
+    """
+    pools = _thread_pools()
+    closing = [pools.pop(k) for k in [k for k in pools if name is None or k[0] == name]]
+    with _pools_lock:
+        _live_pools.difference_update(closing)
+    for pool in closing:
+        pool.close()
+
+def close_all_pools():
+    """
+    모든 스레드의 풀 정리 (프로세스 종료 시 atexit로 호출)
+    - 다른 스레드 소유 풀은 sync API 제약으로 close가 실패할 수 있어 예외는 무시
+      (이 경우 Playwright 드라이버가 프로세스와 함께 종료되며 브라우저도 정리됨)
+    """
+    with _pools_lock:
+        pools = list(_live_pools)
+        _live_pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception:
+            pass
+
+atexit.register(close_all_pools)
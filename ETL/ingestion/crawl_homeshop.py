@@ -6,10 +6,17 @@ import re
 import numpy as np
 import pandas as pd
 import ETL.utils.utils as utils
+import ETL.ingestion.crawl_utils as crawl_utils
+import ETL.ingestion.browser_pool as browser_pool
 from urllib.parse import urlparse, parse_qs
 from bs4 import BeautifulSoup
 from datetime import date, timedelta, datetime, timezone
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+try:
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    # playwright 미설치 환경(파서 테스트/replay)에서도 파싱 함수는 import 가능하게
+    class PlaywrightTimeoutError(Exception):
+        pass
 import os
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
@@ -158,123 +165,175 @@ def create_ods_hs():
 crawl_hns
 crawl_hns_detail
 '''
-# 홈앤쇼핑 편성표 크롤링, 데이터 INSERT TO ODS
-# HOMESHOPPING_ID = 1
-def crawl_hns():
-    def crawl_schedule_page(html):
-        soup = BeautifulSoup(html, "html.parser")
-        items = soup.select("li.item")
-        results = []
-        live_date = soup.select_one('div#scheduleWrap')['date']
+# 홈쇼핑 상세 3종 적재 버퍼 (컬럼 구성은 utils.def_dataframe과 동일, batch_size건마다 적재)
+def homeshop_detail_buffer(writer, batch_size: int = 10) -> utils.RecordBuffer:
+    df_product, df_img, df_detail = utils.def_dataframe()
+    return utils.RecordBuffer(
+        writer,
+        {"ODS_HOMESHOPPING_PRODUCT_INFO": list(df_product.columns),
+         "ODS_HOMESHOPPING_DETAIL_INFO": list(df_detail.columns),
+         "ODS_HOMESHOPPING_IMG_URL": list(df_img.columns)},
+        IGNORE='IGNORE', size=batch_size,
+    )
+
+def add_homeshop_detail(buffer, df_product_info=None, df_img_url=None, df_detail_info=None):
+    buffer.add(ODS_HOMESHOPPING_PRODUCT_INFO=df_product_info,
+               ODS_HOMESHOPPING_DETAIL_INFO=df_detail_info,
+               ODS_HOMESHOPPING_IMG_URL=df_img_url)
+
+# 홈앤쇼핑 편성표 soup => dataframe
+def crawl_schedule_page(soup):
+    items = soup.select("li.item")
+    results = []
+    live_date = soup.select_one('div#scheduleWrap')['date']
+
+    for item in items:
+        dc_rate = None
+        time_range = item.select_one(".live-time span").text.strip()
+        if time_range =='지금방송중':
+            KST = timezone(timedelta(hours=9))
+            st_time = datetime.now(KST).strftime("%H:%M")
+            end_time = datetime.now(KST).strftime("%H:%M")
+
+            on_air_div = soup.select_one("#onAirTime")
+            if on_air_div and on_air_div.has_attr("bdEtimeSecond"):
+                end_time_full = on_air_div["bdEtimeSecond"]
+                end_time = end_time_full.strip().split(" ")[1][:5]
+            time_range = st_time + ' ~ ' + end_time
+        show_title = item.select_one(".live-time p.time").text.strip().replace(time_range, "").strip()
+
+        product_id = item.select_one("a.goods-info")["onclick"].split("'")[1]
+        title = item.select_one(".tit").text.strip()
+        price_block = item.select_one(".price")
+        price_tag = price_block.select_one("strong") if price_block else None
+        rate_block = item.select_one(".rate")
+        rate_tag = rate_block.select_one("span") if rate_block else None
+        if price_tag:
+            price = price_tag.text.strip()
+        else:
+            consult_tag = price_block.select_one("p.counselPrd") if price_block else None
+            price = consult_tag.text.strip() if consult_tag else None  # e.g., "상담 예약 상품"
 
-        for item in items:
+        dc_rate = rate_tag.text.strip() if rate_tag else None
+        if dc_rate is not None and (dc_rate == "" or dc_rate.lower() == "nan" or (isinstance(dc_rate, float) and math.isnan(dc_rate))):
             dc_rate = None
-            time_range = item.select_one(".live-time span").text.strip()
-            if time_range =='지금방송중':
-                KST = timezone(timedelta(hours=9))
-                st_time = datetime.now(KST).strftime("%H:%M")
-                end_time = datetime.now(KST).strftime("%H:%M")
-
-                on_air_div = soup.select_one("#onAirTime")
-                if on_air_div and on_air_div.has_attr("bdEtimeSecond"):
-                    end_time_full = on_air_div["bdEtimeSecond"]
-                    end_time = end_time_full.strip().split(" ")[1][:5]
-                time_range = st_time + ' ~ ' + end_time
-            show_title = item.select_one(".live-time p.time").text.strip().replace(time_range, "").strip()
-
-            product_id = item.select_one("a.goods-info")["onclick"].split("'")[1]
-            title = item.select_one(".tit").text.strip()
-            price_block = item.select_one(".price")
-            price_tag = price_block.select_one("strong") if price_block else None
-            rate_block = item.select_one(".rate")
-            rate_tag = rate_block.select_one("span") if rate_block else None
-            if price_tag:
-                price = price_tag.text.strip()
+        img = item.select_one(".goods-thumb img")["src"]
+        img_url = "https:" + img if img.startswith("//") else img
+
+        results.append({
+            "HOMESHOPPING_ID" : 1,
+            "LIVE_DATE" : live_date,
+            "LIVE_TIME": time_range,
+            "PROMOTION_TYPE": "main",
+            "LIVE_TITLE": show_title,
+            "PRODUCT_ID": product_id,
+            "PRODUCT_NAME": title,
+            "DC_PRICE": price,
+            "DC_RATE": dc_rate if dc_rate else None,
+            "THUMB_IMG_URL": img_url
+        })
+
+        sub_items = item.select(".sub-prd ul li")
+        for sub in sub_items:
+            sub_dc_rate = None
+            sub_product_id = sub.select_one("a")["onclick"].split("'")[1]
+            sub_title = sub.select_one(".tit").text.strip()
+            sub_price_block = sub.select_one(".price")
+            sub_price_tag = sub_price_block.select_one("strong") if sub_price_block else None
+            sub_rate_block = sub.select_one(".rate")
+            sub_rate_tag = sub_rate_block.select_one("span") if sub_rate_block else None
+            if sub_price_tag:
+                sub_price = sub_price_tag.text.strip()
             else:
-                consult_tag = price_block.select_one("p.counselPrd") if price_block else None
-                price = consult_tag.text.strip() if consult_tag else None  # e.g., "상담 예약 상품"
-
-            dc_rate = rate_tag.text.strip() if rate_tag else None
-            if dc_rate is not None and (dc_rate == "" or dc_rate.lower() == "nan" or (isinstance(dc_rate, float) and math.isnan(dc_rate))):
-                dc_rate = None
-            img = item.select_one(".goods-thumb img")["src"]
-            img_url = "https:" + img if img.startswith("//") else img
+                sub_consult_tag = sub_price_block.select_one("p.counselPrd") if sub_price_block else None
+                sub_price = sub_consult_tag.text.strip() if sub_consult_tag else None
+            sub_dc_rate = sub_rate_tag.text.strip() if sub_rate_tag else None
+            if sub_dc_rate is not None and (sub_dc_rate == "" or sub_dc_rate.lower() == "nan" or (isinstance(sub_dc_rate, float) and math.isnan(sub_dc_rate))):
+                sub_dc_rate = None
+            sub_img = sub.select_one("img")["src"]
+            sub_img_url = "https:" + sub_img if sub_img.startswith("//") else sub_img
 
             results.append({
                 "HOMESHOPPING_ID" : 1,
                 "LIVE_DATE" : live_date,
                 "LIVE_TIME": time_range,
-                "PROMOTION_TYPE": "main",
+                "PROMOTION_TYPE": "sub",
                 "LIVE_TITLE": show_title,
-                "PRODUCT_ID": product_id,
-                "PRODUCT_NAME": title,
-                "DC_PRICE": price,
-                "DC_RATE": dc_rate if dc_rate else None,
-                "THUMB_IMG_URL": img_url
+                "PRODUCT_ID": sub_product_id,
+                "PRODUCT_NAME": sub_title,
+                "DC_PRICE": sub_price,
+                "DC_RATE": sub_dc_rate if sub_dc_rate else None,
+                "THUMB_IMG_URL": sub_img_url,
             })
+        time_check_point = time_range[time_range.find('~')+2:].strip() if time_range.find('~') else '지금방송중'
+    return pd.DataFrame(results)
+
+# 페이지 종류별 준비 판단 predicate + 호스트별 적응형 대기 (기존 고정 대기값이 상한, 못 뜨는 경우의 대기는 학습값으로 단축)
+HNS_SCHEDULE_READY_JS = crawl_utils.ready_js(["div#scheduleWrap[date]", "li.item .live-time"])
+HNS_SCHEDULE_READY = crawl_utils.AdaptiveDelay(default_ms=5000)
+HYUNDAI_DETAIL_READY_JS = crawl_utils.ready_js(any_of=["script#__NEXT_DATA__", ".pdpricebox"])
+# lazy 영역은 hmall_missing_parts 항목별 셀렉터 중 빠진 항목만, 하나라도 뜨면 진행
+HYUNDAI_DETAIL_LAZY_SELECTORS = {
+    "detail": ".accordion-panel.product-essential-info",
+    "images": ".speedycat-container img[data-src]",
+}
+HYUNDAI_DETAIL_READY = crawl_utils.AdaptiveDelay(default_ms=5000)
+HYUNDAI_DETAIL_LAZY = crawl_utils.AdaptiveDelay(default_ms=5000)
 
-            sub_items = item.select(".sub-prd ul li")
-            for sub in sub_items:
-                sub_dc_rate = None
-                sub_product_id = sub.select_one("a")["onclick"].split("'")[1]
-                sub_title = sub.select_one(".tit").text.strip()
-                sub_price_block = sub.select_one(".price")
-                sub_price_tag = sub_price_block.select_one("strong") if sub_price_block else None
-                sub_rate_block = sub.select_one(".rate")
-                sub_rate_tag = sub_rate_block.select_one("span") if sub_rate_block else None
-                if sub_price_tag:
-                    sub_price = sub_price_tag.text.strip()
-                else:
-                    sub_consult_tag = sub_price_block.select_one("p.counselPrd") if sub_price_block else None
-                    sub_price = sub_consult_tag.text.strip() if sub_consult_tag else None
-                sub_dc_rate = sub_rate_tag.text.strip() if sub_rate_tag else None
-                if sub_dc_rate is not None and (sub_dc_rate == "" or sub_dc_rate.lower() == "nan" or (isinstance(sub_dc_rate, float) and math.isnan(sub_dc_rate))):
-                    sub_dc_rate = None
-                sub_img = sub.select_one("img")["src"]
-                sub_img_url = "https:" + sub_img if sub_img.startswith("//") else sub_img
-
-                results.append({
-                    "HOMESHOPPING_ID" : 1,
-                    "LIVE_DATE" : live_date,
-                    "LIVE_TIME": time_range,
-                    "PROMOTION_TYPE": "sub",
-                    "LIVE_TITLE": show_title,
-                    "PRODUCT_ID": sub_product_id,
-                    "PRODUCT_NAME": sub_title,
-                    "DC_PRICE": sub_price,
-                    "DC_RATE": sub_dc_rate if sub_dc_rate else None,
-                    "THUMB_IMG_URL": sub_img_url,
-                })
-            time_check_point = time_range[time_range.find('~')+2:].strip() if time_range.find('~') else '지금방송중'
-        return pd.DataFrame(results)
+# 홈앤쇼핑 편성표 크롤링, 데이터 INSERT TO ODS
+# HOMESHOPPING_ID = 1
+def crawl_hns():
     conn, cur = utils.con_to_maria_ods()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-
-        for i in range(11):
-            today = date.today()
-            current = today + timedelta(days=i)
-            formatted = current.strftime('%Y%m%d')
-            print('[HNS]', formatted, "시작")
-            url = f'https://www.hnsmall.com/display/tvschedule-list?categoryCode=60000059&areaCode=8005369&broadDay={formatted}'
+    limiter = crawl_utils.HostRateLimiter()
+    pool = browser_pool.get_pool()
 
-            page = context.new_page()
+    for i in range(11):
+        today = date.today()
+        current = today + timedelta(days=i)
+        formatted = current.strftime('%Y%m%d')
+        print('[HNS]', formatted, "시작")
+        url = f'https://www.hnsmall.com/display/tvschedule-list?categoryCode=60000059&areaCode=8005369&broadDay={formatted}'
+
+        host = crawl_utils.host_of(url)
+        limiter.wait(host)
+        with pool.page() as page:
             page.goto(url, timeout=60000)
-            page.wait_for_timeout(5000)
+            # 편성표가 그려지는 즉시 진행 (편성이 없는 날은 학습된 대기만큼, 최대 기존 고정값 5초)
+            HNS_SCHEDULE_READY.wait_until(page, host, HNS_SCHEDULE_READY_JS)
             html = page.content()
-            page.close()
-
-            df = crawl_schedule_page(html)
-            utils.insert_df_into_db(conn, df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
-            current_schedule = df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
-            utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
-            print('[HNS]', formatted, '종료')
-        browser.close()
+
+        crawl_utils.capture("hns_schedule", formatted, html, url=url)
+        df = crawl_schedule_page(crawl_utils.make_soup(html))
+        utils.insert_df_into_db(conn, df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
+        current_schedule = df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
+        utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
+        print('[HNS]', formatted, '종료')
     cur.close()
     conn.close()
 
+# 홈앤쇼핑 상세 탭/iframe soup => 상세정보 행
+def parse_hns_item_tables(soup: BeautifulSoup, product_id: str) -> list[dict]:
+    rows = []
+    # 클래스 변형 대응: v2 우선, 없으면 대체 테이블들도 허용
+    for tbl in soup.select("table.itemTableRow.v2, table.itemTableRow, table.itemInfoRow"):
+        for tr in tbl.select("tbody tr"):
+            th = tr.find("th")
+            td = tr.find("td")
+            # <th> 없이 <td>만 있는 행 대비(첫 td를 col로 보고, 두번째 td를 값으로)
+            if not th and td:
+                tds = tr.find_all("td")
+                if len(tds) >= 2:
+                    th = tds[0]
+                    td = tds[1]
+            if not th or not td:
+                continue
+            col = utils._clean_text(th.get_text(" ", strip=True))
+            val = utils._clean_text(td.get_text(" ", strip=True))
+            if col or val:
+                rows.append({"PRODUCT_ID": product_id, "DETAIL_COL": col, "DETAIL_VAL": val})
+    return rows
+
 # 수정 홈앤쇼핑 디테일 데이터 크롤링 코드
 def crawl_hns_detail(
     homeshopping_id: int,
@@ -298,6 +357,9 @@ def crawl_hns_detail(
     # 내부 유틸
     # ------------------
     def dump_html(name: str, html: str):
+        # name = "<PRODUCT_ID>_<part>.html" → 캡처 저장소에는 part 단위로 저장
+        pid, _, part = name[:-len(".html")].partition("_")
+        crawl_utils.capture("hns_detail", pid, html, part=part, meta={"homeshopping_id": homeshopping_id})
         if not debug_dump_dir:
             return
         try:
@@ -308,43 +370,16 @@ def crawl_hns_detail(
         except Exception as e:
             print(f"[HNS-DETAIL] [WARN] dump_html fail {name}: {e}")
  
-    def _parse_item_tables_from_soup(soup: BeautifulSoup, product_id: str) -> list[dict]:
-        rows = []
-        # 클래스 변형 대응: v2 우선, 없으면 대체 테이블들도 허용
-        for tbl in soup.select("table.itemTableRow.v2, table.itemTableRow, table.itemInfoRow"):
-            for tr in tbl.select("tbody tr"):
-                th = tr.find("th")
-                td = tr.find("td")
-                # <th> 없이 <td>만 있는 행 대비(첫 td를 col로 보고, 두번째 td를 값으로)
-                if not th and td:
-                    tds = tr.find_all("td")
-                    if len(tds) >= 2:
-                        th = tds[0]
-                        td = tds[1]
-                if not th or not td:
-                    continue
-                col = utils._clean_text(th.get_text(" ", strip=True))
-                val = utils._clean_text(td.get_text(" ", strip=True))
-                if col or val:
-                    rows.append({"PRODUCT_ID": product_id, "DETAIL_COL": col, "DETAIL_VAL": val})
-        return rows
-
-    def _with_page(func):
-        """브라우저/페이지 열고 닫는 보일러플레이트"""
-        def wrapper(url: str):
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=headless)
-                page = browser.new_page()
-                page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-                try:
-                    result = func(page)
-                finally:
-                    browser.close()
-            return result
-        return wrapper
-
-    @_with_page
-    def crawl_product_detail_page(page) -> pd.DataFrame:
+    def _open_tab1(page):
+        try:
+            page.locator('ul.tabList a[href="#tab1Cont"]').first.click(timeout=5_000)
+        except:
+            try:
+                page.locator("ul.tabList li >> nth=0 button, ul.tabList li >> nth=0 a").click(timeout=5_000)
+            except:
+                pass
+
+    def crawl_product_detail_page(page, product_id: str) -> pd.DataFrame:
         detail_rows: list[dict] = []
 
         # 탭 바가 보일 때까지 대기
@@ -354,13 +389,7 @@ def crawl_hns_detail(
             pass
 
         # 탭1 열기
-        try:
-            page.locator('ul.tabList a[href="#tab1Cont"]').first.click(timeout=5_000)
-        except:
-            try:
-                page.locator("ul.tabList li >> nth=0 button, ul.tabList li >> nth=0 a").click(timeout=5_000)
-            except:
-                pass
+        _open_tab1(page)
 
         # iframe 우선
         try:
@@ -376,8 +405,8 @@ def crawl_hns_detail(
                 frame.wait_for_selector("body", timeout=10_000)
                 frame_html = frame.content()
                 dump_html(f"{product_id}_tab1_iframe.html", frame_html)
-                soup_iframe = BeautifulSoup(frame_html, "html.parser")
-                detail_rows += _parse_item_tables_from_soup(soup_iframe, product_id)
+                soup_iframe = crawl_utils.make_soup(frame_html)
+                detail_rows += parse_hns_item_tables(soup_iframe, product_id)
         except:
             pass
 
@@ -387,8 +416,8 @@ def crawl_hns_detail(
                 page.wait_for_selector("#tab1Cont", timeout=10_000)
                 html_tab1 = page.locator("#tab1Cont").inner_html()
                 dump_html(f"{product_id}_tab1.html", html_tab1)
-                soup_tab1 = BeautifulSoup(html_tab1, "html.parser")
-                detail_rows += _parse_item_tables_from_soup(soup_tab1, product_id)
+                soup_tab1 = crawl_utils.make_soup(html_tab1)
+                detail_rows += parse_hns_item_tables(soup_tab1, product_id)
             except:
                 pass
 
@@ -405,8 +434,8 @@ def crawl_hns_detail(
             page.wait_for_selector("#tab2Cont", timeout=10_000)
             html_tab2 = page.locator("#tab2Cont").inner_html()
             dump_html(f"{product_id}_tab2.html", html_tab2)
-            soup_tab2 = BeautifulSoup(html_tab2, "html.parser")
-            detail_rows += _parse_item_tables_from_soup(soup_tab2, product_id)
+            soup_tab2 = crawl_utils.make_soup(html_tab2)
+            detail_rows += parse_hns_item_tables(soup_tab2, product_id)
         except:
             pass
 
@@ -435,172 +464,155 @@ def crawl_hns_detail(
                 out.append(u)
         return out
 
-    def crawl_hns_detail_images(product_id: str, headless: bool = False, max_scroll_steps: int = 8) -> pd.DataFrame:
+    def crawl_hns_detail_images(page, product_id: str, max_scroll_steps: int = 8) -> pd.DataFrame:
         """
         - 탭1(상품설명) iframe 내부에서 이미지 URL을 가능한 모든 방식으로 수집:
         <img src|data-src|data-original|...>, <source srcset>, style="background-image:url(...)"
         - 스크롤 몇 번 내려서 lazy 이미지까지 긁음(속도/부하 고려해 steps 조절)
         """
-        url = f"https://www.hnsmall.com/display/goods.do?goods_code={product_id}"
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=headless)
-            page = browser.new_page()
-            if not isinstance(url, str):
-                raise TypeError(f"url must be str, got {type(url)}")  # 디버깅용
-            page.goto(url, wait_until="domcontentloaded", timeout=60_000)
+        # 탭1 열기(상품설명) - 상세 탭 수집에서 탭2로 넘어갔을 수 있어 다시 열기
+        _open_tab1(page)
 
-            # 탭1 열기(상품설명)
-            try:
-                page.locator('ul.tabList a[href="#tab1Cont"]').first.click(timeout=5_000)
-            except:
-                try:
-                    page.locator("ul.tabList li >> nth=0 button, ul.tabList li >> nth=0 a").click(timeout=5_000)
-                except:
-                    pass
-
-            # iframe 취득(여기서 종종 None이 뜨니 재시도)
+        # iframe 취득(여기서 종종 None이 뜨니 재시도)
+        frame = None
+        try:
+            iframe_el = page.wait_for_selector('iframe#goodsDescribeView', state="attached", timeout=15_000)
+            for _ in range(10):
+                frame = iframe_el.content_frame()
+                if frame:
+                    break
+                time.sleep(0.3)
+        except:
             frame = None
-            try:
-                iframe_el = page.wait_for_selector('iframe#goodsDescribeView', state="attached", timeout=15_000)
-                for _ in range(10):
-                    frame = iframe_el.content_frame()
-                    if frame:
-                        break
-                    time.sleep(0.3)
-            except:
-                frame = None
-
-            # 폴백: 탭 본문에서 직접
-            def _collect_from_html(html: str, base_href: str) -> list[str]:
-                soup = BeautifulSoup(html, "html.parser")
-                urls = []
-
-                # <img>의 여러 lazy 속성 커버
-                for img in soup.select("img"):
-                    cand = [
-                        img.get("src"),
-                        img.get("data-src"),
-                        img.get("data-original"),
-                        img.get("data-lazy"),
-                        img.get("data-echo"),
-                        img.get("data-image"),
-                        img.get("data-img"),
-                    ]
-                    for c in cand:
-                        if c:
-                            urls.append(c)
-
-                # <source srcset> / <img srcset>
-                for el in soup.select("source[srcset], img[srcset]"):
-                    srcset = el.get("srcset") or ""
-                    # "url1 320w, url2 640w ..." -> 가장 오른쪽(보통 가장 큰) pick
-                    parts = [s.strip() for s in srcset.split(",") if s.strip()]
-                    if parts:
-                        last = parts[-1].split()[0]
-                        urls.append(last)
-
-                # CSS background-image
-                for div in soup.select("[style*='background']"):
-                    style = div.get("style") or ""
-                    matches = re.findall(r"url\((.*?)\)", style, flags=re.I)
-                    for m in matches:
-                        m = m.strip(" '\"")
-                        if m:
-                            urls.append(m)
-
-                # 절대화: BeautifulSoup만으로는 base 처리 어려우니 python에서 URL join
-                abs_urls = []
-                from urllib.parse import urljoin
-                for u in urls:
-                    if not u:
-                        continue
-                    if u.startswith("http://") or u.startswith("https://") or u.startswith("data:") or u.startswith("//"):
-                        abs_urls.append(u)
-                    else:
-                        abs_urls.append(urljoin(base_href, u))
-                return _normalize_and_filter_urls(abs_urls)
 
-            collected = []
+        # 폴백: 탭 본문에서 직접
+        def _collect_from_html(html: str, base_href: str) -> list[str]:
+            soup = crawl_utils.make_soup(html)
+            urls = []
+
+            # <img>의 여러 lazy 속성 커버
+            for img in soup.select("img"):
+                cand = [
+                    img.get("src"),
+                    img.get("data-src"),
+                    img.get("data-original"),
+                    img.get("data-lazy"),
+                    img.get("data-echo"),
+                    img.get("data-image"),
+                    img.get("data-img"),
+                ]
+                for c in cand:
+                    if c:
+                        urls.append(c)
+
+            # <source srcset> / <img srcset>
+            for el in soup.select("source[srcset], img[srcset]"):
+                srcset = el.get("srcset") or ""
+                # "url1 320w, url2 640w ..." -> 가장 오른쪽(보통 가장 큰) pick
+                parts = [s.strip() for s in srcset.split(",") if s.strip()]
+                if parts:
+                    last = parts[-1].split()[0]
+                    urls.append(last)
+
+            # CSS background-image
+            for div in soup.select("[style*='background']"):
+                style = div.get("style") or ""
+                matches = re.findall(r"url\((.*?)\)", style, flags=re.I)
+                for m in matches:
+                    m = m.strip(" '\"")
+                    if m:
+                        urls.append(m)
+
+            # 절대화: BeautifulSoup만으로는 base 처리 어려우니 python에서 URL join
+            abs_urls = []
+            from urllib.parse import urljoin
+            for u in urls:
+                if not u:
+                    continue
+                if u.startswith("http://") or u.startswith("https://") or u.startswith("data:") or u.startswith("//"):
+                    abs_urls.append(u)
+                else:
+                    abs_urls.append(urljoin(base_href, u))
+            return _normalize_and_filter_urls(abs_urls)
 
-            if frame:
-                # lazy 이미지가 스크롤 시 주입될 수 있어 몇 번 스크롤
-                try:
-                    frame.wait_for_selector("body", timeout=10_000)
-                    for _ in range(max_scroll_steps):
-                        frame.evaluate("window.scrollBy(0, document.body.scrollHeight/4)")
-                        time.sleep(0.5)
-                except:
-                    pass
-
-                # 프레임 안에서 JS로 직접 수집(성능/정확도↑)
-                try:
-                    js_urls = frame.evaluate(r"""
-                    () => {
-                    const urls = new Set();
-
-                    const push = (u) => { if (u && typeof u === 'string') urls.add(u.trim()); };
-
-                    // imgs
-                    document.querySelectorAll('img').forEach(img => {
-                        ['src','data-src','data-original','data-lazy','data-echo','data-image','data-img']
-                        .forEach(k => push(img.getAttribute(k)));
-                        const srcset = img.getAttribute('srcset');
-                        if (srcset) {
-                        const parts = srcset.split(',').map(s=>s.trim()).filter(Boolean);
-                        if (parts.length) push(parts[parts.length-1].split(/\s+/)[0]);
-                        }
-                    });
+        collected = []
 
-                    // <source srcset>
-                    document.querySelectorAll('source[srcset]').forEach(el => {
-                        const srcset = el.getAttribute('srcset');
-                        if (srcset) {
-                        const parts = srcset.split(',').map(s=>s.trim()).filter(Boolean);
-                        if (parts.length) push(parts[parts.length-1].split(/\s+/)[0]);
-                        }
-                    });
+        if frame:
+            # lazy 이미지가 스크롤 시 주입될 수 있어 몇 번 스크롤
+            try:
+                frame.wait_for_selector("body", timeout=10_000)
+                for _ in range(max_scroll_steps):
+                    frame.evaluate("window.scrollBy(0, document.body.scrollHeight/4)")
+                    time.sleep(0.5)
+            except:
+                pass
 
-                    // background-image
-                    document.querySelectorAll('[style*="background"]').forEach(el => {
-                        const st = el.getAttribute('style') || '';
-                        const m = st.match(/url\\((.*?)\\)/gi);
-                        if (m) {
-                        m.forEach(one => {
-                            const url = one.replace(/^url\\((.*)\\)$/i, '$1').replace(/^["']|["']$/g, '').trim();
-                            if (url) push(url);
-                        });
-                        }
+            # 프레임 안에서 JS로 직접 수집(성능/정확도↑)
+            try:
+                js_urls = frame.evaluate(r"""
+                () => {
+                const urls = new Set();
+
+                const push = (u) => { if (u && typeof u === 'string') urls.add(u.trim()); };
+
+                // imgs
+                document.querySelectorAll('img').forEach(img => {
+                    ['src','data-src','data-original','data-lazy','data-echo','data-image','data-img']
+                    .forEach(k => push(img.getAttribute(k)));
+                    const srcset = img.getAttribute('srcset');
+                    if (srcset) {
+                    const parts = srcset.split(',').map(s=>s.trim()).filter(Boolean);
+                    if (parts.length) push(parts[parts.length-1].split(/\s+/)[0]);
+                    }
+                });
+
+                // <source srcset>
+                document.querySelectorAll('source[srcset]').forEach(el => {
+                    const srcset = el.getAttribute('srcset');
+                    if (srcset) {
+                    const parts = srcset.split(',').map(s=>s.trim()).filter(Boolean);
+                    if (parts.length) push(parts[parts.length-1].split(/\s+/)[0]);
+                    }
+                });
+
+                // background-image
+                document.querySelectorAll('[style*="background"]').forEach(el => {
+                    const st = el.getAttribute('style') || '';
+                    const m = st.match(/url\\((.*?)\\)/gi);
+                    if (m) {
+                    m.forEach(one => {
+                        const url = one.replace(/^url\\((.*)\\)$/i, '$1').replace(/^["']|["']$/g, '').trim();
+                        if (url) push(url);
                     });
-
-                    return Array.from(urls);
                     }
-                    """)
-                    # 절대화 & 정리
-                    base_href = frame.url
-                    collected.extend(_collect_from_html(
-                        "".join([f'<img src="{u}">' for u in js_urls]),  # 간단히 URL만 절대화/정리 재사용
-                        base_href
-                    ))
-                except:
-                    pass
-
-                # 프레임 전체 HTML에서도 보조 수집(혹시 JS 수집에서 빠진 케이스)
-                try:
-                    frame_html = frame.content()
-                    collected.extend(_collect_from_html(frame_html, frame.url))
-                except:
-                    pass
-            else:
-                # 폴백: #tab1Cont 본문에서 수집
-                try:
-                    page.wait_for_selector("#tab1Cont", timeout=10_000)
-                    html_tab1 = page.locator("#tab1Cont").inner_html()
-                    collected.extend(_collect_from_html(html_tab1, page.url))
-                except:
-                    pass
+                });
 
-            browser.close()
+                return Array.from(urls);
+                }
+                """)
+                # 절대화 & 정리
+                base_href = frame.url
+                collected.extend(_collect_from_html(
+                    "".join([f'<img src="{u}">' for u in js_urls]),  # 간단히 URL만 절대화/정리 재사용
+                    base_href
+                ))
+            except:
+                pass
+
+            # 프레임 전체 HTML에서도 보조 수집(혹시 JS 수집에서 빠진 케이스)
+            try:
+                frame_html = frame.content()
+                collected.extend(_collect_from_html(frame_html, frame.url))
+            except:
+                pass
+        else:
+            # 폴백: #tab1Cont 본문에서 수집
+            try:
+                page.wait_for_selector("#tab1Cont", timeout=10_000)
+                html_tab1 = page.locator("#tab1Cont").inner_html()
+                collected.extend(_collect_from_html(html_tab1, page.url))
+            except:
+                pass
 
         urls = _normalize_and_filter_urls(collected)
         if not urls:
@@ -612,8 +624,7 @@ def crawl_hns_detail(
         return df[["PRODUCT_ID", "SORT_ORDER", "IMG_URL"]]
 
 
-    @_with_page
-    def crawl_prices_page(page) -> pd.DataFrame:
+    def crawl_prices_page(page, product_id: str) -> pd.DataFrame:
         # 가격 루트 대기(여러 패턴 허용)
         page.wait_for_selector('.resultPrice .priceTotal, .priceTotal', timeout=20_000)
         data = page.evaluate("""
@@ -669,6 +680,45 @@ def crawl_hns_detail(
         }
         return pd.DataFrame([row], columns=["PRODUCT_ID", "HOMESHOPPING_ID", "SALE_PRICE", "DC_PRICE", "DC_RATE"])
 
+    def crawl_hns_product(product_id: str, max_scroll_steps: int = 8):
+        """
+        - 상품 페이지를 한 번만 열어 가격 → 상세 탭(iframe/탭1/탭2) → 상세 이미지 순으로 수집
+        - 상세 이미지 lazy-load를 따라가야 하므로 이미지는 허용
+        - 단계별 실패는 빈 DataFrame으로 대체 (페이지 진입 실패 시 세 개 모두 빈 값)
+        - (df_product_info, df_img_url, df_detail_info) 반환
+        """
+        url = f"https://www.hnsmall.com/display/goods.do?goods_code={product_id}"
+        df_product_info = pd.DataFrame(columns=["PRODUCT_ID", "HOMESHOPPING_ID", "SALE_PRICE", "DC_PRICE", "DC_RATE"])
+        df_img_url = pd.DataFrame(columns=["PRODUCT_ID", "SORT_ORDER", "IMG_URL"])
+        df_detail_info = pd.DataFrame(columns=["PRODUCT_ID", "DETAIL_COL", "DETAIL_VAL"])
+
+        with browser_pool.get_pool(headless=headless).page(user_agent=None, allow_types=("image",)) as page:
+            try:
+                page.goto(url, timeout=60_000, wait_until="domcontentloaded")
+            except Exception as e:
+                print(f"[HNS-DETAIL] [ERROR][goto] {product_id}: {e!r}")
+                return df_product_info, df_img_url, df_detail_info
+
+            try:
+                # 가격 (탭 클릭 전 상단 가격 박스)
+                df_product_info = crawl_prices_page(page, product_id)
+            except Exception as e:
+                print(f"[HNS-DETAIL] [ERROR][price] {product_id}: {e!r}")
+
+            try:
+                # 상세(탭/iframe)
+                df_detail_info = crawl_product_detail_page(page, product_id)
+            except Exception as e:
+                print(f"[HNS-DETAIL] [ERROR][detail] {product_id}: {e!r}")
+
+            try:
+                # 이미지 (같은 페이지의 탭1 iframe)
+                df_img_url = crawl_hns_detail_images(page, product_id, max_scroll_steps=max_scroll_steps)
+            except Exception as e:
+                print(f"[HNS-DETAIL] [ERROR][img] {product_id}: {e!r}")
+
+        return df_product_info, df_img_url, df_detail_info
+
     # ------------------
     # DB에서 PRODUCT_ID 목록 불러오기
     # ------------------
@@ -685,6 +735,8 @@ def crawl_hns_detail(
     """
     cur.execute(sql)
     id_list = [str(r[0]) for r in cur.fetchall()]
+    cur.close()
+    conn.close()
 
     if not id_list:
         print("[HNS-DETAIL] [INFO] 대상 PRODUCT_ID 없음")
@@ -693,61 +745,23 @@ def crawl_hns_detail(
     # ------------------
     # 수집 루프
     # ------------------
-    df_product, df_img, df_detail = utils.def_dataframe()
     total_cnt = 0
     end_cnt = len(id_list)
-    flush_count = 0
-
-    for product_id in id_list:
-        print('[HNS-DETAIL]',product_id, "수집")
-        url = f"https://www.hnsmall.com/display/goods.do?goods_code={product_id}"
-
-        try:
-            # 상세(탭/iframe)
-            df_detail_info = crawl_product_detail_page(url)
-        except Exception as e:
-            print(f"[HNS-DETAIL] [ERROR][detail] {product_id}: {e!r}")
-            df_detail_info = pd.DataFrame(columns=["PRODUCT_ID", "DETAIL_COL", "DETAIL_VAL"])
-
-        try:
-            # 이미지
-            df_img_url = crawl_hns_detail_images(str(product_id), headless=True, max_scroll_steps=8)
-        except Exception as e:
-            print(f"[HNS-DETAIL] [ERROR][img] {product_id}: {e!r}")
-            df_img_url = pd.DataFrame(columns=["PRODUCT_ID", "SORT_ORDER", "IMG_URL"])
-
-        try:
-            # 가격
-            df_product_info = crawl_prices_page(url)
-        except Exception as e:
-            print(f"[HNS-DETAIL] [ERROR][price] {product_id}: {e!r}")
-            df_product_info = pd.DataFrame(columns=["PRODUCT_ID", "HOMESHOPPING_ID", "SALE_PRICE", "DC_PRICE", "DC_RATE"])
 
-        # 합치기
-        df_product = pd.concat([df_product, df_product_info], ignore_index=True)
-        df_img     = pd.concat([df_img, df_img_url], ignore_index=True)
-        df_detail  = pd.concat([df_detail, df_detail_info], ignore_index=True)
+    # batch_size 단위 적재는 백그라운드 writer가 처리 (브라우저는 다음 상품으로 바로 진행)
+    with utils.AsyncDBWriter() as writer, homeshop_detail_buffer(writer, batch_size) as buffer:
+        for product_id in id_list:
+            print('[HNS-DETAIL]',product_id, "수집")
 
-        flush_count += 1
-        total_cnt   += 1
+            # 상품당 페이지 1회 진입으로 가격/상세/이미지 수집 (탭별 캡처는 같은 fetch_id)
+            with crawl_utils.capture_fetch():
+                df_product_info, df_img_url, df_detail_info = crawl_hns_product(product_id, max_scroll_steps=8)
 
-        # 배치 적재
-        if flush_count >= batch_size or total_cnt == end_cnt:
-            df_product = utils.sanitize_for_db(df_product)
-            df_detail  = utils.sanitize_for_db(df_detail)
-            df_img     = utils.sanitize_for_db(df_img)
-
-            utils.insert_df_into_db(conn, df_product, "ODS_HOMESHOPPING_PRODUCT_INFO", 'IGNORE')
-            utils.insert_df_into_db(conn, df_detail,  "ODS_HOMESHOPPING_DETAIL_INFO",  'IGNORE')
-            utils.insert_df_into_db(conn, df_img,     "ODS_HOMESHOPPING_IMG_URL",      'IGNORE')
-
-            print('[HNS] Dump to DB...', f'total : {total_cnt} / {end_cnt}')
-
-            # 초기화
-            df_product, df_img, df_detail = utils.def_dataframe()
-            flush_count = 0
-    cur.close()
-    conn.close()
+            # 배치 적재 (블록 종료 시 남은 묶음 적재)
+            add_homeshop_detail(buffer, df_product_info, df_img_url, df_detail_info)
+            total_cnt += 1
+            if buffer.flushed == total_cnt:
+                print('[HNS] Dump to DB...', f'total : {total_cnt} / {end_cnt}')
     print('[HNS] Complete', f'total : {total_cnt} / {end_cnt}')
 
 '''
@@ -755,269 +769,414 @@ def crawl_hns_detail(
 crawl_hyundai
 crawl_hyundai_detail
 '''
+# 편성표 API 응답 => ODS_HOMESHOPPING_LIST 프레임 (현대/NS 공용 컬럼 순서)
+SCHEDULE_COLUMNS = ["HOMESHOPPING_ID", "LIVE_DATE", "LIVE_TIME", "PROMOTION_TYPE", "LIVE_TITLE", "PRODUCT_ID",
+                    "PRODUCT_NAME", "SALE_PRICE", "DC_PRICE", "DC_RATE", "THUMB_IMG_URL"]
+
+def _schedule_field(df: pd.DataFrame, col: str, default=None) -> pd.Series:
+    # json_normalize 결과에 없는 키는 default로 채운 컬럼
+    if col in df.columns:
+        return df[col].astype(object).where(df[col].notna(), default)
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _schedule_str(df: pd.DataFrame, col: str, default: str = "") -> pd.Series:
+    # str(i.get(col, default))와 같은 문자열 컬럼 (결측으로 float이 된 정수 컬럼은 정수로 되돌린 뒤 변환)
+    s = df[col] if col in df.columns else pd.Series(dtype=object, index=df.index)
+    if s.dtype.kind == "f" and (s.dropna() % 1 == 0).all():
+        s = s.astype("Int64")
+    return s.astype(object).where(s.notna(), default).map(str)
+
+def _ordered_schedule(mains: pd.DataFrame, subs: pd.DataFrame, parent) -> pd.DataFrame:
+    # 메인 상품 바로 뒤에 그 서브 상품이 오도록 (기존 행 순서 유지) 정렬해 합침
+    mains = mains.assign(_PARENT=np.arange(len(mains)), _SUB=-1)
+    subs = subs.assign(_PARENT=parent, _SUB=np.arange(len(subs)))
+    out = pd.concat([mains, subs], ignore_index=True) if len(subs) else mains
+    out = out.sort_values(["_PARENT", "_SUB"], kind="stable").reset_index(drop=True)
+    return out[SCHEDULE_COLUMNS]
+
+def _hmall_img_url(product_id: pd.Series, img_name: pd.Series, fmt: str) -> pd.Series:
+    # 상품코드 자릿수로 만든 이미지 경로 + 원본 파일 확장자
+    img_type = img_name.map(str).str.split(".", n=1).str[-1]
+    return pd.Series([fmt.format(p=p, product_id=p, img_type=t) for p, t in zip(product_id, img_type)],
+                     index=product_id.index, dtype=object)
+
+def build_hyundai_schedule_df(items: list, h_index: int) -> pd.DataFrame:
+    """
+    현대홈쇼핑 tv-list 응답의 broadItemList(+withItemList) => ODS_HOMESHOPPING_LIST 프레임
+    - json_normalize로 메인/서브를 한 번에 펼치고 컬럼 단위로 계산
+    """
+    items = items or []
+    if not items:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    main = pd.json_normalize(items)
+    sub_lists = [i.get("withItemList") or [] for i in items]
+    sub = pd.json_normalize([j for js in sub_lists for j in js])
+    parent = np.repeat(np.arange(len(items)), [len(js) for js in sub_lists])
+
+    main_id = _schedule_str(main, "slitmCd", "0")
+    # newBrodDt가 없거나 비어 있으면 brodDt (키가 응답 전체에 없어도 ""로 채워 폴백)
+    new_dt = _schedule_field(main, "newBrodDt", "")
+    mains = pd.DataFrame({
+        "HOMESHOPPING_ID": h_index,
+        "LIVE_DATE": new_dt.where(new_dt.notna() & new_dt.astype(bool), _schedule_field(main, "brodDt", "")),
+        "LIVE_TIME": _schedule_str(main, "brodStrtDtm") + "~" + _schedule_str(main, "brodEndDtm"),
+        "PROMOTION_TYPE": "main",
+        "LIVE_TITLE": _schedule_field(main, "prmoTxtCntn", ""),
+        "PRODUCT_ID": main_id,
+        "PRODUCT_NAME": _schedule_field(main, "slitmNm", ""),
+        "SALE_PRICE": _schedule_str(main, "sellPrc"),
+        "DC_PRICE": _schedule_str(main, "bbprc"),
+        "DC_RATE": _schedule_str(main, "copnRate"),
+        "THUMB_IMG_URL": _hmall_img_url(main_id, _schedule_field(main, "brodImgNm", ""),
+            "https://image.hmall.com/static/{p[7]}/{p[6]}/{p[4]}{p[5]}/{p[2]}{p[3]}/onair{product_id}.{img_type}?AR=0&SF=webp"),
+    })
+    if len(sub):
+        sub_id = _schedule_str(sub, "slitmCd", "0")
+        subs = pd.DataFrame({
+            "HOMESHOPPING_ID": h_index,
+            "LIVE_DATE": _schedule_field(sub, "brodDt", ""),
+            "LIVE_TIME": _schedule_str(sub, "brodStrtDtm") + " ~ " + _schedule_str(sub, "brodEndDtm"),
+            "PROMOTION_TYPE": "sub",
+            "LIVE_TITLE": _schedule_field(sub, "prmoTxtCntn", ""),
+            "PRODUCT_ID": sub_id,
+            "PRODUCT_NAME": _schedule_field(sub, "slitmNm", ""),
+            "SALE_PRICE": _schedule_str(sub, "sellPrc"),
+            "DC_PRICE": _schedule_str(sub, "bbprc"),
+            "DC_RATE": _schedule_str(sub, "copnRate"),
+            "THUMB_IMG_URL": _hmall_img_url(sub_id, _schedule_field(sub, "thumImgNm", ""),
+                "https://image.hmall.com/static/{p[7]}/{p[6]}/{p[4]}{p[5]}/{p[2]}{p[3]}/{product_id}_0.{img_type}?RS=125x125&AR=0&SF=webp"),
+        })
+    else:
+        subs = pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    return _ordered_schedule(mains, subs, parent)
+
+def build_ns_schedule_df(organ: list, price_data: list, h_index: int) -> pd.DataFrame:
+    """
+    NS홈쇼핑 schedule 응답의 totalOrgan(+relTotalOrgan) + brdctPriceInfo => ODS_HOMESHOPPING_LIST 프레임
+    - 가격은 goodsCd 기준 첫 행만 남긴 뒤 한 번의 merge로 붙임 (기존: 상품마다 price_df 전체 필터 3회)
+    """
+    organ = organ or []
+    if not organ:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    main = pd.json_normalize(organ)
+    sub_lists = [t.get("relTotalOrgan") or [] for t in organ]
+    sub = pd.json_normalize([j for js in sub_lists for j in js])
+    parent = np.repeat(np.arange(len(organ)), [len(js) for js in sub_lists])
+
+    prices = (pd.DataFrame(price_data or []).reindex(columns=["goodsCd", "salePrice", "dcPrice", "dcRate"])
+                .drop_duplicates("goodsCd", keep="first"))
+    for col in ["salePrice", "dcPrice", "dcRate"]:
+        prices[col] = np.trunc(pd.to_numeric(prices[col], errors="coerce")).astype("Int64")
+
+    def _rows(df: pd.DataFrame, promotion_type: str, img_url) -> pd.DataFrame:
+        start = pd.to_datetime(_schedule_field(df, "goods.brdctInfo.formStartDttm", ""), format="%Y-%m-%d %H:%M:%S", errors="coerce")
+        end = pd.to_datetime(_schedule_field(df, "goods.brdctInfo.formEndDttm", ""), format="%Y-%m-%d %H:%M:%S", errors="coerce")
+        out = pd.DataFrame({
+            "HOMESHOPPING_ID": h_index,
+            "LIVE_DATE": start.dt.strftime("%Y%m%d").fillna(""),
+            "LIVE_TIME": start.dt.strftime("%H:%M").fillna("") + " ~ " + end.dt.strftime("%H:%M").fillna(""),
+            "PROMOTION_TYPE": promotion_type,
+            "LIVE_TITLE": _schedule_field(df, "pgmNm"),
+            "PRODUCT_ID": _schedule_field(df, "goodsCd", ""),
+            "PRODUCT_NAME": _schedule_field(df, "goods.productNm", ""),
+            "THUMB_IMG_URL": img_url,
+        })
+        out = out.merge(prices, how="left", left_on="PRODUCT_ID", right_on="goodsCd")
+        return out.rename(columns={"salePrice": "SALE_PRICE", "dcPrice": "DC_PRICE", "dcRate": "DC_RATE"})
+
+    main_id = _schedule_field(main, "goodsCd", "")
+    mains = _rows(main, "main", "https://product-image.prod-nsmall.com/new/" + main_id.map(str) + "_X6.jpg")
+    if len(sub):
+        subs = _rows(sub, "sub", _schedule_field(sub, "imageUrl", ""))
+    else:
+        subs = pd.DataFrame(columns=SCHEDULE_COLUMNS)
+    return _ordered_schedule(mains, subs, parent)
+
 # 현대홈쇼핑 편성표 크롤링, 데이터 INSERT TO ODS
 # HOMESHOPPING_ID = 2, 3
 def crawl_hyundai():
     conn, cur = utils.con_to_maria_ods()
     brodType = ['etv','dtv']
+    page = 200
+    today = date.today()
 
+    # (방송 유형, 날짜)별 편성표 API를 한 번에 동시 호출, 적재는 기존 순서대로
+    jobs = []
     for k in brodType:
         if k == 'etv':
             h_index = 2
         else:
             h_index = 3
-        today = date.today()
         for days in range(11):
-            page = 200
             current = today + timedelta(days=days)
             cr_date = current.strftime('%Y%m%d')
-            print('[HYUNDAI]', cr_date, "시작")
             url = f'https://wwwca.hmall.com/api/hf/dp/v1/main-tv-new/tv-list?brodDt={cr_date}&brodPrrgPage={page}&brodType={k}&deviceInfo=pc'
-            response = requests.get(url)
-            data = response.json()
-
-            result = []
-            # 메인상품
-            for i in data['respData']['broadItemList']:
-                if i.get('newBrodDt') :
-                    live_date = i.get('newBrodDt', '')
-                else:
-                    live_date = i.get('brodDt', '')
-                live_time = i.get('brodStrtDtm', '') + '~' + i.get('brodEndDtm', '')
-                product_id = str(i.get('slitmCd', '0'))
-                product_name = i.get('slitmNm', '')
-                sale_price = str(i.get('sellPrc', ''))
-                dc_price = str(i.get('bbprc', ''))
-                dc_rate = str(i.get('copnRate', ''))
-                p = list(product_id)
-                img_name = i.get('brodImgNm', '')
-                img_type = img_name[img_name.find('.')+1:]
-                img_url = f"https://image.hmall.com/static/{p[7]}/{p[6]}/{p[4]+p[5]}/{p[2]+p[3]}/onair{product_id}.{img_type}?AR=0&SF=webp"
-                live_title = i.get('prmoTxtCntn', '')
-                result.append({
-                        "HOMESHOPPING_ID" : h_index,
-                        "LIVE_DATE" : live_date,
-                        "LIVE_TIME": live_time,
-                        "PROMOTION_TYPE": "main",
-                        "LIVE_TITLE": live_title,
-                        "PRODUCT_ID": product_id,
-                        "PRODUCT_NAME": product_name,
-                        "SALE_PRICE": sale_price,
-                        "DC_PRICE" : dc_price,
-                        "DC_RATE": dc_rate,
-                        "THUMB_IMG_URL": img_url
-                    })
-                # 서브상품
-                if 'withItemList' in i:
-                    for j in i['withItemList']:
-                        live_date = j.get('brodDt', '')
-                        live_time = j.get('brodStrtDtm', '') + ' ~ ' + j.get('brodEndDtm', '')
-                        product_id = str(j.get('slitmCd', '0'))
-                        product_name = j.get('slitmNm', '')
-                        sale_price = str(j.get('sellPrc', ''))
-                        dc_price = str(j.get('bbprc', ''))
-                        dc_rate = str(j.get('copnRate', ''))
-                        p = list(product_id)
-                        img_name = j.get('thumImgNm', '')
-                        img_type = img_name[img_name.find('.')+1:]
-                        img_url = f"https://image.hmall.com/static/{p[7]}/{p[6]}/{p[4]+p[5]}/{p[2]+p[3]}/{product_id}_0.{img_type}?RS=125x125&AR=0&SF=webp"
-                        live_title = j.get('prmoTxtCntn', '')
-                        result.append({
-                                "HOMESHOPPING_ID" : h_index,
-                                "LIVE_DATE" : live_date,
-                                "LIVE_TIME": live_time,
-                                "PROMOTION_TYPE": "sub",
-                                "LIVE_TITLE": live_title,
-                                "PRODUCT_ID": product_id,
-                                "PRODUCT_NAME": product_name,
-                                "SALE_PRICE": sale_price,
-                                "DC_PRICE" : dc_price,
-                                "DC_RATE": dc_rate,
-                                "THUMB_IMG_URL": img_url
-                                })
-                        result_df = pd.DataFrame(result)
-            time.sleep(random.uniform(1, 1.5))
-            utils.insert_df_into_db(conn, result_df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
-            current_schedule = result_df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
-            utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
-            print('[HYUNDAI]', cr_date, "종료")
+            jobs.append((k, h_index, cr_date, url))
+    payloads = crawl_utils.fetch_concurrent([url for *_, url in jobs])
+
+    for (k, h_index, cr_date, url), payload in zip(jobs, payloads):
+        print('[HYUNDAI]', cr_date, "시작")
+        if payload is None:
+            print('[HYUNDAI] [ERROR]', k, cr_date, '편성표 응답 없음 → 건너뜀')
+            continue
+        crawl_utils.capture("hyundai_schedule", f"{k}_{cr_date}_{page}", payload, kind="json", url=url,
+                            meta={"homeshopping_id": h_index})
+        data = json.loads(payload)
+        result_df = build_hyundai_schedule_df(data['respData']['broadItemList'], h_index)
+        utils.insert_df_into_db(conn, result_df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
+        current_schedule = result_df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
+        utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
+        print('[HYUNDAI]', cr_date, "종료")
     cur.close()
     conn.close()
-# 상세 정보 크롤링
-def crawl_hyundai_detail(homeshopping_id):
-    def _get_soup_by_playwright(url: str, wait_ms: int = 5000) -> BeautifulSoup:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            ctx = browser.new_context(
-                user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                            "AppleWebKit/537.36 (KHTML, like Gecko) "
-                            "Chrome/124.0.0.0 Safari/537.36")
-            )
-            page = ctx.new_page()
-            page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-            page.wait_for_timeout(wait_ms)
-            try:
-                page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
-            except Exception as e:
-                print('[HYUNDAI-DETAIL]', e)
-            page.wait_for_timeout(5000)
-            html = page.content()
-            ctx.close()
-            browser.close()
-        return BeautifulSoup(html, "html.parser")
-
-    def _get_product_id_from_url(url: str) -> str | None:
-        # fallback: slitmCd=2238... 쿼리에서 뽑기
-        qs = parse_qs(urlparse(url).query)
-        arr = qs.get('slitmCd')
-        return arr[0] if arr else None
-
-    # html => dataframe
-    def parse_hmall_product(url: str, homeshopping_id) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        soup = _get_soup_by_playwright(url)
-
-        # 1) __NEXT_DATA__ 기반 JSON 파싱 시도
-        product_id = None
-        seller_name = None
-        product_name = None
-        origin_price = None
-        discount_rate = None
-        sale_price = None
-        img_rows = []
-        detail_rows = []
-
-        next_script = soup.select_one('script#__NEXT_DATA__')
-        if next_script and next_script.string:
-            try:
-                data = json.loads(next_script.string)
-                pp = (data.get("props") or {}).get("pageProps") or {}
-                resp = (pp.get("respData") or {})
-                item = (resp.get("itemPtc") or {})
-
-                product_id = item.get("slitmCd") or _get_product_id_from_url(url)
-                product_name = item.get("slitmNm")
-                seller_name = item.get("brndNm")
-                origin_price = item.get("bbprc")   # 정상가
-                sale_price = item.get("sellPrc")   # 할인가
-                if origin_price and sale_price and origin_price > 0:
-                    discount_rate = int(round((sale_price - origin_price) * 100.0 / origin_price))
-
-                # 상세 정보가 JSON에도 있을 수 있으나, 여기서는 DOM fallback로 처리
-            except Exception as e:
-                print(f"[HYUNDAI-DETAIL] [WARN] JSON parsing error: {e}")
 
-        # 2) DOM 기반 파싱 (JSON 값이 None이거나 비어있을 때만 덮어씀)
-        # 상품코드
-        if not product_id:
-            for tr in soup.select("tr"):
-                th = tr.find("th")
-                td = tr.find("td")
-                if th and td and utils._clean_text(th.get_text()) == "상품코드":
-                    em = td.find("em")
-                    product_id = utils._clean_text(em.get_text() if em else td.get_text())
-                    break
-            if not product_id:
-                product_id = _get_product_id_from_url(url)
-
-        # 판매자명
-        if not seller_name:
-            a_brand = soup.select_one(".brandshop-link a.link")
-            if a_brand:
-                seller_name = utils._clean_text(a_brand.get("ga-custom-creative")) or utils._clean_text(a_brand.get_text())
+def _get_product_id_from_url(url: str) -> str | None:
+    # fallback: slitmCd=2238... 쿼리에서 뽑기
+    qs = parse_qs(urlparse(url).query)
+    arr = qs.get('slitmCd')
+    return arr[0] if arr else None
+
+# 현대홈쇼핑 상세 soup => dataframe
+def parse_hmall_product(soup, url: str, homeshopping_id) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # 1) __NEXT_DATA__ 기반 JSON 파싱 시도
+    product_id = None
+    seller_name = None
+    product_name = None
+    origin_price = None
+    discount_rate = None
+    sale_price = None
+    img_rows = []
+    detail_rows = []
+
+    next_script = soup.select_one('script#__NEXT_DATA__')
+    if next_script and next_script.string:
+        try:
+            data = json.loads(next_script.string)
+            pp = (data.get("props") or {}).get("pageProps") or {}
+            resp = (pp.get("respData") or {})
+            item = (resp.get("itemPtc") or {})
+
+            product_id = item.get("slitmCd") or _get_product_id_from_url(url)
+            product_name = item.get("slitmNm")
+            seller_name = item.get("brndNm")
+            origin_price = item.get("bbprc")   # 정상가
+            sale_price = item.get("sellPrc")   # 할인가
+            if origin_price and sale_price and origin_price > 0:
+                discount_rate = int(round((sale_price - origin_price) * 100.0 / origin_price))
+
+            # 상세 정보가 JSON에도 있을 수 있으나, 여기서는 DOM fallback로 처리
+        except Exception as e:
+            print(f"[HYUNDAI-DETAIL] [WARN] JSON parsing error: {e}")
 
-        # 상품명
-        if not product_name:
-            og = soup.select_one('meta[property="og:title"]')
-            product_name = utils._clean_text(og.get("content")) if og else None
-            if not product_name:
-                pdname = soup.select_one("div.pdname")
-                product_name = utils._clean_text(pdname.get_text()) if pdname else None
-
-        # 가격
-        if not sale_price or not origin_price:
-            em_before = soup.select_one(".pdpricebox .sale-before em")
-            em_rate   = soup.select_one(".pdpricebox .sale-rate em")
-            em_sale   = soup.select_one(".pdpricebox .sale-price em")
-            if em_sale:
-                sale_price = sale_price or utils._num_only(em_sale.get_text())
-            if em_before:
-                origin_price = origin_price or utils._num_only(em_before.get_text())
-            else:
-                origin_price = origin_price or sale_price
-            if em_rate:
-                discount_rate = discount_rate or utils._num_only(em_rate.get_text())
-
-        # 배송/반품 등 기본 정보
-        basic_map = {
-            "상품코드": None,
-            "가격": None,
-            "배송비": None,
-            "택배사": None,
-            "반품/교환": None,
-            "소비기한": None,
-        }
+    # 2) DOM 기반 파싱 (JSON 값이 None이거나 비어있을 때만 덮어씀)
+    # 상품코드
+    if not product_id:
         for tr in soup.select("tr"):
             th = tr.find("th")
             td = tr.find("td")
-            if not th or not td:
-                continue
-            key = utils._clean_text(th.get_text())
-            if key not in basic_map:
-                continue
-            if key == "반품/교환":
-                spans = [ utils._clean_text(s.get_text()) for s in td.select("span") if utils._clean_text(s.get_text()) ]
-                val = ", ".join(spans) if spans else utils._clean_text(td.get_text())
-            elif key == "가격":
-                em = td.find("em")
-                val = utils._clean_text(em.get_text()) if em else utils._clean_text(td.get_text())
-                val = re.sub(r'\s*원$', '', val) if val else val
-            else:
+            if th and td and utils._clean_text(th.get_text()) == "상품코드":
                 em = td.find("em")
-                val = utils._clean_text(em.get_text()) if em else utils._clean_text(td.get_text())
-            basic_map[key] = val
-
-        # 이미지 (DOM 기반 추가 이미지)
-        order = 1
-        for img in soup.select(".speedycat-container img"):
-            ds = img.get("data-src")
-            if not ds:
+                product_id = utils._clean_text(em.get_text() if em else td.get_text())
+                break
+        if not product_id:
+            product_id = _get_product_id_from_url(url)
+
+    # 판매자명
+    if not seller_name:
+        a_brand = soup.select_one(".brandshop-link a.link")
+        if a_brand:
+            seller_name = utils._clean_text(a_brand.get("ga-custom-creative")) or utils._clean_text(a_brand.get_text())
+
+    # 상품명
+    if not product_name:
+        og = soup.select_one('meta[property="og:title"]')
+        product_name = utils._clean_text(og.get("content")) if og else None
+        if not product_name:
+            pdname = soup.select_one("div.pdname")
+            product_name = utils._clean_text(pdname.get_text()) if pdname else None
+
+    # 가격
+    if not sale_price or not origin_price:
+        em_before = soup.select_one(".pdpricebox .sale-before em")
+        em_rate   = soup.select_one(".pdpricebox .sale-rate em")
+        em_sale   = soup.select_one(".pdpricebox .sale-price em")
+        if em_sale:
+            sale_price = sale_price or utils._num_only(em_sale.get_text())
+        if em_before:
+            origin_price = origin_price or utils._num_only(em_before.get_text())
+        else:
+            origin_price = origin_price or sale_price
+        if em_rate:
+            discount_rate = discount_rate or utils._num_only(em_rate.get_text())
+
+    # 배송/반품 등 기본 정보
+    basic_map = {
+        "상품코드": None,
+        "가격": None,
+        "배송비": None,
+        "택배사": None,
+        "반품/교환": None,
+        "소비기한": None,
+    }
+    for tr in soup.select("tr"):
+        th = tr.find("th")
+        td = tr.find("td")
+        if not th or not td:
+            continue
+        key = utils._clean_text(th.get_text())
+        if key not in basic_map:
+            continue
+        if key == "반품/교환":
+            spans = [ utils._clean_text(s.get_text()) for s in td.select("span") if utils._clean_text(s.get_text()) ]
+            val = ", ".join(spans) if spans else utils._clean_text(td.get_text())
+        elif key == "가격":
+            em = td.find("em")
+            val = utils._clean_text(em.get_text()) if em else utils._clean_text(td.get_text())
+            val = re.sub(r'\s*원$', '', val) if val else val
+        else:
+            em = td.find("em")
+            val = utils._clean_text(em.get_text()) if em else utils._clean_text(td.get_text())
+        basic_map[key] = val
+
+    # 이미지 (DOM 기반 추가 이미지)
+    order = 1
+    for img in soup.select(".speedycat-container img"):
+        ds = img.get("data-src")
+        if not ds:
+            continue
+        u = utils._https(ds.strip())
+        if u:
+            img_rows.append({"PRODUCT_ID": product_id, "SORT_ORDER": order, "IMG_URL": u})
+            order += 1
+
+    # 상세 정보 (DOM)
+    panel = soup.select_one(".accordion-panel.product-essential-info")
+    if panel:
+        for h4 in panel.select("h4.subheadings"):
+            col = utils._clean_text(h4.get_text())
+            p = h4.find_next_sibling("p", class_="abstract2")
+            if not p:
                 continue
-            u = utils._https(ds.strip())
-            if u:
-                img_rows.append({"PRODUCT_ID": product_id, "SORT_ORDER": order, "IMG_URL": u})
-                order += 1
-
-        # 상세 정보 (DOM)
-        panel = soup.select_one(".accordion-panel.product-essential-info")
-        if panel:
-            for h4 in panel.select("h4.subheadings"):
-                col = utils._clean_text(h4.get_text())
-                p = h4.find_next_sibling("p", class_="abstract2")
-                if not p:
-                    continue
-                val = p.get_text("\n").strip()
-                detail_rows.append({"PRODUCT_ID": product_id, "DETAIL_COL": col, "DETAIL_VAL": val})
-
-        # 최종 DF 생성
-        df_product_info = pd.DataFrame([{
-            "PRODUCT_ID": product_id,
-            "HOMESHOPPING_ID": homeshopping_id,
-            "STORE_NAME": seller_name,
-            "PRODUCT_NAME": product_name,
-            "SALE_PRICE": sale_price,
-            "DC_RATE": discount_rate,
-            "DC_PRICE": origin_price,
-            "DELIVERY_FEE": basic_map["배송비"],
-            "DELIVERY_CO": basic_map["택배사"],
-            "RETURN_EXCHANGE": basic_map["반품/교환"],
-            "TERM": basic_map["소비기한"]
-        }])
-
-        df_img_url = pd.DataFrame(img_rows)
-        df_detail_info = pd.DataFrame(detail_rows)
+            val = p.get_text("\n").strip()
+            detail_rows.append({"PRODUCT_ID": product_id, "DETAIL_COL": col, "DETAIL_VAL": val})
+
+    # 최종 DF 생성
+    df_product_info = pd.DataFrame([{
+        "PRODUCT_ID": product_id,
+        "HOMESHOPPING_ID": homeshopping_id,
+        "STORE_NAME": seller_name,
+        "PRODUCT_NAME": product_name,
+        "SALE_PRICE": sale_price,
+        "DC_RATE": discount_rate,
+        "DC_PRICE": origin_price,
+        "DELIVERY_FEE": basic_map["배송비"],
+        "DELIVERY_CO": basic_map["택배사"],
+        "RETURN_EXCHANGE": basic_map["반품/교환"],
+        "TERM": basic_map["소비기한"]
+    }])
+
+    df_img_url = pd.DataFrame(img_rows)
+    df_detail_info = pd.DataFrame(detail_rows)
+
+    return df_product_info, df_img_url, df_detail_info
+
+# 현대홈쇼핑 상세는 HTTP(__NEXT_DATA__ 포함 SSR HTML) 우선, 빠진 항목이 있을 때만 브라우저 렌더링 (0이면 항상 브라우저)
+HYUNDAI_DETAIL_HTTP = os.environ.get("HYUNDAI_DETAIL_HTTP", "1") != "0"
+HYUNDAI_DETAIL_REQUIRED = ("PRODUCT_NAME", "SALE_PRICE", "DELIVERY_FEE")
+
+def fetch_hmall_http(sess, url: str):
+    # __NEXT_DATA__가 들어 있는 200 응답 본문 또는 None (네트워크 오류/비정상 응답)
+    try:
+        res = sess.get(url, timeout=crawl_utils.CRAWL_HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"[HYUNDAI-DETAIL] HTTP 요청 실패 → 브라우저 폴백: {e}")
+        return None
+    if res.status_code != 200:
+        print(f"[HYUNDAI-DETAIL] HTTP {res.status_code} → 브라우저 폴백")
+        return None
+    if not res.encoding or res.encoding.lower() == "iso-8859-1":
+        res.encoding = "utf-8"
+    if "__NEXT_DATA__" not in res.text:
+        return None
+    return res.text
+
+def hmall_missing_parts(df_product_info, df_img_url, df_detail_info) -> set:
+    """
+    parse_hmall_product 결과에서 비어 있는 항목
+    - "product": 필수 컬럼(HYUNDAI_DETAIL_REQUIRED) 중 값 없음
+    - "images": speedycat 이미지 없음 (lazy 영역)
+    - "detail": 필수표기정보 아코디언 없음 (lazy 영역)
+    """
+    missing = set()
+    if df_product_info.empty or df_product_info.iloc[0][list(HYUNDAI_DETAIL_REQUIRED)].isna().any():
+        missing.add("product")
+    if df_img_url.empty:
+        missing.add("images")
+    if df_detail_info.empty:
+        missing.add("detail")
+    return missing
 
+# 상세 정보 크롤링
+def crawl_hyundai_detail(homeshopping_id):
+    """
+    - 상품별로 HTTP 응답을 먼저 파싱하고, 빠진 항목(hmall_missing_parts)만 브라우저 렌더링 결과로 채움
+    - 상품정보는 브라우저 결과를 우선하되 비어 있는 값은 HTTP 결과로 보충
+    """
+    limiter = crawl_utils.HostRateLimiter()
+    stats = {"http": 0, "browser": 0}
+
+    def _get_html_by_http(sess, url: str):
+        limiter.wait(crawl_utils.host_of(url))
+        html = fetch_hmall_http(sess, url)
+        if html:
+            crawl_utils.capture("hyundai_detail", _get_product_id_from_url(url), html, part="http", url=url,
+                                meta={"homeshopping_id": homeshopping_id})
+        return html
+
+    def _fetch_product(sess, url: str):
+        http_result = None
+        missing = set(HYUNDAI_DETAIL_LAZY_SELECTORS)
+        if HYUNDAI_DETAIL_HTTP:
+            html = _get_html_by_http(sess, url)
+            if html:
+                http_result = parse_hmall_product(crawl_utils.make_soup(html), url, homeshopping_id)
+                missing = hmall_missing_parts(*http_result)
+                if not missing:
+                    stats["http"] += 1
+                    return http_result
+                print('[HYUNDAI-DETAIL] 브라우저 보완:', ", ".join(sorted(missing)))
+
+        stats["browser"] += 1
+        browser_result = parse_hmall_product(_get_soup_by_playwright(url, missing), url, homeshopping_id)
+        if http_result is None:
+            return browser_result
+
+        (h_info, h_img, h_detail), (b_info, b_img, b_detail) = http_result, browser_result
+        df_product_info = b_info.combine_first(h_info)[h_info.columns]
+        df_img_url = b_img if h_img.empty else h_img
+        df_detail_info = b_detail if h_detail.empty else h_detail
         return df_product_info, df_img_url, df_detail_info
 
+    def _get_soup_by_playwright(url: str, missing: set) -> BeautifulSoup:
+        # missing: 보완할 항목 → lazy 대기는 그 항목의 셀렉터 중 하나라도 뜨면 종료
+        lazy = [HYUNDAI_DETAIL_LAZY_SELECTORS[part] for part in sorted(missing) if part in HYUNDAI_DETAIL_LAZY_SELECTORS]
+        host = crawl_utils.host_of(url)
+        limiter.wait(host)
+        with browser_pool.get_pool().page(user_agent=crawl_utils.CRAWL_USER_AGENT) as page:
+            page.goto(url, timeout=60_000, wait_until="domcontentloaded")
+            # 고정 5초+5초 대신: 본문 준비 → 스크롤 → 빠진 lazy 영역(상세정보/이미지) 준비되는 즉시 진행
+            HYUNDAI_DETAIL_READY.wait_until(page, host, HYUNDAI_DETAIL_READY_JS)
+            try:
+                page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+            except Exception as e:
+                print('[HYUNDAI-DETAIL]', e)
+            if lazy:
+                HYUNDAI_DETAIL_LAZY.wait_until(page, host, crawl_utils.ready_js(any_of=lazy))
+            html = page.content()
+        crawl_utils.capture("hyundai_detail", _get_product_id_from_url(url), html, part="browser", url=url,
+                            meta={"homeshopping_id": homeshopping_id})
+        return crawl_utils.make_soup(html)
+
     # DB접속
     conn, cur = utils.con_to_maria_ods()
     # PRODUCT_ID 리스트 DB에서 호출
@@ -1029,33 +1188,22 @@ def crawl_hyundai_detail(homeshopping_id):
                 AND PRODUCT_ID NOT IN (SELECT PRODUCT_ID FROM ODS_HOMESHOPPING_PRODUCT_INFO);
                 """)
     id_list = [row[0] for row in cur.fetchall()]
-    # 초기 empty_dataframe 생성
-    df_product, df_img, df_detail = utils.def_dataframe()
-    # dump => db insert 기준
-    count = 0
-    total_cnt = 0
-    for i in id_list:
-        print('[HYUNDAI-DETAIL]', i, '수집')
-        url = f"https://www.hmall.com/md/pda/itemPtc?slitmCd={i}"
-        # 크롤링 / 빈 데이터 프레임에 concat
-        df_product_info, df_img_url, df_detail_info = parse_hmall_product(url, homeshopping_id)
-        df_product = pd.concat([df_product, df_product_info], ignore_index=True)
-        df_img = pd.concat([df_img, df_img_url], ignore_index=True)
-        df_detail = pd.concat([df_detail, df_detail_info], ignore_index=True)
-        count += 1
-        total_cnt += 1
-        if count == 10 or total_cnt == len(id_list):
-            # 10개 product 정보 데이터 insert 실행
-            utils.insert_df_into_db(conn, df_product, "ODS_HOMESHOPPING_PRODUCT_INFO", 'IGNORE')
-            utils.insert_df_into_db(conn, df_detail, "ODS_HOMESHOPPING_DETAIL_INFO", 'IGNORE')
-            utils.insert_df_into_db(conn, df_img, "ODS_HOMESHOPPING_IMG_URL", 'IGNORE')
-            print('[HYUNDAI-DETAIL] Dump to DB...', f'total : {total_cnt}')
-            # dump count 초기화, dataframe 초기화
-            df_product, df_img, df_detail = utils.def_dataframe()
-            count = 0
     cur.close()
     conn.close()
-    print('[HYUNDAI-DETAIL] complete', f'total : {total_cnt}')
+    total_cnt = 0
+    # 10개 단위 적재는 백그라운드 writer가 처리 (브라우저는 다음 상품으로 바로 진행)
+    with crawl_utils.http_session() as sess, utils.AsyncDBWriter() as writer, homeshop_detail_buffer(writer) as buffer:
+        for i in id_list:
+            print('[HYUNDAI-DETAIL]', i, '수집')
+            url = f"https://www.hmall.com/md/pda/itemPtc?slitmCd={i}"
+            # 크롤링 / 버퍼에 추가 (10개마다 적재), HTTP/브라우저 캡처는 같은 fetch_id
+            with crawl_utils.capture_fetch():
+                result = _fetch_product(sess, url)
+            add_homeshop_detail(buffer, *result)
+            total_cnt += 1
+            if buffer.flushed == total_cnt:
+                print('[HYUNDAI-DETAIL] Dump to DB...', f'total : {total_cnt}')
+    print('[HYUNDAI-DETAIL] complete', f'total : {total_cnt}', f'(HTTP {stats["http"]} / 브라우저 {stats["browser"]})')
 
 '''
 NS홈쇼핑 크롤링 함수
@@ -1067,106 +1215,155 @@ crawl_ns_detail
 def crawl_ns():
     conn, cur = utils.con_to_maria_ods()
     brodType = {'tv':'TV','shopplus':'CTCOM'}
+    today = date.today()
 
+    # (방송 유형, 날짜)별 편성표/가격 API를 한 번에 동시 호출, 적재는 기존 순서대로
+    jobs = []
     for k in brodType:
         if k == 'tv':
             h_index = 4
         else:
             h_index = 5
-        today = date.today()
         for i in range(11):
             current = today + timedelta(days=i)
             cr_date = current.strftime('%Y%m%d')
-            print("[NS]", cr_date, "시작")
             url = f'https://mapi.nsmall.com/md/api/v1/display/media/schedule/{k}/{cr_date}?formDate={cr_date}&cnnlCd={brodType[k]}'
             price_url = f'https://mapi.nsmall.com/md/api/v1/display/media/schedule/brdctPriceInfo?formDate={cr_date}&CnnlCd={k}'
-            response1 = requests.get(url)
-            time.sleep(random.uniform(1, 1.5))
-            response2 = requests.get(price_url)
-            data = response1.json()['data']['resultData']['totalOrgan']
-            price_data = response2.json()['data']['resultData']
-            price_df = pd.DataFrame(price_data)
-            # print(price_df[['goodsCd','salePrice','dcPrice','dcRate']])
-            result = []
-            # 메인상품
-            for t in data:
-                goods = t.get('goods', '')
-                brodcst = goods.get('brdctInfo', '')
-                raw = brodcst.get('formStartDttm', '')
-                live_date = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").strftime("%Y%m%d") if raw else ""
-                live_time = utils.datetime_to_time(brodcst.get('formStartDttm', '')) + ' ~ ' + utils.datetime_to_time(brodcst.get('formEndDttm', ''))
-                product_id = t.get('goodsCd', '')
-                product_name = t.get('goods','').get('productNm','')
-
-                sp = price_df.loc[price_df['goodsCd'] == product_id, 'salePrice']
-                sale_price = int(sp.values[0]) if not sp.empty else None
-
-                dp = price_df.loc[price_df['goodsCd'] == product_id, 'dcPrice']
-                dc_price = int(dp.values[0]) if not dp.empty else None
-
-                dr = price_df.loc[price_df['goodsCd'] == product_id, 'dcRate']
-                dc_rate = int(dr.values[0]) if not dr.empty else None
-                if dc_rate == 'nan':
-                    dc_rate = None
-                img_url = f"https://product-image.prod-nsmall.com/new/{product_id}_X6.jpg"
-                live_title = t.get('pgmNm')
-                result.append({
-                        "HOMESHOPPING_ID" : h_index,
-                        "LIVE_DATE" : live_date,
-                        "LIVE_TIME": live_time,
-                        "PROMOTION_TYPE": "main",
-                        "LIVE_TITLE": live_title,
-                        "PRODUCT_ID": product_id,
-                        "PRODUCT_NAME": product_name,
-                        "SALE_PRICE": sale_price,
-                        "DC_PRICE": dc_price,
-                        "DC_RATE": dc_rate,
-                        "THUMB_IMG_URL": img_url
-                    })
-                # 서브상품
-                if len(t['relTotalOrgan']) > 0:
-                    for j in t['relTotalOrgan']:
-                        goods = j.get('goods', '')
-                        brodcst = goods.get('brdctInfo', '')
-                        raw = brodcst.get('formStartDttm', '')
-                        live_date = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").strftime("%Y%m%d") if raw else ""
-                        live_time = utils.datetime_to_time(brodcst.get('formStartDttm', '')) + ' ~ ' + utils.datetime_to_time(brodcst.get('formEndDttm', ''))
-                        product_id = j.get('goodsCd', '')
-                        product_name = j.get('goods','').get('productNm','')
-
-                        sp = price_df.loc[price_df['goodsCd'] == product_id, 'salePrice']
-                        sale_price = int(sp.values[0]) if not sp.empty else None
-
-                        dp = price_df.loc[price_df['goodsCd'] == product_id, 'dcPrice']
-                        dc_price = int(dp.values[0]) if not dp.empty else None
-
-                        dr = price_df.loc[price_df['goodsCd'] == product_id, 'dcRate']
-                        dc_rate = int(dr.values[0]) if not dr.empty else None
-                        if dc_rate == 'nan':
-                            dc_rate = None
-                        img_url = j.get('imageUrl', '')
-                        live_title = j.get('pgmNm')
-                        result.append({
-                                "HOMESHOPPING_ID" : h_index,
-                                "LIVE_DATE" : live_date,
-                                "LIVE_TIME": live_time,
-                                "PROMOTION_TYPE": "sub",
-                                "LIVE_TITLE": live_title,
-                                "PRODUCT_ID": product_id,
-                                "PRODUCT_NAME": product_name,
-                                "SALE_PRICE": sale_price,
-                                "DC_PRICE": dc_price,
-                                "DC_RATE": dc_rate,
-                                "THUMB_IMG_URL": img_url
-                                })
-                        result_df = pd.DataFrame(result)
-            utils.insert_df_into_db(conn, result_df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
-            current_schedule = result_df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
-            utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
-            print('[NS]', cr_date, "종료")
-            time.sleep(random.uniform(1, 1.5))
+            jobs.append((k, h_index, cr_date, url, price_url))
+    payloads = crawl_utils.fetch_concurrent([u for job in jobs for u in job[3:]])
+
+    for n, (k, h_index, cr_date, url, price_url) in enumerate(jobs):
+        print("[NS]", cr_date, "시작")
+        payload, price_payload = payloads[2 * n], payloads[2 * n + 1]
+        if payload is None or price_payload is None:
+            print('[NS] [ERROR]', k, cr_date, '편성표/가격 응답 없음 → 건너뜀')
+            continue
+        fetch_id = crawl_utils.new_fetch_id()
+        crawl_utils.capture("ns_schedule", f"{k}_{cr_date}", payload, part="schedule", kind="json", url=url,
+                            meta={"homeshopping_id": h_index}, fetch_id=fetch_id)
+        crawl_utils.capture("ns_schedule", f"{k}_{cr_date}", price_payload, part="price", kind="json", url=price_url,
+                            meta={"homeshopping_id": h_index}, fetch_id=fetch_id)
+        data = json.loads(payload)['data']['resultData']['totalOrgan']
+        price_data = json.loads(price_payload)['data']['resultData']
+        result_df = build_ns_schedule_df(data, price_data, h_index)
+        utils.insert_df_into_db(conn, result_df, 'ODS_HOMESHOPPING_LIST', 'IGNORE')
+        current_schedule = result_df[['HOMESHOPPING_ID','LIVE_DATE','LIVE_TIME','PRODUCT_ID']]
+        utils.insert_df_into_db(conn, current_schedule, 'ODS_HOMESHOPPING_CURRENT_SCHEDULE')
+        print('[NS]', cr_date, "종료")
     cur.close()
     conn.close()
+
+# NS홈쇼핑 상세 soup => dataframe
+def ns_detail_crawl(soup, product_id):
+    detail_rows = []
+    info_header = soup.find("h3", class_="title", string=lambda s: s and "상품 필수 정보" in s)
+    if info_header:
+        table = info_header.find_next("table")
+        if table:
+            for tr in table.find_all("tr"):
+                th = tr.find("th")
+                td = tr.find("td")
+                if not th or not td:
+                    continue
+                col = th.get_text(strip=True)
+                val = td.get_text(strip=True)
+                detail_rows.append({
+                    "PRODUCT_ID": product_id,
+                    "DETAIL_COL": col,
+                    "DETAIL_VAL": val
+                })
+
+    return pd.DataFrame(detail_rows)
+
+def ns_img_crawl(soup, product_id):
+    # 상품설명 영역의 첫 번째 이미지 src 추출
+    img_tag = soup.select_one(".goods-detail-img-wrap img")
+    img_url = img_tag.get("src") if img_tag else None
+    row = {
+        "PRODUCT_ID" : product_id,
+        "SORT_ORDER" : 1,
+        "IMG_URL" : img_url
+    }
+
+    return pd.DataFrame([row], columns=["PRODUCT_ID", "SORT_ORDER", "IMG_URL"])
+
+def ns_info_crawl(soup, homeshopping_id) -> pd.DataFrame:
+    """
+    ns_html.txt 같은 HTML 문자열에서
+    [PRODUCT_ID, STORE_NAME, PRODUCT_NAME, SALE_PRICE, DC_RATE, DC_PRICE] 1행 DataFrame 반환
+    """
+    def _meta_recobell(soup, prop):
+        tag = soup.find("meta", {"name": "recobell", "property": prop})
+        return tag.get("content") if tag and tag.get("content") is not None else None
+
+    # 1) meta recobell 우선
+    product_id   = _meta_recobell(soup, "eg:itemId")
+    product_name = _meta_recobell(soup, "eg:itemName")
+    store_name   = _meta_recobell(soup, "eg:brandName")
+    sale_price   = utils._num_only(_meta_recobell(soup, "eg:originalPrice"))  # 정상가
+    dc_price     = utils._num_only(_meta_recobell(soup, "eg:salePrice"))      # 할인가
+    dc_rate      = None
+
+    # 2) 가격 DOM 파싱 (미할인/할인 케이스 모두 처리)
+    price_box = soup.select_one(".price-wrap")
+    if price_box:
+        # 할인 케이스
+        dc_price_dom = price_box.select_one(".dc-price")
+        origin_dom   = price_box.select_one(".origin-price")
+        rate_dom     = price_box.select_one(".dc-rate")
+
+        # 미할인 케이스
+        current_dom  = price_box.select_one(".current-price")
+
+        if dc_price_dom:  # 할인 있음
+            dc_price = utils._num_only(dc_price_dom.get_text()) or dc_price
+            sale_price = utils._num_only(origin_dom.get_text() if origin_dom else None) or sale_price
+            if rate_dom:
+                dc_rate = utils._num_only(rate_dom.get_text())
+        elif current_dom:  # 할인 없음
+            p = utils._num_only(current_dom.get_text())
+            if p is not None:
+                sale_price = sale_price or p
+                dc_price = dc_price or p
+                dc_rate = 0
+
+    # 3) 할인율 계산 보정 (meta/DOM 어느 쪽이든 값이 있을 때)
+    if dc_rate is None and sale_price and dc_price is not None:
+        try:
+            if sale_price > 0 and dc_price <= sale_price:
+                dc_rate = int(round((sale_price - dc_price) * 100.0 / sale_price))
+        except Exception:
+            dc_rate = None
+
+    # 4) 이름/브랜드 DOM fallback
+    if not product_name:
+        # h1이나 대표 타이틀 계열
+        for sel in ["h1", ".goods-title", ".goods-name", ".prd-name", ".product-title", ".tit", ".title"]:
+            el = soup.select_one(sel)
+            if el and utils._clean_text(el.get_text()):
+                product_name = utils._clean_text(el.get_text())
+                break
+        # 마지막으로 og:title 시도
+        if not product_name:
+            og = soup.find("meta", property="og:title")
+            if og and og.get("content"):
+                product_name = utils._clean_text(og.get("content"))
+
+    # brand/store fallback은 사이트 구조마다 다르니 meta 없으면 빈 값으로 둠
+    # product_id도 meta가 최선. 필요시 다른 경로에서 파싱 추가 가능.
+
+    row = {
+        "PRODUCT_ID": product_id,
+        "HOMESHOPPING_ID": homeshopping_id,
+        "STORE_NAME": store_name,
+        "PRODUCT_NAME": product_name,
+        "SALE_PRICE": sale_price,
+        "DC_RATE": dc_rate,
+        "DC_PRICE": dc_price,
+    }
+
+    return pd.DataFrame([row], columns=list(row.keys()))
+
 # 상세 정보 크롤링
 def crawl_ns_detail(homeshopping_id):
     def get_ns_html_to_soup(url, goto_timeout=45_000, click_timeout=10_000):
@@ -1180,9 +1377,8 @@ def crawl_ns_detail(homeshopping_id):
         ]
         html_results = {}
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+        # 버튼1 대기 조건이 이미지 naturalWidth를 보므로 이미지는 허용
+        with browser_pool.get_pool().page(user_agent=None, allow_types=("image",)) as page:
 
             # 1. 접속 시 HTML 가져오기
             for attempt in range(2):
@@ -1194,7 +1390,6 @@ def crawl_ns_detail(homeshopping_id):
                         print(f"[NS-DETAIL] [WARN] goto timeout, retry once... url={url}")
                         continue
                     print(f"[NS-DETAIL] [SKIP] goto timeout after retry: {url} ({e})")
-                    browser.close()
                     return None, None, None
             time.sleep(random.uniform(1, 1.5))
             html_results["initial"] = page.content()
@@ -1265,121 +1460,14 @@ def crawl_ns_detail(homeshopping_id):
                     print(f"[NS-DETAIL] [ERROR] 버튼 {idx} 클릭 실패: {e}")
                     html_results[f"button_{idx}"] = None
 
-            browser.close()
-
+        fetch_id = crawl_utils.new_fetch_id()
+        for part, html in html_results.items():
+            crawl_utils.capture("ns_detail", url.rsplit("/", 1)[-1], html, part=part, url=url,
+                                meta={"homeshopping_id": homeshopping_id}, fetch_id=fetch_id)
         # BeautifulSoup로 파싱해서 반환
-        parsed_results = {k: BeautifulSoup(v, "html.parser") if v else None for k, v in html_results.items()}
+        parsed_results = {k: crawl_utils.make_soup(v) if v else None for k, v in html_results.items()}
         return parsed_results['initial'], parsed_results['button_1'], parsed_results['button_2']
 
-    def ns_detail_crawl(soup, product_id):
-        detail_rows = []
-        info_header = soup.find("h3", class_="title", string=lambda s: s and "상품 필수 정보" in s)
-        if info_header:
-            table = info_header.find_next("table")
-            if table:
-                for tr in table.find_all("tr"):
-                    th = tr.find("th")
-                    td = tr.find("td")
-                    if not th or not td:
-                        continue
-                    col = th.get_text(strip=True)
-                    val = td.get_text(strip=True)
-                    detail_rows.append({
-                        "PRODUCT_ID": product_id,
-                        "DETAIL_COL": col,
-                        "DETAIL_VAL": val
-                    })
-
-        return pd.DataFrame(detail_rows)
-
-    def ns_img_crawl(soup, product_id):
-        # 상품설명 영역의 첫 번째 이미지 src 추출
-        img_tag = soup.select_one(".goods-detail-img-wrap img")
-        img_url = img_tag.get("src") if img_tag else None
-        row = {
-            "PRODUCT_ID" : product_id,
-            "SORT_ORDER" : 1,
-            "IMG_URL" : img_url
-        }
-
-        return pd.DataFrame([row], columns=["PRODUCT_ID", "SORT_ORDER", "IMG_URL"])
-
-    def ns_info_crawl(soup, homeshopping_id) -> pd.DataFrame:
-        """
-        ns_html.txt 같은 HTML 문자열에서
-        [PRODUCT_ID, STORE_NAME, PRODUCT_NAME, SALE_PRICE, DC_RATE, DC_PRICE] 1행 DataFrame 반환
-        """
-        def _meta_recobell(soup, prop):
-            tag = soup.find("meta", {"name": "recobell", "property": prop})
-            return tag.get("content") if tag and tag.get("content") is not None else None
-        
-        # 1) meta recobell 우선
-        product_id   = _meta_recobell(soup, "eg:itemId")
-        product_name = _meta_recobell(soup, "eg:itemName")
-        store_name   = _meta_recobell(soup, "eg:brandName")
-        sale_price   = utils._num_only(_meta_recobell(soup, "eg:originalPrice"))  # 정상가
-        dc_price     = utils._num_only(_meta_recobell(soup, "eg:salePrice"))      # 할인가
-        dc_rate      = None
-
-        # 2) 가격 DOM 파싱 (미할인/할인 케이스 모두 처리)
-        price_box = soup.select_one(".price-wrap")
-        if price_box:
-            # 할인 케이스
-            dc_price_dom = price_box.select_one(".dc-price")
-            origin_dom   = price_box.select_one(".origin-price")
-            rate_dom     = price_box.select_one(".dc-rate")
-
-            # 미할인 케이스
-            current_dom  = price_box.select_one(".current-price")
-
-            if dc_price_dom:  # 할인 있음
-                dc_price = utils._num_only(dc_price_dom.get_text()) or dc_price
-                sale_price = utils._num_only(origin_dom.get_text() if origin_dom else None) or sale_price
-                if rate_dom:
-                    dc_rate = utils._num_only(rate_dom.get_text())
-            elif current_dom:  # 할인 없음
-                p = utils._num_only(current_dom.get_text())
-                if p is not None:
-                    sale_price = sale_price or p
-                    dc_price = dc_price or p
-                    dc_rate = 0
-
-        # 3) 할인율 계산 보정 (meta/DOM 어느 쪽이든 값이 있을 때)
-        if dc_rate is None and sale_price and dc_price is not None:
-            try:
-                if sale_price > 0 and dc_price <= sale_price:
-                    dc_rate = int(round((sale_price - dc_price) * 100.0 / sale_price))
-            except Exception:
-                dc_rate = None
-
-        # 4) 이름/브랜드 DOM fallback
-        if not product_name:
-            # h1이나 대표 타이틀 계열
-            for sel in ["h1", ".goods-title", ".goods-name", ".prd-name", ".product-title", ".tit", ".title"]:
-                el = soup.select_one(sel)
-                if el and utils._clean_text(el.get_text()):
-                    product_name = utils._clean_text(el.get_text())
-                    break
-            # 마지막으로 og:title 시도
-            if not product_name:
-                og = soup.find("meta", property="og:title")
-                if og and og.get("content"):
-                    product_name = utils._clean_text(og.get("content"))
-
-        # brand/store fallback은 사이트 구조마다 다르니 meta 없으면 빈 값으로 둠
-        # product_id도 meta가 최선. 필요시 다른 경로에서 파싱 추가 가능.
-
-        row = {
-            "PRODUCT_ID": product_id,
-            "HOMESHOPPING_ID": homeshopping_id,
-            "STORE_NAME": store_name,
-            "PRODUCT_NAME": product_name,
-            "SALE_PRICE": sale_price,
-            "DC_RATE": dc_rate,
-            "DC_PRICE": dc_price,
-        }
-
-        return pd.DataFrame([row], columns=list(row.keys()))
     conn, cur = utils.con_to_maria_ods()
     # PRODUCT_ID 리스트 DB에서 호출
     cur.execute(f"""
@@ -1390,46 +1478,29 @@ def crawl_ns_detail(homeshopping_id):
                 AND PRODUCT_ID NOT IN (SELECT PRODUCT_ID FROM ODS_HOMESHOPPING_PRODUCT_INFO);
                 """)
     id_list = [row[0] for row in cur.fetchall()]
-    # 초기 empty_dataframe 생성
-    df_product, df_img, df_detail = utils.def_dataframe()
-    count = 0
+    cur.close()
+    conn.close()
     total_cnt = 0
-    for i in id_list:
-        print('[NS-DETAIL] ',i, '수집')
-        url = f'https://m.nsmall.com/goods/{i}'
-        soup_init, soup_img, soup_detail = get_ns_html_to_soup(url)
+    # 10개 단위 적재는 백그라운드 writer가 처리 (브라우저는 다음 상품으로 바로 진행)
+    with utils.AsyncDBWriter() as writer, homeshop_detail_buffer(writer) as buffer:
+        for i in id_list:
+            print('[NS-DETAIL] ',i, '수집')
+            url = f'https://m.nsmall.com/goods/{i}'
+            soup_init, soup_img, soup_detail = get_ns_html_to_soup(url)
+
+            if soup_init is None:                 # 진입 자체 실패 → 스킵
+                print(f"[NS-DETAIL] [SKIP] load failed for {i}")
+                continue
 
-        if soup_init is None:                 # 진입 자체 실패 → 스킵
-            print(f"[NS-DETAIL] [SKIP] load failed for {i}")
-            continue
+            df_product_info = ns_info_crawl(soup_init, homeshopping_id)
+            df_img_url = ns_img_crawl(soup_img, i) if soup_img else None
+            df_detail_info = ns_detail_crawl(soup_detail, i) if soup_detail else None
 
-        df_product_info = ns_info_crawl(soup_init, homeshopping_id)
-        if soup_img:
-            df_img_url = ns_img_crawl(soup_img, i)
-            df_img = pd.concat([df_img, df_img_url], ignore_index=True)
-        if soup_detail:
-            df_detail_info = ns_detail_crawl(soup_detail, i)
-            df_detail = pd.concat([df_detail, df_detail_info], ignore_index=True)
-
-        df_product = pd.concat([df_product, df_product_info], ignore_index=True)
-        df_img = pd.concat([df_img, df_img_url], ignore_index=True)
-        df_detail = pd.concat([df_detail, df_detail_info], ignore_index=True)
-        count += 1
-        total_cnt += 1
-        if count == 10 or total_cnt == len(id_list):
-            df_product = utils.sanitize_for_db(df_product)
-            df_detail  = utils.sanitize_for_db(df_detail)
-            df_img     = utils.sanitize_for_db(df_img)
-            # 10개 product 정보 데이터 insert 실행
-            utils.insert_df_into_db(conn, df_product, "ODS_HOMESHOPPING_PRODUCT_INFO", 'IGNORE')
-            utils.insert_df_into_db(conn, df_detail, "ODS_HOMESHOPPING_DETAIL_INFO", 'IGNORE')
-            utils.insert_df_into_db(conn, df_img, "ODS_HOMESHOPPING_IMG_URL", 'IGNORE')
-            print('[NS-DETAIL] Dump to DB...', f'total : {total_cnt} / {len(id_list)}')
-            # dump count 초기화, dataframe 초기화
-            df_product, df_img, df_detail = utils.def_dataframe()
-            count = 0
-    cur.close()
-    conn.close()
+            # 10개마다 적재 (마지막 상품이 스킵돼도 블록 종료 시 남은 묶음 적재)
+            add_homeshop_detail(buffer, df_product_info, df_img_url, df_detail_info)
+            total_cnt += 1
+            if buffer.flushed == total_cnt:
+                print('[NS-DETAIL] Dump to DB...', f'total : {total_cnt} / {len(id_list)}')
     print('[NS-DETAIL] complete', f'total : {total_cnt}')
 
 def run_group1():
@@ -2,11 +2,21 @@ from bs4 import BeautifulSoup
 import base64
 import pandas as pd
 import os
-import time
-from playwright.sync_api import sync_playwright
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    # playwright 미설치 환경(파서 테스트/replay)에서도 파싱 함수는 import 가능하게
+    async_playwright = None
 import ETL.utils.utils as utils
 import ETL.preprocessing.preprocessing_kok as prkok
-import random
+import asyncio
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import requests
+import ETL.ingestion.crawl_utils as crawl_utils
+import ETL.ingestion.browser_pool as browser_pool
 
 def create_tables_ods_kok():
     # ODS 테이블 생성 쿼리
@@ -82,32 +92,34 @@ def create_tables_ods_kok():
             UNIQUE KEY uq_key_name (KOK_PRODUCT_ID, KOK_DISCOUNT_RATE, KOK_DISCOUNTED_PRICE)
         );
     '''
+    # 상품별 최근 2개 추정 정가 (refresh_kok_price_delta가 새 가격 행만 반영해 갱신)
+    create_ods6 = '''
+        CREATE TABLE IF NOT EXISTS ODS_KOK_PRICE_DELTA (
+            KOK_PRODUCT_ID VARCHAR(15) PRIMARY KEY,
+            LAST_PRICE_ID INT,
+            LAST_RATE FLOAT,
+            LAST_EST_RAW DOUBLE,
+            BEFORE_PRICE_ID INT,
+            BEFORE_RATE FLOAT,
+            BEFORE_EST_RAW DOUBLE,
+            RENEWED_AT TIMESTAMP NULL DEFAULT NULL,
+            KEY idx_pricedelta_last (LAST_PRICE_ID)
+        );
+    '''
     create_view_sql = """
     CREATE OR REPLACE
     SQL SECURITY INVOKER
     VIEW V_KOK_RAWPRICE_DELTA_FAST AS
-    WITH s AS (
+    WITH g AS (
       SELECT
         KOK_PRODUCT_ID,
-        ROW_NUMBER() OVER (PARTITION BY KOK_PRODUCT_ID ORDER BY KOK_PRICE_ID DESC) AS rn,
-        IFNULL(STR_TO_NUM(KOK_DISCOUNT_RATE),0) AS rate,
-        ROUND(
-          KOK_DISCOUNTED_PRICE * 100 /
-          NULLIF(100 - IFNULL(STR_TO_NUM(KOK_DISCOUNT_RATE),0),0), 0
-        ) AS est_raw
-      FROM ODS_KOK_PRICE_INFO
-    ),
-    g AS (
-      SELECT
-        KOK_PRODUCT_ID,
-        MAX(CASE WHEN rn=1 THEN est_raw END) AS est1,
-        MAX(CASE WHEN rn=2 THEN est_raw END) AS est2,
-        MAX(CASE WHEN rn=1 THEN rate   END)  AS rate1,
-        MAX(CASE WHEN rn=2 THEN rate   END)  AS rate2
-      FROM s
-      WHERE rn <= 2
-      GROUP BY KOK_PRODUCT_ID
-      HAVING COUNT(*) >= 2
+        LAST_EST_RAW   AS est1,
+        BEFORE_EST_RAW AS est2,
+        LAST_RATE      AS rate1,
+        BEFORE_RATE    AS rate2,
+        RENEWED_AT
+      FROM ODS_KOK_PRICE_DELTA
+      WHERE BEFORE_PRICE_ID IS NOT NULL
     )
     SELECT
       KOK_PRODUCT_ID,
@@ -127,7 +139,8 @@ def create_tables_ods_kok():
                   + (100 / NULLIF(est1,0)) + 0.001 )
         THEN 'same_raw_price'
         ELSE 'changed_raw_price'
-      END AS raw_price_change_flag
+      END AS raw_price_change_flag,
+      RENEWED_AT
       FROM g;
     """
 
@@ -152,6 +165,7 @@ def create_tables_ods_kok():
     cur.execute(create_ods3)
     cur.execute(create_ods4)
     cur.execute(create_ods5)
+    cur.execute(create_ods6)
     cur.execute(create_view_sql)
     cur.execute(check_index_sql)
     exists = cur.fetchone()
@@ -369,43 +383,315 @@ def check_type(a):
     elif isinstance(a, list) and a:
         print(f" ✔ list : {type(a[0])}")
 
-# 가격정보 크롤링 (상품 리스트)
-def crawl_kok_price():
-    conn, cur = utils.con_to_maria_ods()
+KOK_HOST = "kok.uplus.co.kr"
+
+# 리스트 페이지를 먼저 HTTP로 받아보고, 상품 카드가 없을 때만 브라우저로 폴백 (0이면 항상 브라우저)
+KOK_PRICE_HTTP = os.environ.get("KOK_PRICE_HTTP", "1") != "0"
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
+def kok_list_url(code: str, page: int) -> str:
+    version = 202507311600
+    return f'https://{KOK_HOST}/m/event/category/uplus/page?code={code}&page={page}&size=20&sort=recommend_asc&minPrice=0&maxPrice=9999999999&version={version}&'
+
+def fetch_kok_list_http(sess, url: str):
+    # 200 응답 본문 또는 None (네트워크 오류/비정상 응답)
+    try:
+        res = sess.get(url, timeout=crawl_utils.CRAWL_HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"[KOK] HTTP 요청 실패 → 브라우저 폴백: {e}")
+        return None
+    if res.status_code != 200:
+        print(f"[KOK] HTTP {res.status_code} → 브라우저 폴백")
+        return None
+    if not res.encoding or res.encoding.lower() == "iso-8859-1":
+        res.encoding = "utf-8"
+    return res.text
+
+# 가격 중복 제거 캐시 사용 여부 (0이면 기존처럼 전부 INSERT 후 UNIQUE KEY에 맡김)
+KOK_PRICE_DEDUPE = os.environ.get("KOK_PRICE_DEDUPE", "1") != "0"
+
+class KokPriceCache:
+    """
+    ODS_KOK_PRICE_INFO의 uq_key_name(상품, 할인율, 가격) 조합을 실행당 1회 메모리에 적재
+    - filter_new(df): 이미 적재된 가격점은 걸러 새 가격점만 반환 (같은 실행 안의 중복도 제거)
+    - UNIQUE KEY와 같게 NULL이 섞인 행은 항상 통과 (DB에서도 중복으로 막히지 않음)
+    """
+    KEY_COLS = ["KOK_PRODUCT_ID", "KOK_DISCOUNT_RATE", "KOK_DISCOUNTED_PRICE"]
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    @staticmethod
+    def _key(product_id, rate, price):
+        if pd.isna(product_id) or pd.isna(rate) or pd.isna(price):
+            return None
+        try:
+            return (str(product_id), str(rate), int(price))
+        except (TypeError, ValueError):
+            return None
+
+    def load(self):
+        query = """
+            SELECT KOK_PRODUCT_ID, KOK_DISCOUNT_RATE, KOK_DISCOUNTED_PRICE
+            FROM ODS_KOK_PRICE_INFO
+            WHERE KOK_DISCOUNT_RATE IS NOT NULL AND KOK_DISCOUNTED_PRICE IS NOT NULL
+        """
+        with utils.pooled_conn('ods') as (conn, _):
+            for chunk in utils.stream_query(conn, query):
+                for pid, rate, price in chunk[self.KEY_COLS].itertuples(index=False, name=None):
+                    self._seen.add((str(pid), str(rate), int(price)))
+        print(f"[KOK] 가격 캐시 적재: {len(self._seen)}건")
+        return self
+
+    def filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+        keep = []
+        with self._lock:  # 카테고리 병렬 수집 시 워커 간 공유
+            for pid, rate, price in df[self.KEY_COLS].itertuples(index=False, name=None):
+                key = self._key(pid, rate, price)
+                if key is None:
+                    keep.append(True)
+                elif key in self._seen:
+                    keep.append(False)
+                else:
+                    self._seen.add(key)
+                    keep.append(True)
+            self.skipped += len(keep) - sum(keep)
+        return df[keep]
+
+# 가격 크롤링 대상 카테고리 (1612 제외)
+KOK_PRICE_CATEGORIES = [i for i in range(11, 25) if i != 12]
+# 병렬 수집 워커 수 (1이면 기존 순차 방식)
+KOK_PRICE_WORKERS = int(os.environ.get("KOK_PRICE_WORKERS", "1"))
+# 리스트 요청 간격(초). 워커 수와 무관하게 KOK 호스트 전체 요청 속도의 상한
+KOK_PRICE_MIN_INTERVAL = float(os.environ.get("KOK_PRICE_MIN_INTERVAL", str(crawl_utils.CRAWL_MIN_INTERVAL)))
+KOK_PAGE_SIZE = 20
+
+class KokListMode:
+    """
+    리스트 수집 방식 판단 상태 (워커 간 공유, lock으로 보호)
+    - use_http: HTTP로 먼저 받아볼지 여부 (브라우저에서만 카드가 나오면 False로 전환)
+    - http_trusted: HTTP로 카드를 받은 적이 있으면 빈 HTTP 응답은 리스트 끝으로 간주
+    """
+    def __init__(self, use_http: bool = KOK_PRICE_HTTP):
+        self.use_http = use_http
+        self.http_trusted = False
+        self._lock = threading.Lock()
+
+    def http_ok(self):
+        with self._lock:
+            self.http_trusted = True
+
+    def browser_only(self):
+        with self._lock:
+            if self.use_http:
+                print("[KOK] HTTP 응답에 상품 카드 없음 → 이후 페이지는 브라우저로 수집")
+            self.use_http = False
+
+def _kok_list_browser_html(url: str, limiter) -> str:
+    # 브라우저는 현재 스레드 풀에서 처음 필요할 때 기동, 요청 간격은 limiter만 담당
+    limiter.wait(KOK_HOST)
+    with browser_pool.get_pool().page() as page_l:
+        page_l.goto(url)
+        return page_l.content()
+
+# 리스트 페이지 1개 수집 → 상품 카드 수 반환 (KOK_PAGE_SIZE 미만이면 카테고리 마지막 페이지)
+def crawl_kok_price_page(i: int, page: int, sess, writer, limiter, price_cache=None, mode=None) -> int:
+    """
+    - 리스트 페이지는 keep-alive 세션으로 HTTP 요청 후 같은 파서(crawl_product_id / crawl_sale_price_info)로 처리
+    - 응답에 상품 카드가 없을 때만 Playwright(브라우저 풀)로 재시도
+    - 이미 적재된 (상품, 할인율, 가격) 조합은 price_cache로 걸러 새 가격점만 writer로 적재
+    """
+    mode = mode if mode is not None else KokListMode()
+    code = f'16{i}'
+    l_url = kok_list_url(code, page)
+    fetch_id = crawl_utils.new_fetch_id()  # HTTP/브라우저 캡처를 한 수집으로 묶음
 
-        for i in range(11, 25):
-            if i == 12:
+    print(f"[KOK] 카테고리 {i} - 페이지 {page}")
+    html = None
+    product_ids = []
+    if mode.use_http:
+        limiter.wait(KOK_HOST)
+        html = fetch_kok_list_http(sess, l_url)
+        if html is not None:
+            crawl_utils.capture("kok_list", f"{code}_{page}", html, part="http", url=l_url, fetch_id=fetch_id)
+            l_soup = crawl_utils.make_soup(html)
+            product_ids = crawl_product_id(l_soup)
+            if product_ids:
+                mode.http_ok()
+
+    if not product_ids and not (html is not None and mode.http_trusted):
+        b_html = _kok_list_browser_html(l_url, limiter)
+        crawl_utils.capture("kok_list", f"{code}_{page}", b_html, part="browser", url=l_url, fetch_id=fetch_id)
+        l_soup = crawl_utils.make_soup(b_html)
+        product_ids = crawl_product_id(l_soup)
+        if product_ids and mode.use_http and html is not None:
+            mode.browser_only()
+
+    if len(product_ids) == 0:
+        return 0
+    price_info = crawl_sale_price_info(l_soup, product_ids)
+    if price_cache is not None:
+        price_info = price_cache.filter_new(price_info)
+    if not price_info.empty:
+        writer.put(price_info, "ODS_KOK_PRICE_INFO")
+    return len(product_ids)
+
+# 한 카테고리의 리스트 페이지를 끝까지 순차 수집
+def crawl_kok_price_category(i: int, writer, limiter, price_cache=None, mode=None):
+    mode = mode if mode is not None else KokListMode()
+    with crawl_utils.http_session() as sess:
+        page = 1
+        while crawl_kok_price_page(i, page, sess, writer, limiter, price_cache, mode) >= KOK_PAGE_SIZE:
+            page += 1
+
+class KokPageShards:
+    """
+    카테고리/페이지 단위 작업 분배기 (워커 간 공유)
+    - 카테고리마다 1페이지를 먼저 나눠주고, 꽉 찬 페이지가 확인되면 그 카테고리의 다음 페이지들을 lookahead개까지 여러 워커에 분배
+    - 리스트 응답에 전체 건수가 없어 마지막 페이지는 KOK_PAGE_SIZE 미만 응답으로 확정 → 그 뒤 페이지는 더 나눠주지 않음
+      (확정 전에 미리 나간 페이지는 최대 lookahead-1개, 빈 응답으로 끝남)
+    - claim(): (카테고리, 페이지) 또는 None(모든 작업 종료). 당장 줄 페이지가 없으면 진행 중 페이지 결과를 기다림
+    """
+    def __init__(self, categories, lookahead: int):
+        self.lookahead = max(1, lookahead)
+        self._next = {i: 1 for i in categories}
+        self._full = {i: 0 for i in categories}      # 확인된 꽉 찬 페이지 중 최대
+        self._end = {i: None for i in categories}    # 확정된 마지막 페이지
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    def _claimable(self):
+        for i, page in self._next.items():
+            end = self._end[i]
+            if end is not None and page > end:
                 continue
-            page = 1
+            limit = 1 if self._full[i] == 0 else self._full[i] + self.lookahead
+            if page <= limit:
+                return i
+        return None
+
+    def claim(self):
+        with self._cond:
             while True:
-                code = f'16{i}'
-                version = 202507311600
-                l_url = f'https://kok.uplus.co.kr/m/event/category/uplus/page?code={code}&page={page}&size=20&sort=recommend_asc&minPrice=0&maxPrice=9999999999&version={version}&'
-
-                print(f"[KOK] 카테고리 {i} - 페이지 {page}")
-                page_l = context.new_page()
-                page_l.goto(l_url)
-                time.sleep(random.uniform(1, 1.5))
-                html = page_l.content()
-                l_soup = BeautifulSoup(html, "html.parser")
-                page_l.close()
-
-                product_ids = crawl_product_id(l_soup)
-                if len(product_ids) == 0:
-                    break
-                price_info = crawl_sale_price_info(l_soup, product_ids)
-                utils.insert_df_into_db(conn, price_info, "ODS_KOK_PRICE_INFO")
-                if len(product_ids) < 20:
-                    break
-                page += 1
-    cur.close()
-    conn.close()
+                i = self._claimable()
+                if i is not None:
+                    page = self._next[i]
+                    self._next[i] += 1
+                    self._inflight += 1
+                    return i, page
+                if self._inflight == 0:
+                    return None
+                self._cond.wait()
+
+    def done(self, i: int, page: int, count: int):
+        with self._cond:
+            self._inflight -= 1
+            if count >= KOK_PAGE_SIZE:
+                self._full[i] = max(self._full[i], page)
+            elif self._end[i] is None or page < self._end[i]:
+                self._end[i] = page
+            self._cond.notify_all()
+
+def _crawl_kok_price_worker(shards, writer, limiter, price_cache, mode):
+    # 워커 스레드의 브라우저 풀은 스레드 안에서 정리 (sync API 스레드 제약)
+    try:
+        with crawl_utils.http_session() as sess:
+            while (task := shards.claim()) is not None:
+                i, page = task
+                count = 0
+                try:
+                    count = crawl_kok_price_page(i, page, sess, writer, limiter, price_cache, mode)
+                finally:
+                    # 실패한 페이지는 해당 카테고리의 끝으로 처리 (예외는 호출부로 전달)
+                    shards.done(i, page, count)
+    finally:
+        browser_pool.close_pool()
+
+# 가격정보 크롤링 (상품 리스트)
+def crawl_kok_price(workers: int | None = None):
+    """
+    - workers > 1이면 카테고리와 카테고리 내 페이지를 스레드 워커에 나눠 동시에 수집 (KokPageShards)
+    - KOK 호스트 요청은 공유 HostRateLimiter로 KOK_PRICE_MIN_INTERVAL(+지터) 간격마다 1건씩 시작
+      → 간격은 요청 시작 시각만 제한하므로 응답 대기/브라우저 렌더링/파싱이 겹치면서 처리량이 늘어남
+        (순차 방식은 페이지마다 응답+파싱 시간이 간격에 더해짐). 상한은 간격이 정하므로 필요 시 간격을 조정
+    - 가격 캐시, HTTP/브라우저 판단 상태(KokListMode), DB writer는 모든 워커가 공유
+    """
+    limiter = crawl_utils.HostRateLimiter(intervals={KOK_HOST: KOK_PRICE_MIN_INTERVAL})
+    price_cache = KokPriceCache().load() if KOK_PRICE_DEDUPE else None
+    mode = KokListMode()
+    workers = workers or KOK_PRICE_WORKERS
+
+    # 페이지별 적재는 백그라운드 writer가 처리
+    with utils.AsyncDBWriter() as writer:
+        if workers > 1:
+            shards = KokPageShards(KOK_PRICE_CATEGORIES, lookahead=workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kok-price") as ex:
+                futures = [ex.submit(_crawl_kok_price_worker, shards, writer, limiter, price_cache, mode)
+                           for _ in range(workers)]
+                for f in as_completed(futures):
+                    f.result()
+        else:
+            for i in KOK_PRICE_CATEGORIES:
+                crawl_kok_price_category(i, writer, limiter, price_cache, mode)
+
+    if price_cache is not None:
+        print(f"[KOK] 변동 없는 가격 {price_cache.skipped}건 적재 생략")
+
+# 상세 페이지 로딩 완료 판단용 셀렉터
+KOK_DETAIL_SELECTORS = [
+    "span.product__title",
+    "div.card-info.mt--4",
+    "div.card_main-image img",
+    "table.row-table.mb--40",  # 판매자정보 테이블
+    "div.product_info_area img",  # 이미지 리스트 영역
+    "div.tab_info.product_more",  # 상품정보제공 고시 outer div
+    "div.heading_4Sb.mb--16",  # '상품정보제공 고시' 제목
+    "div.pro_detail_buy_table_liner + table.row-table"  # 고시 항목 테이블
+]
+# 셀렉터 8개를 한 번의 in-page predicate로 대기 (필수 → 학습된 대기 후 남은 시간까지 재대기, 합계 30초 안에 안 뜨면 해당 상품 오류)
+KOK_DETAIL_READY_JS = crawl_utils.ready_js(KOK_DETAIL_SELECTORS)
+KOK_READY = crawl_utils.AdaptiveDelay(default_ms=30000)
+# 상세 크롤링 동시 페이지 수 (1이면 기존 순차 방식)
+KOK_DETAIL_CONCURRENCY = int(os.environ.get("KOK_DETAIL_CONCURRENCY", "1"))
+
+def kok_detail_url(pid: str) -> str:
+    proCode = base64.b64encode(pid.encode("utf-8")).decode("utf-8")
+    return f'https://{KOK_HOST}/m/product?proCode={proCode}'
+
+def parse_kok_detail(html: str, pid: str):
+    # 상세 페이지 HTML → (basic_info, detail_info, personal_review, img_urls)
+    p_soup = crawl_utils.make_soup(html)
+    return (crawl_basic_info(p_soup, pid),
+            crawl_detail_info(p_soup, pid),
+            crawl_personal_review(p_soup, pid),
+            crawl_img_src(p_soup, pid))
+
+def _truncate_kok_detail(df: pd.DataFrame) -> pd.DataFrame:
+    # ✅ 긴 텍스트 잘라서 오류 방지
+    df["KOK_DETAIL_VAL"] = df["KOK_DETAIL_VAL"].astype(str).str[:4000]
+    df["KOK_DETAIL_COL"] = df["KOK_DETAIL_COL"].astype(str).str[:1000]
+    return df
+
+# 10개 단위 적재 버퍼 → 백그라운드 writer로 넘기고 바로 다음 상품 수집
+# basic_info에 들어간 ID만 기준으로 나머지 정리
+def kok_detail_buffer(writer) -> utils.RecordBuffer:
+    return utils.RecordBuffer(
+        writer,
+        {"ODS_KOK_PRODUCT_INFO": None, "ODS_KOK_DETAIL_INFO": None,
+         "ODS_KOK_REVIEW_EXAMPLE": None, "ODS_KOK_IMAGE_INFO": None},
+        parent="ODS_KOK_PRODUCT_INFO", key_col="KOK_PRODUCT_ID",
+        transforms={"ODS_KOK_DETAIL_INFO": _truncate_kok_detail},
+    )
+
+def add_kok_detail(buffer, basic_info, detail_info, personal_review, img_urls):
+    buffer.add(ODS_KOK_PRODUCT_INFO=basic_info, ODS_KOK_DETAIL_INFO=detail_info,
+               ODS_KOK_REVIEW_EXAMPLE=personal_review, ODS_KOK_IMAGE_INFO=img_urls)
+
 # 상품 상세 정보 크롤링
-def crawling_kok_detail():
+def crawling_kok_detail(concurrency: int | None = None):
     conn, cur = utils.con_to_maria_ods()
     cur.execute('''
                 SELECT DISTINCT KOK_PRODUCT_ID FROM ODS_KOK_PRICE_INFO
@@ -413,136 +699,204 @@ def crawling_kok_detail():
                 ''')
     rows = cur.fetchall()
     product_ids = [row[0] for row in rows]
+    cur.close()
+    conn.close()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-        basic_info_dump = pd.DataFrame()
-        detail_info_dump = pd.DataFrame()
-        personal_review_dump = pd.DataFrame()
-        img_urls_dump = pd.DataFrame()
-        reset_count = 0
+    concurrency = concurrency or KOK_DETAIL_CONCURRENCY
+    if concurrency > 1:
+        asyncio.run(crawling_kok_detail_concurrent(product_ids, concurrency))
+        return
 
+    # 10개마다(또는 RECORD_BUFFER_SECONDS 경과 시) 적재, 블록 종료 시 마지막 묶음 적재
+    with utils.AsyncDBWriter() as writer, kok_detail_buffer(writer) as buffer:
+        pool = browser_pool.get_pool()
+        limiter = crawl_utils.HostRateLimiter()
         pr_count = 1
         error = 0 
 
         for pid in product_ids:
-            # 10개마다 데이터프레임 초기화 및 적재
-            if reset_count == 10:
-                utils.insert_df_into_db(conn, basic_info_dump, "ODS_KOK_PRODUCT_INFO")
-                # basic_info에 들어간 ID만 기준으로 나머지 정리
-                inserted_ids = set(basic_info_dump["KOK_PRODUCT_ID"].unique())
-
-                detail_info_dump = detail_info_dump[detail_info_dump["KOK_PRODUCT_ID"].isin(inserted_ids)]
-                personal_review_dump = personal_review_dump[personal_review_dump["KOK_PRODUCT_ID"].isin(inserted_ids)]
-                img_urls_dump = img_urls_dump[img_urls_dump["KOK_PRODUCT_ID"].isin(inserted_ids)]
-
-                # ✅ 긴 텍스트 잘라서 오류 방지
-                detail_info_dump["KOK_DETAIL_VAL"] = detail_info_dump["KOK_DETAIL_VAL"].astype(str).str[:4000]
-                detail_info_dump["KOK_DETAIL_COL"] = detail_info_dump["KOK_DETAIL_COL"].astype(str).str[:1000]
-
-                utils.insert_df_into_db(conn, detail_info_dump, "ODS_KOK_DETAIL_INFO")
-                utils.insert_df_into_db(conn, personal_review_dump, "ODS_KOK_REVIEW_EXAMPLE")
-                utils.insert_df_into_db(conn, img_urls_dump, "ODS_KOK_IMAGE_INFO")
-
-                # 데이터프레임 초기화
-                basic_info_dump = pd.DataFrame()
-                detail_info_dump = pd.DataFrame()
-                personal_review_dump = pd.DataFrame()
-                img_urls_dump = pd.DataFrame()
-                reset_count = 0
-
-                print('[KOK] 중간 적재')
-            else : 
-                pass
-
             try:
                 print(f"[KOK] {pr_count}. 상품 ID: {pid}")
-                proCode = base64.b64encode(pid.encode("utf-8")).decode("utf-8")
-                p_url = f'https://kok.uplus.co.kr/m/product?proCode={proCode}'
-
-                page_d = context.new_page()
-                page_d.goto(p_url, timeout=30000)
-                for sel in [
-                    "span.product__title",
-                    "div.card-info.mt--4",
-                    "div.card_main-image img",
-                    "table.row-table.mb--40",  # 판매자정보 테이블
-                    "div.product_info_area img",  # 이미지 리스트 영역
-                    "div.tab_info.product_more",  # 상품정보제공 고시 outer div
-                    "div.heading_4Sb.mb--16",  # '상품정보제공 고시' 제목
-                    "div.pro_detail_buy_table_liner + table.row-table"  # 고시 항목 테이블
-                ]:
-                    page_d.wait_for_selector(sel, state="attached", timeout=30000)
-
-                time.sleep(random.uniform(1, 1.5))
-                html = page_d.content()
-                p_soup = BeautifulSoup(html, "html.parser")
-                page_d.close()
-
-                basic_info = crawl_basic_info(p_soup, pid)
-                detail_info = crawl_detail_info(p_soup, pid)
-                personal_review = crawl_personal_review(p_soup, pid)
-                img_urls = crawl_img_src(p_soup, pid)
-
-                basic_info_dump = pd.concat([basic_info_dump, basic_info], ignore_index=True)
-                detail_info_dump = pd.concat([detail_info_dump, detail_info], ignore_index=True)
-                personal_review_dump = pd.concat([personal_review_dump, personal_review], ignore_index=True)
-                img_urls_dump = pd.concat([img_urls_dump, img_urls], ignore_index=True)
+                p_url = kok_detail_url(pid)
+
+                # 요청 간격은 limiter, 대기는 콘텐츠가 뜨는 즉시 종료
+                limiter.wait(KOK_HOST)
+                with pool.page() as page_d:
+                    page_d.goto(p_url, timeout=30000)
+                    KOK_READY.wait_until(page_d, KOK_HOST, KOK_DETAIL_READY_JS, required=True)
+                    html = page_d.content()
+                crawl_utils.capture("kok_detail", pid, html, url=p_url)
+
+                add_kok_detail(buffer, *parse_kok_detail(html, pid))
 
                 pr_count += 1
-                reset_count += 1
 
             except Exception as e:
                 print(f"[KOK] [ERROR] {pid} 오류 발생: {e}")
-                if 'page_d' in locals():
-                    page_d.close()
-
                 error += 1
                 continue
 
-        browser.close()
     print(f'[KOK] {pr_count}개 적재 / {error}개 오류')
-    cur.close()
-    conn.close()
+
+# 상품 상세 정보 병렬 크롤링 (페이지 concurrency개 동시 로딩)
+async def crawling_kok_detail_concurrent(product_ids: list, concurrency: int):
+    """
+    - 최대 concurrency개 상품을 동시에 로딩하되, 결과는 product_ids 순서대로 처리 (슬라이딩 윈도우)
+    - 같은 호스트로의 페이지 진입은 HostRateLimiter 간격을 지킴 (기존 1~1.5초 sleep 대체)
+    - 상품별 오류는 해당 상품만 건너뜀, 10개마다 적재는 순차 방식과 동일
+    - 캡처 저장/파싱/버퍼 적재(AsyncDBWriter.put은 큐가 차면 대기)는 asyncio.to_thread로 실행 → 이벤트 루프(페이지 로딩)를 막지 않음
+    """
+    limiter = crawl_utils.HostRateLimiter()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
+        await crawl_utils.block_heavy_resources(context)
+
+        async def fetch_html(pid: str) -> str:
+            await limiter.wait_async(KOK_HOST)
+            page_d = await context.new_page()
+            try:
+                await page_d.goto(kok_detail_url(pid), timeout=30000)
+                await KOK_READY.wait_until_async(page_d, KOK_HOST, KOK_DETAIL_READY_JS, required=True)
+                return await page_d.content()
+            finally:
+                await page_d.close()
+
+        def capture_and_parse(pid: str, html: str):
+            crawl_utils.capture("kok_detail", pid, html, url=kok_detail_url(pid))
+            return parse_kok_detail(html, pid)
+
+        # writer/buffer 종료(마지막 flush + writer join)도 블로킹이라 스레드에서 정리
+        stack = ExitStack()
+        writer = stack.enter_context(utils.AsyncDBWriter())
+        buffer = stack.enter_context(kok_detail_buffer(writer))
+        try:
+            pr_count = 1
+            error = 0
+
+            pending = iter(product_ids)
+            window = deque()
+
+            def refill():
+                while len(window) < concurrency:
+                    pid = next(pending, None)
+                    if pid is None:
+                        return
+                    window.append((pid, asyncio.ensure_future(fetch_html(pid))))
+
+            refill()
+            while window:
+                pid, task = window.popleft()
+                try:
+                    html = await task
+                except Exception as e:
+                    print(f"[KOK] [ERROR] {pid} 오류 발생: {e}")
+                    error += 1
+                    refill()
+                    continue
+                refill()
+
+                try:
+                    print(f"[KOK] {pr_count}. 상품 ID: {pid}")
+                    parsed = await asyncio.to_thread(capture_and_parse, pid, html)
+                except Exception as e:
+                    print(f"[KOK] [ERROR] {pid} 오류 발생: {e}")
+                    error += 1
+                    continue
+
+                # 10개마다 적재 (종료 시 마지막 묶음 적재)
+                await asyncio.to_thread(add_kok_detail, buffer, *parsed)
+                pr_count += 1
+        finally:
+            await asyncio.to_thread(stack.close)
+        await browser.close()
+    print(f'[KOK] {pr_count}개 적재 / {error}개 오류')
+
+# 새로 들어온 가격 행만 읽어 상품별 최근 2개 추정 정가 갱신
+def refresh_kok_price_delta(cur_o):
+    """
+    - 워터마크(이미 반영한 최대 KOK_PRICE_ID) 이후 행만 읽어 ODS_KOK_PRICE_DELTA를 UPSERT → 비용은 새 행 수에 비례
+    - 새 행이 2개 이상인 상품은 새 행 상위 2개로, 1개면 기존 최근값을 직전값으로 밀어냄
+    - 최초 실행(빈 테이블)에는 전체 이력으로 채우고 기존 RENEW_AT 이력도 RENEWED_AT으로 옮김
+    - ODKU는 왼쪽부터 적용되므로 BEFORE_* 를 LAST_* 보다 먼저 갱신
+    """
+    cur_o.execute("SELECT COALESCE(MAX(LAST_PRICE_ID), 0) FROM ODS_KOK_PRICE_DELTA;")
+    watermark = cur_o.fetchone()[0]
+    cur_o.execute('''
+        INSERT INTO ODS_KOK_PRICE_DELTA (
+            KOK_PRODUCT_ID, LAST_PRICE_ID, LAST_RATE, LAST_EST_RAW,
+            BEFORE_PRICE_ID, BEFORE_RATE, BEFORE_EST_RAW)
+        SELECT
+            KOK_PRODUCT_ID,
+            MAX(CASE WHEN rn=1 THEN KOK_PRICE_ID END),
+            MAX(CASE WHEN rn=1 THEN rate END),
+            MAX(CASE WHEN rn=1 THEN est_raw END),
+            MAX(CASE WHEN rn=2 THEN KOK_PRICE_ID END),
+            MAX(CASE WHEN rn=2 THEN rate END),
+            MAX(CASE WHEN rn=2 THEN est_raw END)
+        FROM (
+            SELECT
+                KOK_PRODUCT_ID,
+                KOK_PRICE_ID,
+                ROW_NUMBER() OVER (PARTITION BY KOK_PRODUCT_ID ORDER BY KOK_PRICE_ID DESC) AS rn,
+                IFNULL(STR_TO_NUM(KOK_DISCOUNT_RATE),0) AS rate,
+                ROUND(
+                  KOK_DISCOUNTED_PRICE * 100 /
+                  NULLIF(100 - IFNULL(STR_TO_NUM(KOK_DISCOUNT_RATE),0),0), 0
+                ) AS est_raw
+            FROM ODS_KOK_PRICE_INFO
+            WHERE KOK_PRICE_ID > %s
+        ) s
+        WHERE rn <= 2
+        GROUP BY KOK_PRODUCT_ID
+        ON DUPLICATE KEY UPDATE
+            BEFORE_EST_RAW  = IF(VALUES(BEFORE_PRICE_ID) IS NULL, LAST_EST_RAW, VALUES(BEFORE_EST_RAW)),
+            BEFORE_RATE     = IF(VALUES(BEFORE_PRICE_ID) IS NULL, LAST_RATE, VALUES(BEFORE_RATE)),
+            BEFORE_PRICE_ID = IF(VALUES(BEFORE_PRICE_ID) IS NULL, LAST_PRICE_ID, VALUES(BEFORE_PRICE_ID)),
+            LAST_EST_RAW    = VALUES(LAST_EST_RAW),
+            LAST_RATE       = VALUES(LAST_RATE),
+            LAST_PRICE_ID   = VALUES(LAST_PRICE_ID);
+    ''', (watermark,))
+    print(f'[KOK] 가격 변동 테이블 갱신: {cur_o.rowcount}건 (KOK_PRICE_ID > {watermark})')
+    if watermark == 0:
+        cur_o.execute('''
+            UPDATE ODS_KOK_PRICE_DELTA d
+            JOIN (
+                SELECT KOK_PRODUCT_ID, MAX(RENEW_AT) AS RENEW_AT
+                FROM ODS_KOK_PRICE_INFO
+                WHERE RENEW_AT IS NOT NULL
+                GROUP BY KOK_PRODUCT_ID
+            ) r ON r.KOK_PRODUCT_ID = d.KOK_PRODUCT_ID
+            SET d.RENEWED_AT = r.RENEW_AT;
+        ''')
 
 def deal_with_changed_raw_price():
+    """
+    - 추정 정가가 바뀐 상품의 ODS 상세를 지워 다음 상세 크롤링에서 재수집, RENEW_AT/RENEWED_AT 표시
+    - FCT는 건드리지 않음 → preprocess_kok의 재수집 반영 단계에서 UPSERT
+    - 대상 ID는 세션 임시 테이블(anti_join_filter)로 조인 (SQL에 ID 목록을 붙이지 않음)
+    """
     conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
     print('▶ [KOK] 상품 정보 변동 대응 수행')
+    refresh_kok_price_delta(cur_o)
+    # 한 번 재수집된 상품(RENEWED_AT)은 제외
     cur_o.execute('''
                 SELECT 
                     KOK_PRODUCT_ID 
                 FROM V_KOK_RAWPRICE_DELTA_FAST 
                 WHERE 
                     raw_price_change_flag = 'changed_raw_price' 
-                    AND 
-                    KOK_PRODUCT_ID NOT IN (
-                        SELECT KOK_PRODUCT_ID FROM ODS_KOK_PRICE_INFO
-                        WHERE RENEW_AT IS NOT NULL);
+                    AND RENEWED_AT IS NULL;
                 ''')
-    rows = cur_o.fetchall()
+    ch_ids = [r[0] for r in cur_o.fetchall()]
     try:
+        if not ch_ids:
+            return False
         conn_o.autocommit = False
-        conn_s.autocommit = False
-        if rows:
-            ch_list = ','.join(r[0] for r in rows)
-            cur_o.execute(f'''
-                DELETE FROM ODS_KOK_PRODUCT_INFO
-                WHERE KOK_PRODUCT_ID IN ({ch_list});
-            ''')
-            cur_o.execute(f'''
-                DELETE FROM ODS_KOK_IMAGE_INFO
-                WHERE KOK_PRODUCT_ID IN ({ch_list});
-            ''')
-            cur_o.execute(f'''
-                DELETE FROM ODS_KOK_DETAIL_INFO
-                WHERE KOK_PRODUCT_ID IN ({ch_list});
-            ''')
-            cur_o.execute(f'''
-                DELETE FROM ODS_KOK_REVIEW_EXAMPLE
-                WHERE KOK_PRODUCT_ID IN ({ch_list});
-            ''')
+        with utils.anti_join_filter(conn_o, "o.KOK_PRODUCT_ID", ch_ids, anti=False) as cond:
+            for table in ("ODS_KOK_PRODUCT_INFO", "ODS_KOK_IMAGE_INFO", "ODS_KOK_DETAIL_INFO", "ODS_KOK_REVIEW_EXAMPLE"):
+                cur_o.execute(f"DELETE o FROM {table} o WHERE {cond};")
             print('[KOK] ODS 데이터 삭제')
             cur_o.execute(f'''
                 UPDATE ODS_KOK_PRICE_INFO
@@ -550,25 +904,23 @@ def deal_with_changed_raw_price():
                 WHERE KOK_PRICE_ID IN (
                     SELECT a.KOK_PRICE_ID FROM(
                         SELECT 
-                            MAX(KOK_PRICE_ID) AS KOK_PRICE_ID, 
-                            KOK_PRODUCT_ID 
-                        FROM ODS_KOK_PRICE_INFO 
-                        WHERE KOK_PRODUCT_ID IN ({ch_list})
-                        GROUP BY KOK_PRODUCT_ID) a);
+                            MAX(o.KOK_PRICE_ID) AS KOK_PRICE_ID, 
+                            o.KOK_PRODUCT_ID 
+                        FROM ODS_KOK_PRICE_INFO o
+                        WHERE {cond}
+                        GROUP BY o.KOK_PRODUCT_ID) a);
+            ''')
+            cur_o.execute(f'''
+                UPDATE ODS_KOK_PRICE_DELTA o
+                SET o.RENEWED_AT = CURRENT_TIMESTAMP()
+                WHERE {cond};
             ''')
             print('[KOK] RENEW_AT 업데이트')
             conn_o.commit()
-            cur_s.execute(f'''
-                DELETE FROM FCT_KOK_PRODUCT_INFO
-                WHERE KOK_PRODUCT_ID IN ({ch_list});
-            ''')
-            print('[KOK] FCT 데이터 삭제')
-            conn_s.commit()
-            print('✅ [KOK] 상품 정보 변동 대응 완료')
-            return [ch_list]
-        else:
-            return False
-        
+        # FCT는 삭제하지 않음 → preprocess_kok에서 재수집된 ODS 값으로 UPSERT
+        print('✅ [KOK] 상품 정보 변동 대응 완료')
+        return ch_ids
+
     except Exception as e:
         conn_o.rollback()
         print('❌ [KOK] 상품 정보 변동 대응 실패')
@@ -576,8 +928,6 @@ def deal_with_changed_raw_price():
 
     finally:
         cur_o.close()
-        cur_s.close()
-        conn_s.close()
         conn_o.close()
 
 def main():
@@ -0,0 +1,442 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import gzip
+import json
+import hashlib
+import uuid
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup, FeatureNotFound
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 같은 호스트 요청 사이 최소 간격(초) + 랜덤 지터
+CRAWL_MIN_INTERVAL = float(os.environ.get("CRAWL_MIN_INTERVAL", "1.0"))
+CRAWL_JITTER = float(os.environ.get("CRAWL_JITTER", "0.5"))
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+class HostRateLimiter:
+    """
+    호스트별 politeness budget. 병렬 크롤링에서도 같은 호스트로는 min_interval(+지터) 간격으로만 요청.
+    - 간격은 요청 "시작" 사이에만 적용 → 응답 대기/파싱 중인 요청이 있어도 다음 요청은 예약 시각에 출발
+      (병렬 워커는 응답 시간을 겹쳐 처리량을 얻고, 호스트 전체 요청률 상한은 간격으로 유지)
+    - intervals: 호스트별 간격 지정 (없는 호스트는 min_interval)
+    - reserve(host): 다음 요청 시각을 예약하고 기다려야 할 초를 반환 (스레드 안전)
+    - wait(host) / await wait_async(host): 예약 후 대기
+    """
+    def __init__(self, min_interval: float = CRAWL_MIN_INTERVAL, jitter: float = CRAWL_JITTER,
+                 intervals: dict | None = None):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.intervals = dict(intervals or {})
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        interval = self.intervals.get(host, self.min_interval)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + interval + random.uniform(0, self.jitter)
+            return start - now
+
+    def wait(self, host: str):
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, host: str):
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+def ready_js(selectors=(), any_of=()) -> str:
+    """
+    페이지 준비 판단용 단일 JS predicate (wait_for_function 1회로 대기)
+    - selectors: 모두 존재해야 함, any_of: 하나 이상 존재해야 함
+    """
+    conds = []
+    if selectors:
+        conds.append(f"{json.dumps(list(selectors))}.every(s => document.querySelector(s))")
+    if any_of:
+        conds.append(f"{json.dumps(list(any_of))}.some(s => document.querySelector(s))")
+    return "() => " + (" && ".join(conds) or "true")
+
+class AdaptiveDelay:
+    """
+    호스트별 준비 지연 학습기. 콘텐츠가 뜨는 즉시 대기를 끝내고, 못 뜨는 경우의 대기 상한만 학습값으로 조절
+    - timeout(host): 관측 EWMA + k*편차 (min_ms~max_ms), 관측 전에는 default_ms
+    - max_ms 기본값은 default_ms (기존 고정 대기값) → 한 번의 wait_until 전체 대기는 이 값을 넘지 않음
+    - min_ms 기본값은 default_ms/5 → 빨리 뜨는 호스트는 못 뜨는 경우의 대기도 줄어듦
+    - 타임아웃은 실제 대기 시간으로 관측 (실제 준비 시간의 하한)
+    - retries: 학습값에서 타임아웃 나면 남은 예산(max_ms - 학습값)으로 재대기. 필수 대기 기본 1회, 선택 대기 기본 0회
+    - wait_until(page, host, js): predicate가 참이 될 때까지 대기 → 성공 여부 반환 (required=True면 타임아웃 예외 전달)
+    - 요청 간격(politeness)은 HostRateLimiter 담당, 여기서는 sleep 하지 않음
+    """
+    def __init__(self, default_ms: int, min_ms: int | None = None, max_ms: int | None = None,
+                 alpha: float = 0.2, k: float = 4.0):
+        self.default_ms = default_ms
+        self.min_ms = default_ms // 5 if min_ms is None else min_ms
+        self.max_ms = max_ms or default_ms
+        self.alpha = alpha
+        self.k = k
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def timeout(self, host: str) -> int:
+        with self._lock:
+            st = self._stats.get(host)
+        if st is None:
+            return self.default_ms
+        mean, dev = st
+        return int(min(self.max_ms, max(self.min_ms, mean + self.k * dev)))
+
+    def observe(self, host: str, ms: float):
+        with self._lock:
+            st = self._stats.get(host)
+            if st is None:
+                self._stats[host] = (ms, ms / 2)
+            else:
+                mean, dev = st
+                mean = (1 - self.alpha) * mean + self.alpha * ms
+                dev = (1 - self.alpha) * dev + self.alpha * abs(ms - mean)
+                self._stats[host] = (mean, dev)
+
+    def observe_timeout(self, host: str, waited_ms: float):
+        # 실제 준비 시간은 대기 시간 이상 → 대기 시간을 하한 관측값으로 기록
+        self.observe(host, waited_ms)
+
+    def _limits(self, host: str, required: bool, timeout_ms: int | None, retries: int | None) -> list:
+        # 전체 예산은 timeout_ms(미지정 시 max_ms). 첫 대기는 학습값, 재시도는 남은 예산을 나눠 씀
+        retries = (1 if required else 0) if retries is None else retries
+        budget = timeout_ms or self.max_ms
+        first = min(self.timeout(host), budget)
+        rest = budget - first
+        if retries <= 0 or rest <= 0:
+            return [first]
+        return [first] + [max(1, rest // retries)] * retries
+
+    def wait_until(self, page, host: str, js: str, required: bool = False, timeout_ms: int | None = None,
+                   retries: int | None = None) -> bool:
+        start = time.monotonic()
+        limits = self._limits(host, required, timeout_ms, retries)
+        for n, limit in enumerate(limits):
+            try:
+                page.wait_for_function(js, timeout=limit)
+            except Exception as e:
+                if "Timeout" not in type(e).__name__:
+                    raise
+                self.observe_timeout(host, (time.monotonic() - start) * 1000)
+                if n + 1 < len(limits):
+                    continue
+                if required:
+                    raise
+                return False
+            self.observe(host, (time.monotonic() - start) * 1000)
+            return True
+
+    async def wait_until_async(self, page, host: str, js: str, required: bool = False, timeout_ms: int | None = None,
+                               retries: int | None = None) -> bool:
+        start = time.monotonic()
+        limits = self._limits(host, required, timeout_ms, retries)
+        for n, limit in enumerate(limits):
+            try:
+                await page.wait_for_function(js, timeout=limit)
+            except Exception as e:
+                if "Timeout" not in type(e).__name__:
+                    raise
+                self.observe_timeout(host, (time.monotonic() - start) * 1000)
+                if n + 1 < len(limits):
+                    continue
+                if required:
+                    raise
+                return False
+            self.observe(host, (time.monotonic() - start) * 1000)
+            return True
+
+# 파서는 DOM 텍스트/src 속성만 읽으므로 무거운 리소스와 트래커 요청은 끊는다 (0이면 비활성)
+CRAWL_BLOCK_RESOURCES = os.environ.get("CRAWL_BLOCK_RESOURCES", "1") != "0"
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+BLOCKED_TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "facebook.com", "criteo.com", "criteo.net",
+    "adnxs.com", "kakao.ad", "daumcdn.net/adfit", "mobon.net", "enliple.com", "naver.net/wcslog",
+    "hotjar.com", "clarity.ms", "tiktok.com", "appier.net", "dable.io", "tenping.kr",
+)
+
+def block_heavy_resources(target, allow_types=(), allow_patterns=()):
+    """
+    Playwright BrowserContext/Page에 리소스 차단 라우트 등록 (sync/async 공용)
+    - image/media/font 요청과 광고·분석 트래커 요청은 abort
+    - allow_types: 차단하지 않을 resource_type (예: 이미지가 필요한 크롤러는 ("image",))
+    - allow_patterns: URL에 포함되면 항상 통과시킬 문자열
+    - async API에서는 반환값(코루틴)을 await 해야 함
+    """
+    blocked_types = tuple(t for t in BLOCKED_RESOURCE_TYPES if t not in allow_types)
+
+    def _handler(route, request):
+        url = request.url
+        if any(p in url for p in allow_patterns):
+            return route.continue_()
+        if request.resource_type in blocked_types or any(h in url for h in BLOCKED_TRACKER_HOSTS):
+            return route.abort()
+        return route.continue_()
+
+    if not CRAWL_BLOCK_RESOURCES:
+        return _noop_route(target)
+    return target.route("**/*", _handler)
+
+def _noop_route(target):
+    # 비활성 시에도 async 호출부의 await가 깨지지 않도록 awaitable 반환
+    if asyncio.iscoroutinefunction(getattr(target, "route", None)):
+        return asyncio.sleep(0)
+    return None
+
+# 브라우저 없이 받는 HTTP 요청 기본값
+CRAWL_USER_AGENT = os.environ.get(
+    "CRAWL_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+)
+CRAWL_HTTP_TIMEOUT = float(os.environ.get("CRAWL_HTTP_TIMEOUT", "15"))
+
+def http_session(retries: int = 2, pool_size: int = 10) -> requests.Session:
+    """
+    keep-alive 재사용 requests.Session
+    - 5xx/429는 backoff 재시도, UA는 브라우저와 동일하게
+    """
+    sess = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5,
+                  status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    sess.headers.update({"User-Agent": CRAWL_USER_AGENT, "Accept-Language": "ko-KR,ko;q=0.9"})
+    return sess
+
+# 동시 API 호출: 호스트별 동시 요청 수 상한, 실패 시 재시도 횟수
+CRAWL_HOST_CONCURRENCY = int(os.environ.get("CRAWL_HOST_CONCURRENCY", "4"))
+CRAWL_FETCH_RETRIES = int(os.environ.get("CRAWL_FETCH_RETRIES", "3"))
+
+def _fetch_with_retry(sess, url: str, timeout: float, retries: int, backoff: float):
+    # 200 응답 본문 또는 None. 네트워크 오류/타임아웃/5xx/429는 지수 backoff + 지터 후 재시도
+    err = None
+    for attempt in range(retries + 1):
+        try:
+            res = sess.get(url, timeout=timeout)
+            if res.status_code == 200:
+                if not res.encoding or res.encoding.lower() == "iso-8859-1":
+                    res.encoding = "utf-8"
+                return res.text
+            err = f"HTTP {res.status_code}"
+            if res.status_code < 500 and res.status_code != 429:
+                break
+        except requests.RequestException as e:
+            err = repr(e)
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+    print(f"[FETCH] [ERROR] {url}: {err}")
+    return None
+
+def fetch_concurrent(urls, max_workers: int = 8, per_host: int | None = None, retries: int | None = None,
+                     backoff: float = 0.5, timeout: float | None = None, sess=None) -> list:
+    """
+    여러 URL을 keep-alive 세션 하나로 동시에 GET → 본문(str) 리스트를 urls 순서대로 반환 (실패 시 None)
+    - 같은 호스트로는 per_host개까지만 동시에 요청 (기본 CRAWL_HOST_CONCURRENCY)
+    - 재시도는 retries회 (기본 CRAWL_FETCH_RETRIES), 대기는 backoff * 2^n + 지터
+    - sess 미지정 시 내부에서 만들고 닫음
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    per_host = per_host or CRAWL_HOST_CONCURRENCY
+    retries = CRAWL_FETCH_RETRIES if retries is None else retries
+    timeout = timeout or CRAWL_HTTP_TIMEOUT
+    own_sess = sess is None
+    if own_sess:
+        # 재시도는 여기서 지터와 함께 처리하므로 세션 자체 재시도는 끔
+        sess = http_session(retries=0, pool_size=max_workers)
+    host_slots = {}
+    for url in urls:
+        host_slots.setdefault(host_of(url), threading.BoundedSemaphore(per_host))
+
+    def _one(url: str):
+        with host_slots[host_of(url)]:
+            return _fetch_with_retry(sess, url, timeout, retries, backoff)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as ex:
+            return list(ex.map(_one, urls))
+    finally:
+        if own_sess:
+            sess.close()
+
+# BeautifulSoup 파서 백엔드 (lxml이 html.parser보다 수 배 빠름, 미설치 시 html.parser로 폴백)
+HTML_PARSER = os.environ.get("HTML_PARSER", "lxml")
+_parser_fallback_warned = False
+
+def make_soup(html, parser: str | None = None) -> BeautifulSoup:
+    """
+    크롤러 공용 soup 생성
+    - parser 미지정 시 HTML_PARSER(기본 lxml) 사용
+    - 해당 파서가 설치되어 있지 않으면 html.parser로 폴백 (1회 경고)
+    """
+    global _parser_fallback_warned
+    try:
+        return BeautifulSoup(html, parser or HTML_PARSER)
+    except FeatureNotFound:
+        if not _parser_fallback_warned:
+            print(f"[CRAWL] [WARN] '{parser or HTML_PARSER}' 파서 없음 → html.parser 사용")
+            _parser_fallback_warned = True
+        return BeautifulSoup(html, "html.parser")
+
+def _same_result(a, b) -> bool:
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(_same_result(x, y) for x, y in zip(a, b))
+    if isinstance(a, pd.DataFrame) and isinstance(b, pd.DataFrame):
+        return a.reset_index(drop=True).equals(b.reset_index(drop=True))
+    return a == b
+
+def check_parser_parity(parse_fn, html, *args, parsers=("html.parser", None)):
+    """
+    같은 HTML을 여러 파서로 읽었을 때 파싱 함수 결과가 같은지 확인 (파서 교체 전 녹화 페이지 검증용)
+    - parse_fn(soup, *args) 형태의 함수 (crawl_basic_info, crawl_schedule_page, parse_hmall_product, ns_info_crawl 등)
+    - parsers의 None은 HTML_PARSER
+    - (일치 여부, {파서: 결과}) 반환
+    - 녹화 페이지 기준 테스트: tests/test_parser_parity.py (tests/fixtures/parity/*.html)
+    """
+    results = {}
+    for parser in parsers:
+        name = parser or HTML_PARSER
+        results[name] = parse_fn(make_soup(html, name), *args)
+    values = list(results.values())
+    same = all(_same_result(values[0], v) for v in values[1:])
+    if not same:
+        print(f"[CRAWL] [PARITY] {getattr(parse_fn, '__name__', parse_fn)} 결과 불일치: {list(results)}")
+    return same, results
+
+# 크롤링 원본 캡처 저장 경로 (비어 있으면 저장 안 함)
+CRAWL_CAPTURE_DIR = os.environ.get("CRAWL_CAPTURE_DIR", "")
+
+class PageCaptureStore:
+    """
+    크롤러가 받은 원본(HTML/JSON) 로컬 저장소. 오프라인 재파싱(ETL/ingestion/replay.py)용
+    - 본문: <root>/objects/<sha256 앞 2자리>/<sha256>.gz (내용 주소 → 같은 페이지는 1번만 저장)
+    - 인덱스: <root>/index/<source>.jsonl 한 줄당 {source, key, part, kind, sha256, fetched_at, fetch_id, url, meta}
+    - fetch_id: 한 번의 수집에서 나온 part들(탭/HTTP+브라우저 등)이 공유하는 id (미지정 시 part마다 새 id)
+    - save 실패는 경고만 남기고 크롤링은 계속
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "index"), exist_ok=True)
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}.gz")
+
+    def save(self, source: str, key, content, part: str = "", kind: str = "html",
+             url: str | None = None, meta: dict | None = None, fetch_id: str | None = None) -> str | None:
+        if content is None:
+            return None
+        try:
+            data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+            sha = hashlib.sha256(data).hexdigest()
+            path = self._object_path(sha)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp, "wb", compresslevel=6) as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            entry = {"source": source, "key": str(key), "part": part, "kind": kind, "sha256": sha,
+                     "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                     "fetch_id": fetch_id or new_fetch_id(), "url": url, "meta": meta or {}}
+            line = json.dumps(entry, ensure_ascii=False) + "\n"
+            with self._lock, open(os.path.join(self.root, "index", f"{source}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(line)
+            return sha
+        except Exception as e:
+            print(f"[CRAWL] [WARN] capture 저장 실패 {source}/{key}: {e}")
+            return None
+
+    def load(self, sha: str) -> str:
+        with gzip.open(self._object_path(sha), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def sources(self) -> list[str]:
+        return sorted(f[:-6] for f in os.listdir(os.path.join(self.root, "index")) if f.endswith(".jsonl"))
+
+    def entries(self, source: str) -> Iterator[dict]:
+        path = os.path.join(self.root, "index", f"{source}.jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def iter_groups(self, source: str, latest_only: bool = True) -> Iterator[tuple]:
+        """
+        (key, {part: entry}) 단위로 반환 (한 번의 수집에서 나온 탭/스냅샷 묶음, fetch_id 기준)
+        - latest_only: key별 가장 최근 수집 1건만 (다른 수집의 part와 섞지 않음), False면 수집 단위로 전부
+        - fetch_id 없는 이전 인덱스는 (key, fetched_at) 단위로 묶음
+        """
+        groups = {}
+        for e in self.entries(source):
+            fid = e.get("fetch_id") or e["fetched_at"]
+            groups.setdefault((e["key"], fid), {})[e["part"]] = e
+        if latest_only:
+            # 인덱스는 추가 순서 → 같은 key는 나중에 시작된 수집이 뒤에 옴
+            latest = {}
+            for key, fid in groups:
+                latest[key] = fid
+            for key, fid in latest.items():
+                yield key, groups[(key, fid)]
+            return
+        for (key, _), parts in groups.items():
+            yield key, parts
+
+_capture_store = None
+_capture_fetch_id = contextvars.ContextVar("capture_fetch_id", default=None)
+
+def new_fetch_id() -> str:
+    return uuid.uuid4().hex
+
+@contextmanager
+def capture_fetch():
+    """
+    with capture_fetch(): ...  블록 안의 capture()는 같은 fetch_id로 저장 (한 상품 수집 단위로 감쌈)
+    """
+    token = _capture_fetch_id.set(new_fetch_id())
+    try:
+        yield
+    finally:
+        _capture_fetch_id.reset(token)
+
+def capture_store() -> PageCaptureStore | None:
+    global _capture_store
+    if not CRAWL_CAPTURE_DIR:
+        return None
+    if _capture_store is None or _capture_store.root != CRAWL_CAPTURE_DIR:
+        _capture_store = PageCaptureStore(CRAWL_CAPTURE_DIR)
+    return _capture_store
+
+def capture(source: str, key, content, **kwargs):
+    # CRAWL_CAPTURE_DIR 설정 시에만 원본 저장 (source 예: kok_detail, hns_detail, ns_schedule)
+    # fetch_id 미지정 시 capture_fetch() 블록의 id 사용
+    store = capture_store()
+    if store is not None:
+        kwargs.setdefault("fetch_id", _capture_fetch_id.get())
+        store.save(source, key, content, **kwargs)
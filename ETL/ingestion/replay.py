@@ -0,0 +1,162 @@
+"""
+크롤링 캡처 저장소 오프라인 재파싱 (네트워크 없음)
+- CRAWL_CAPTURE_DIR로 저장한 원본을 현재 파서로 다시 돌려 결과 행 수/소요 시간 출력
+- 사이트 마크업 변경 시 재크롤링 없이 파서 수정 검증, 실제 페이지로 파서 벤치마크
+
+python -m ETL.ingestion.replay --source kok_detail --limit 500
+python -m ETL.ingestion.replay --source ns_detail --parser lxml --compare html.parser
+python -m ETL.ingestion.replay --source hns_schedule --out ./replay_out
+python -m ETL.ingestion.replay --source ns_schedule --source hyundai_schedule
+"""
+import os
+import time
+import json
+import argparse
+import pandas as pd
+import ETL.ingestion.crawl_utils as crawl_utils
+import ETL.ingestion.crawl_kok as cr_k
+import ETL.ingestion.crawl_homeshop as cr_hs
+
+def _html(store, parts, part=""):
+    e = parts.get(part)
+    return store.load(e["sha256"]) if e else None
+
+def _meta(parts, name, default=None):
+    for e in parts.values():
+        if name in (e.get("meta") or {}):
+            return e["meta"][name]
+    return default
+
+# source별 재파싱: (store, key, {part: entry}) -> {테이블명: DataFrame}
+def replay_kok_list(store, key, parts):
+    # 브라우저 폴백 캡처가 있으면 그쪽 우선 (HTTP 응답엔 카드가 없었던 페이지)
+    html = _html(store, parts, "browser") or _html(store, parts, "http")
+    soup = crawl_utils.make_soup(html)
+    product_ids = cr_k.crawl_product_id(soup)
+    return {"ODS_KOK_PRICE_INFO": cr_k.crawl_sale_price_info(soup, product_ids)}
+
+def replay_kok_detail(store, key, parts):
+    basic_info, detail_info, personal_review, img_urls = cr_k.parse_kok_detail(_html(store, parts), key)
+    return {"ODS_KOK_PRODUCT_INFO": basic_info, "ODS_KOK_DETAIL_INFO": detail_info,
+            "ODS_KOK_REVIEW_EXAMPLE": personal_review, "ODS_KOK_IMAGE_INFO": img_urls}
+
+def replay_hns_schedule(store, key, parts):
+    return {"ODS_HOMESHOPPING_LIST": cr_hs.crawl_schedule_page(crawl_utils.make_soup(_html(store, parts)))}
+
+def replay_hyundai_schedule(store, key, parts):
+    data = json.loads(_html(store, parts))
+    return {"ODS_HOMESHOPPING_LIST": cr_hs.build_hyundai_schedule_df(data['respData']['broadItemList'],
+                                                                     _meta(parts, "homeshopping_id"))}
+
+def replay_ns_schedule(store, key, parts):
+    data = json.loads(_html(store, parts, "schedule"))['data']['resultData']['totalOrgan']
+    price_data = json.loads(_html(store, parts, "price"))['data']['resultData']
+    return {"ODS_HOMESHOPPING_LIST": cr_hs.build_ns_schedule_df(data, price_data, _meta(parts, "homeshopping_id"))}
+
+def replay_hns_detail(store, key, parts):
+    # 크롤러와 같은 순서: iframe → (없으면) 탭1 본문 → 탭2
+    rows = []
+    html = _html(store, parts, "tab1_iframe")
+    if html:
+        rows += cr_hs.parse_hns_item_tables(crawl_utils.make_soup(html), key)
+    if not rows and _html(store, parts, "tab1"):
+        rows += cr_hs.parse_hns_item_tables(crawl_utils.make_soup(_html(store, parts, "tab1")), key)
+    if _html(store, parts, "tab2"):
+        rows += cr_hs.parse_hns_item_tables(crawl_utils.make_soup(_html(store, parts, "tab2")), key)
+    return {"ODS_HOMESHOPPING_DETAIL_INFO": pd.DataFrame(rows, columns=["PRODUCT_ID", "DETAIL_COL", "DETAIL_VAL"])}
+
+def replay_hyundai_detail(store, key, parts):
+    url = next(iter(parts.values())).get("url") or f"https://www.hmall.com/md/pda/itemPtc?slitmCd={key}"
+    # 브라우저 렌더링 캡처가 있으면 그쪽 우선 (HTTP 응답에 빠진 항목이 있었던 상품), 이전 캡처는 part 없음
+    html = _html(store, parts, "browser") or _html(store, parts, "http") or _html(store, parts)
+    df_product_info, df_img_url, df_detail_info = cr_hs.parse_hmall_product(
+        crawl_utils.make_soup(html), url, _meta(parts, "homeshopping_id"))
+    return {"ODS_HOMESHOPPING_PRODUCT_INFO": df_product_info, "ODS_HOMESHOPPING_IMG_URL": df_img_url,
+            "ODS_HOMESHOPPING_DETAIL_INFO": df_detail_info}
+
+def replay_ns_detail(store, key, parts):
+    out = {}
+    html = _html(store, parts, "initial")
+    if html:
+        out["ODS_HOMESHOPPING_PRODUCT_INFO"] = cr_hs.ns_info_crawl(crawl_utils.make_soup(html), _meta(parts, "homeshopping_id"))
+    html = _html(store, parts, "button_1")
+    if html:
+        out["ODS_HOMESHOPPING_IMG_URL"] = cr_hs.ns_img_crawl(crawl_utils.make_soup(html), key)
+    html = _html(store, parts, "button_2")
+    if html:
+        out["ODS_HOMESHOPPING_DETAIL_INFO"] = cr_hs.ns_detail_crawl(crawl_utils.make_soup(html), key)
+    return out
+
+REPLAYERS = {
+    "kok_list": replay_kok_list,
+    "kok_detail": replay_kok_detail,
+    "hns_schedule": replay_hns_schedule,
+    "hyundai_schedule": replay_hyundai_schedule,
+    "ns_schedule": replay_ns_schedule,
+    "hns_detail": replay_hns_detail,
+    "hyundai_detail": replay_hyundai_detail,
+    "ns_detail": replay_ns_detail,
+}
+
+def replay(store, source: str, limit: int | None = None, latest_only: bool = True):
+    """
+    source의 캡처를 재파싱해 ({테이블명: DataFrame}, 처리 건수, 오류 건수, 소요 초) 반환
+    """
+    fn = REPLAYERS[source]
+    frames = {}
+    count = errors = 0
+    start = time.perf_counter()
+    for key, parts in store.iter_groups(source, latest_only=latest_only):
+        if limit and count >= limit:
+            break
+        count += 1
+        try:
+            result = fn(store, key, parts)
+        except Exception as e:
+            errors += 1
+            print(f"[REPLAY] [ERROR] {source}/{key}: {e}")
+            continue
+        for table, df in result.items():
+            frames.setdefault(table, []).append(df)
+    elapsed = time.perf_counter() - start
+    merged = {t: pd.concat(dfs, ignore_index=True) for t, dfs in frames.items()}
+    return merged, count, errors, elapsed
+
+def _run(store, source, args, parser):
+    crawl_utils.HTML_PARSER = parser
+    merged, count, errors, elapsed = replay(store, source, args.limit, not args.all)
+    print(f"[REPLAY] {source} ({parser}): {count}건 / 오류 {errors}건 / {elapsed:.2f}s")
+    for table, df in merged.items():
+        print(f"  - {table}: {len(df)}행")
+    return merged
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--dir", default=crawl_utils.CRAWL_CAPTURE_DIR, help="캡처 저장소 경로 (기본 CRAWL_CAPTURE_DIR)")
+    p.add_argument("--source", action="append", choices=sorted(REPLAYERS), help="재파싱할 source (반복 지정 가능, 기본 전체)")
+    p.add_argument("--limit", type=int, default=None)
+    p.add_argument("--all", action="store_true", help="최신 수집만이 아니라 모든 수집(fetch_id 단위) 캡처를 재파싱")
+    p.add_argument("--parser", default=crawl_utils.HTML_PARSER)
+    p.add_argument("--compare", default=None, help="같은 캡처를 이 파서로도 돌려 결과 비교 (예: html.parser)")
+    p.add_argument("--out", default=None, help="테이블별 결과 TSV 저장 경로")
+    args = p.parse_args()
+
+    if not args.dir or not os.path.isdir(args.dir):
+        p.error("캡처 저장소 경로가 없습니다 (--dir 또는 CRAWL_CAPTURE_DIR)")
+    store = crawl_utils.PageCaptureStore(args.dir)
+    sources = args.source or [s for s in store.sources() if s in REPLAYERS]
+
+    for source in sources:
+        merged = _run(store, source, args, args.parser)
+        if args.compare:
+            other = _run(store, source, args, args.compare)
+            for table in sorted(set(merged) | set(other)):
+                same = table in merged and table in other and crawl_utils._same_result(merged[table], other[table])
+                print(f"  [PARITY] {table}: {'일치' if same else '불일치'}")
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            for table, df in merged.items():
+                df.to_csv(os.path.join(args.out, f"{source}.{table}.txt"), sep="\t", index=False, encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
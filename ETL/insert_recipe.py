@@ -76,46 +76,22 @@ def insert_rawdata():
     df = pd.read_csv('./ETL/data/TB_RECIPE_SEARCH_241226.csv', encoding='utf-8')
     # mariaDB 연결
     conn, cur = utils.con_to_maria_ods()
-    # 데이터 삽입 쿼리 (19개 컬럼)
-    insert_query = """
-    INSERT IGNORE INTO ODS_RECIPE (
-        RCP_SNO, RCP_TTL, CKG_NM, RGTR_ID, RGTR_NM, INQ_CNT,
-        RCMM_CNT, SRAP_CNT, CKG_MTH_ACTO_NM, CKG_STA_ACTO_NM,
-        CKG_MTRL_ACTO_NM, CKG_KND_ACTO_NM, CKG_IPDC, CKG_MTRL_CN,
-        CKG_INBUN_NM, CKG_DODF_NM, CKG_TIME_NM, FIRST_REG_DT, RCP_IMG_URL
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
+    # 적재 컬럼 (19개 컬럼)
+    columns = [
+        'RCP_SNO', 'RCP_TTL', 'CKG_NM', 'RGTR_ID', 'RGTR_NM', 'INQ_CNT',
+        'RCMM_CNT', 'SRAP_CNT', 'CKG_MTH_ACTO_NM', 'CKG_STA_ACTO_NM',
+        'CKG_MTRL_ACTO_NM', 'CKG_KND_ACTO_NM', 'CKG_IPDC', 'CKG_MTRL_CN',
+        'CKG_INBUN_NM', 'CKG_DODF_NM', 'CKG_TIME_NM', 'FIRST_REG_DT', 'RCP_IMG_URL'
+    ]
 
     # 컬럼 정제 (공백 제거 + 대문자 변환)
     df.columns = [col.strip().upper() for col in df.columns]
-    df = df.where(pd.notnull(df), None)
-        
-    # INSERT 수행         
-    for i, row in df.iterrows():
-        try:
-            cur.execute(insert_query, (
-                int(row['RCP_SNO']) if pd.notna(row['RCP_SNO']) else None,
-                row['RCP_TTL'],
-                row['CKG_NM'],
-                row['RGTR_ID'],
-                row['RGTR_NM'],
-                int(row['INQ_CNT']) if pd.notna(row['INQ_CNT']) else None,
-                int(row['RCMM_CNT']) if pd.notna(row['RCMM_CNT']) else None,
-                int(row['SRAP_CNT']) if pd.notna(row['SRAP_CNT']) else None,
-                row['CKG_MTH_ACTO_NM'],
-                row['CKG_STA_ACTO_NM'],
-                row['CKG_MTRL_ACTO_NM'],
-                row['CKG_KND_ACTO_NM'],
-                row['CKG_IPDC'],
-                row['CKG_MTRL_CN'],
-                row['CKG_INBUN_NM'],
-                row['CKG_DODF_NM'],
-                row['CKG_TIME_NM'],
-                row['FIRST_REG_DT'],
-                row['RCP_IMG_URL']
-            ))
-        except Exception as e:
-            print(f"Insert error on row {i}: {e}")
+    # 숫자 컬럼은 정수로 (NaN 섞인 float → '1.0' 형태로 저장되는 것 방지)
+    for col in ['RCP_SNO', 'INQ_CNT', 'RCMM_CNT', 'SRAP_CNT']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+
+    # LOAD DATA LOCAL INFILE 일괄 적재 (실패 시 INSERT 경로로 폴백)
+    utils.insert_df_into_db(conn, df[columns], 'ODS_RECIPE', 'IGNORE', method='load')
 
     print("⭕ INSERT TO ODS_RECIPE")
 
@@ -126,49 +102,34 @@ def preprocess_rcp():
     # mariaDB 연결
     conn_o, cur_o = utils.con_to_maria_ods()
     conn_s, cur_s = utils.con_to_maria_service()
-    # 테이블 로드
-    cur_o.execute('SELECT * FROM ODS_RECIPE')
-    rows = cur_o.fetchall()
-    columns = [desc[0] for desc in cur_o.description]  # 컬럼명 추출
-    df = pd.DataFrame(rows, columns=columns)
-    
-    # 컬럼 정제 (공백 제거 + 대문자 변환)
-    df.columns = [col.strip().upper() for col in df.columns]
-    df = df.where(pd.notnull(df), None)
-    
-    # 전처리 - NaN 포함 row 제거
-    df = df.dropna(subset=[
-        'RCP_SNO', 'RCP_TTL', 'CKG_NM', 'SRAP_CNT',
-        'CKG_STA_ACTO_NM', 'CKG_MTRL_ACTO_NM', 'CKG_KND_ACTO_NM',
-        'CKG_IPDC', 'CKG_MTRL_CN', 'CKG_INBUN_NM', 'RCP_IMG_URL'
-    ])
+    # 테이블 로드 (서버 사이드 커서로 청크 단위 처리)
+    for df in utils.stream_query(conn_o, 'SELECT * FROM ODS_RECIPE'):
+        # 컬럼 정제 (공백 제거 + 대문자 변환)
+        df.columns = [col.strip().upper() for col in df.columns]
+        df = df.where(pd.notnull(df), None)
 
-    # INSERT 쿼리 (컬럼명 일치)
-    insert_query = """
-        INSERT IGNORE INTO FCT_RECIPE (
-            RECIPE_ID, RECIPE_TITLE, COOKING_NAME,
-            SCRAP_COUNT, COOKING_CASE_NAME,
-            COOKING_CATEGORY_NAME, COOKING_INTRODUCTION,
-            NUMBER_OF_SERVING, THUMBNAIL_URL
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    
-    # INSERT 수행
-    for i, row in df.iterrows():
-        try:
-            cur_s.execute(insert_query, (
-                int(row['RCP_SNO']),
-                row['RCP_TTL'],
-                row['CKG_NM'],
-                int(row['SRAP_CNT']),
-                row['CKG_STA_ACTO_NM'],
-                row['CKG_KND_ACTO_NM'],
-                row['CKG_IPDC'],
-                row['CKG_INBUN_NM'],
-                row['RCP_IMG_URL']
-            ))
-        except Exception as e:
-            print(f"Insert error on row {i}: {e}")
+        # 전처리 - NaN 포함 row 제거
+        df = df.dropna(subset=[
+            'RCP_SNO', 'RCP_TTL', 'CKG_NM', 'SRAP_CNT',
+            'CKG_STA_ACTO_NM', 'CKG_MTRL_ACTO_NM', 'CKG_KND_ACTO_NM',
+            'CKG_IPDC', 'CKG_MTRL_CN', 'CKG_INBUN_NM', 'RCP_IMG_URL'
+        ])
+        if df.empty:
+            continue
+
+        # FCT_RECIPE 컬럼명으로 매핑 후 INSERT IGNORE
+        fct_df = pd.DataFrame({
+            'RECIPE_ID': df['RCP_SNO'].astype('int64'),
+            'RECIPE_TITLE': df['RCP_TTL'],
+            'COOKING_NAME': df['CKG_NM'],
+            'SCRAP_COUNT': df['SRAP_CNT'].astype('int64'),
+            'COOKING_CASE_NAME': df['CKG_STA_ACTO_NM'],
+            'COOKING_CATEGORY_NAME': df['CKG_KND_ACTO_NM'],
+            'COOKING_INTRODUCTION': df['CKG_IPDC'],
+            'NUMBER_OF_SERVING': df['CKG_INBUN_NM'],
+            'THUMBNAIL_URL': df['RCP_IMG_URL'],
+        })
+        utils.insert_df_into_db(conn_s, fct_df, 'FCT_RECIPE', 'IGNORE')
 
     print("⭕ INSERT TO FCT_RECIPE")
 
@@ -227,34 +188,33 @@ def preprocess_mtrl():
     conn_s, cur_s = utils.con_to_maria_service()
 
     # ✅ 전체 재료 문자열 불러오기
-    cur_s.execute('''SELECT RECIPE_ID FROM FCT_RECIPE''')
-    rows = cur_s.fetchall()
-    rcp_id_list = [r[0] for r in rows]
-    list_to_text = ','.join(map(str,rcp_id_list))
-    cur_o.execute(fr'''
-                        SELECT 
-                            b.RCP_SNO, 
-                        CASE
-                            WHEN LOCATE('|', b.cleaned) > 0 THEN
-                            CONCAT(SUBSTRING(b.cleaned, 1, LOCATE('|', b.cleaned) - 1),
-                                    SUBSTRING(b.cleaned, LOCATE('|', b.cleaned) + 1))
-                            ELSE b.cleaned
-                        END AS cleaned
-                        FROM (
+    # FCT_RECIPE에 있는 레시피만 (ID 리스트 대신 EXISTS 조인)
+    with utils.anti_join_filter(conn_o, "o.RCP_SNO", ref_conn=conn_s,
+                                ref_table="FCT_RECIPE", ref_col="RECIPE_ID", anti=False) as cond:
+        cur_o.execute(    fr'''
                             SELECT 
-                                a.RCP_SNO, 
-                                REGEXP_REPLACE(a.cleaned_text, '\\s*\\|\\s*', '|') AS cleaned 
+                                b.RCP_SNO, 
+                            CASE
+                                WHEN LOCATE('|', b.cleaned) > 0 THEN
+                                CONCAT(SUBSTRING(b.cleaned, 1, LOCATE('|', b.cleaned) - 1),
+                                        SUBSTRING(b.cleaned, LOCATE('|', b.cleaned) + 1))
+                                ELSE b.cleaned
+                            END AS cleaned
                             FROM (
                                 SELECT 
-                                    RCP_SNO, 
-                                    REGEXP_REPLACE(CKG_MTRL_CN, '\\[[^]]+\\]', '|') AS cleaned_text
-                                FROM ODS_RECIPE 
-                                WHERE RCP_SNO IN ({list_to_text})
-                            ) a
-                        ) b;
-                    '''
-                    )
-    rows = cur_o.fetchall()
+                                    a.RCP_SNO, 
+                                    REGEXP_REPLACE(a.cleaned_text, '\\s*\\|\\s*', '|') AS cleaned 
+                                FROM (
+                                    SELECT 
+                                        RCP_SNO, 
+                                        REGEXP_REPLACE(CKG_MTRL_CN, '\\[[^]]+\\]', '|') AS cleaned_text
+                                    FROM ODS_RECIPE o
+                                    WHERE {cond}
+                                ) a
+                            ) b;
+                        '''
+                        )
+        rows = cur_o.fetchall()
 
     all_dfs = []
 
@@ -272,23 +232,15 @@ def preprocess_mtrl():
     # 2. 공백 제거 후 ''인 경우 제거
     full_df = full_df[full_df['MTRL_NAME'] != '']
 
-    # ✅ 전체 삽입
-    insert_query = """
-        INSERT INTO FCT_MTRL (RECIPE_ID, MATERIAL_NAME, MEASURE_AMOUNT, MEASURE_UNIT, DETAILS)
-        VALUES (?, ?, ?, ?, ?)
-    """
-
-    for _, row in full_df.iterrows():
-        try:
-            cur_s.execute(insert_query, (
-                row['RCP_SNO'],
-                row['MTRL_NAME'],
-                row['MTRL_CNT'],
-                row['MTRL_UNIT'],
-                row['MTRL_DETAIL']
-            ))
-        except Exception as e:
-            print(f"❌ Insert error on RCP_SNO {row['RCP_SNO']}: {e}")
+    # ✅ 전체 삽입 (LOAD DATA LOCAL INFILE, MATERIAL_ID는 AUTO_INCREMENT)
+    mtrl_df = full_df[['RCP_SNO', 'MTRL_NAME', 'MTRL_CNT', 'MTRL_UNIT', 'MTRL_DETAIL']].rename(columns={
+        'RCP_SNO': 'RECIPE_ID',
+        'MTRL_NAME': 'MATERIAL_NAME',
+        'MTRL_CNT': 'MEASURE_AMOUNT',
+        'MTRL_UNIT': 'MEASURE_UNIT',
+        'MTRL_DETAIL': 'DETAILS'
+    })
+    utils.insert_df_into_db(conn_s, mtrl_df, 'FCT_MTRL', method='load')
 
     print("⭕ INSERT TO FCT_MTRL")
 
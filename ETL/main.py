@@ -54,6 +54,15 @@ def create_tables():
         print('STR_TO_NUM 함수 생성')
     else:
         print('STR_TO_NUM 함수 확인')
+    # data_counting watermark 상태 테이블
+    cur_o.execute(f"""
+        CREATE TABLE IF NOT EXISTS {utils.DATA_COUNT_STATE_TABLE} (
+            STATE_KEY VARCHAR(200) PRIMARY KEY,
+            WM BIGINT NOT NULL,
+            CNT BIGINT NOT NULL,
+            BASED_AT DATETIME NOT NULL
+        );
+    """)
     cur_o.close()
     conn_o.close()
     cur_s.close()
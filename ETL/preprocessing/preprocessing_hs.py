@@ -1,6 +1,5 @@
 import pandas as pd
 import ETL.utils.utils as utils
-import time
 def create_fct_homeshopping(): # 홈쇼핑 관련 데이터 FCT TABLE 생성 함수
     conn, cur_s = utils.con_to_maria_service()
     create_list = """
@@ -76,209 +75,153 @@ def create_fct_homeshopping(): # 홈쇼핑 관련 데이터 FCT TABLE 생성 함
     conn.close()
 
 def slt_to_cln(table_name): # FCT TABLE로 옮길 데이터를 ODS TABLE에서 SELECT. FCT_와 ODS_를 제외한 테이블명 일치 필요
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-    cur_s.execute(f"""
-    SELECT COLUMN_NAME
-    FROM INFORMATION_SCHEMA.COLUMNS
-    WHERE TABLE_SCHEMA = 'SERVICE_DB'
-    AND TABLE_NAME = 'FCT_{table_name}'
-                  """)
-    col_list = [row[0] for row in cur_s.fetchall()]
-    i = ','.join(map(str,col_list))
-
-    cur_s.execute(f'''
-        SELECT
-            DISTINCT PRODUCT_ID
-        FROM FCT_{table_name};
-                  ''')
-    id_list = [row[0] for row in cur_s.fetchall()]
-    j = ','.join(map(str,id_list))
-    add_query = f"WHERE PRODUCT_ID NOT IN ({j})" if j else ""
-
-    cur_o.execute(f"""
-    SELECT 
-        {i}
-    FROM ODS_{table_name}
-    {add_query};
-    """)
-    rows = cur_o.fetchall()
-    df = pd.DataFrame(rows, columns=col_list)
+    with utils.pooled_conn('ods') as (conn_o, cur_o), utils.pooled_conn('service') as (conn_s, cur_s):
+        cur_s.execute(f"""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = 'SERVICE_DB'
+        AND TABLE_NAME = 'FCT_{table_name}'
+                      """)
+        col_list = [row[0] for row in cur_s.fetchall()]
+        i = ','.join(map(str,col_list))
 
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
-    return df
+        # FCT에 없는 상품만 (anti-join) → 서버 사이드 커서로 청크 단위 yield (제너레이터)
+        with utils.anti_join_filter(conn_o, "o.PRODUCT_ID", ref_conn=conn_s,
+                                    ref_table=f"FCT_{table_name}", ref_col="PRODUCT_ID") as cond:
+            yield from utils.stream_query(conn_o, f"""
+            SELECT 
+                {i}
+            FROM ODS_{table_name} o
+            WHERE {cond};
+            """)
 
 def prep_homeshop_list():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-    cur_s.execute('''
-        SELECT
-            LIVE_ID
-        FROM FCT_HOMESHOPPING_LIST;
-                  ''')
-    col_list = [row[0] for row in cur_s.fetchall()]
-    i = ','.join(map(str,col_list))
-    add_query = f"WHERE LIVE_ID NOT IN ({i})" if i else ""
-    cur_o.execute(f'''
-        SELECT
-            LIVE_ID,
-            HOMESHOPPING_ID,
-            LIVE_DATE,
-            LIVE_TIME,
-            PROMOTION_TYPE,
-            PRODUCT_ID,
-            PRODUCT_NAME,
-            THUMB_IMG_URL
-        FROM ODS_HOMESHOPPING_LIST {add_query};
-                  ''')
-    rows = cur_o.fetchall()
-    if not rows:  # 빈 결과 가드
-        cur_o.close(); conn_o.close()
-        cur_s.close(); conn_s.close()
-        return
-    b_df = pd.DataFrame(rows, columns=[ 'LIVE_ID',
-                                        'HOMESHOPPING_ID',
-                                        'LIVE_DATE',
-                                        'LIVE_TIME',
-                                        'PROMOTION_TYPE',
-                                        'PRODUCT_ID',
-                                        'PRODUCT_NAME',
-                                        'THUMB_IMG_URL'])
-    live_time = (
-        b_df['LIVE_TIME']
-        .astype(str)
-        .str.replace('\u00A0', ' ', regex=False)   # NBSP 제거
-        .str.replace('\u200B', '', regex=False)    # zero-width space 제거
-        .str.replace('[～〜∼]', '~', regex=True)    # 전각/유사 틸드 -> ~
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.strip()
-    )
+    with utils.pooled_conn('ods') as (conn_o, cur_o), utils.pooled_conn('service') as (conn_s, cur_s):
+        # FCT에 없는 편성만 (anti-join)
+        with utils.anti_join_filter(conn_o, "o.LIVE_ID", ref_conn=conn_s,
+                                    ref_table="FCT_HOMESHOPPING_LIST", ref_col="LIVE_ID") as cond:
+            cur_o.execute(f'''
+                SELECT
+                    LIVE_ID,
+                    HOMESHOPPING_ID,
+                    LIVE_DATE,
+                    LIVE_TIME,
+                    PROMOTION_TYPE,
+                    PRODUCT_ID,
+                    PRODUCT_NAME,
+                    THUMB_IMG_URL
+                FROM ODS_HOMESHOPPING_LIST o WHERE {cond};
+                          ''')
+            rows = cur_o.fetchall()
+        if not rows:  # 빈 결과 가드
+            return
+        b_df = pd.DataFrame(rows, columns=[ 'LIVE_ID',
+                                            'HOMESHOPPING_ID',
+                                            'LIVE_DATE',
+                                            'LIVE_TIME',
+                                            'PROMOTION_TYPE',
+                                            'PRODUCT_ID',
+                                            'PRODUCT_NAME',
+                                            'THUMB_IMG_URL'])
+        live_time = (
+            b_df['LIVE_TIME']
+            .astype(str)
+            .str.replace('\u00A0', ' ', regex=False)   # NBSP 제거
+            .str.replace('\u200B', '', regex=False)    # zero-width space 제거
+            .str.replace('[～〜∼]', '~', regex=True)    # 전각/유사 틸드 -> ~
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip()
+        )
 
-    # 2) HH:MM ~ HH:MM 패턴만 추출 (매치 실패는 NaN으로 남음)
-    times = live_time.str.extract(
-        r'(?P<LIVE_START_TIME>\d{1,2}:\d{2})\s*~\s*(?P<LIVE_END_TIME>\d{1,2}:\d{2})'
-    )
-    # 3) 타입 변환
-    b_df['LIVE_START_TIME'] = pd.to_datetime(
-        times['LIVE_START_TIME'], format='%H:%M', errors='coerce'
-    ).dt.time
-    b_df['LIVE_END_TIME'] = pd.to_datetime(
-        times['LIVE_END_TIME'], format='%H:%M', errors='coerce'
-    ).dt.time
-    
-    b_df['LIVE_DATE'] = pd.to_datetime(b_df['LIVE_DATE'], format='%Y%m%d')
-    a_df = b_df.drop(columns=['LIVE_TIME'])
-    utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_LIST', "IGNORE") 
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+        # 2) HH:MM ~ HH:MM 패턴만 추출 (매치 실패는 NaN으로 남음)
+        times = live_time.str.extract(
+            r'(?P<LIVE_START_TIME>\d{1,2}:\d{2})\s*~\s*(?P<LIVE_END_TIME>\d{1,2}:\d{2})'
+        )
+        # 3) 타입 변환
+        b_df['LIVE_START_TIME'] = pd.to_datetime(
+            times['LIVE_START_TIME'], format='%H:%M', errors='coerce'
+        ).dt.time
+        b_df['LIVE_END_TIME'] = pd.to_datetime(
+            times['LIVE_END_TIME'], format='%H:%M', errors='coerce'
+        ).dt.time
+        
+        b_df['LIVE_DATE'] = pd.to_datetime(b_df['LIVE_DATE'], format='%Y%m%d')
+        a_df = b_df.drop(columns=['LIVE_TIME'])
+        utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_LIST', "IGNORE") 
 # 편성표 변경 필터 테이블
 def prep_cur_schedule():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-    cur_s.execute('''DELETE FROM FCT_HOMESHOPPING_CURRENT_SCHEDULE;''')
-    cur_o.execute('''SELECT * FROM ODS_HOMESHOPPING_CURRENT_SCHEDULE;''')
-    rows = cur_o.fetchall()
-    if not rows:  # 빈 결과 가드
-        cur_o.close(); conn_o.close()
-        cur_s.close(); conn_s.close()
-        return
-    b_df = pd.DataFrame(rows, columns=['HOMESHOPPING_ID',
-                                    'LIVE_DATE',
-                                    'LIVE_TIME',
-                                    'PRODUCT_ID'])
-    live_time = (
-        b_df['LIVE_TIME']
-        .astype(str)
-        .str.replace('\u00A0', ' ', regex=False)   # NBSP 제거
-        .str.replace('\u200B', '', regex=False)    # zero-width space 제거
-        .str.replace('[～〜∼]', '~', regex=True)    # 전각/유사 틸드 -> ~
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.strip()
-    )
+    with utils.pooled_conn('ods') as (conn_o, cur_o), utils.pooled_conn('service') as (conn_s, cur_s):
+        cur_s.execute('''DELETE FROM FCT_HOMESHOPPING_CURRENT_SCHEDULE;''')
+        cur_o.execute('''SELECT * FROM ODS_HOMESHOPPING_CURRENT_SCHEDULE;''')
+        rows = cur_o.fetchall()
+        if not rows:  # 빈 결과 가드
+            return
+        b_df = pd.DataFrame(rows, columns=['HOMESHOPPING_ID',
+                                        'LIVE_DATE',
+                                        'LIVE_TIME',
+                                        'PRODUCT_ID'])
+        live_time = (
+            b_df['LIVE_TIME']
+            .astype(str)
+            .str.replace('\u00A0', ' ', regex=False)   # NBSP 제거
+            .str.replace('\u200B', '', regex=False)    # zero-width space 제거
+            .str.replace('[～〜∼]', '~', regex=True)    # 전각/유사 틸드 -> ~
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip()
+        )
 
-    # 2) HH:MM ~ HH:MM 패턴만 추출 (매치 실패는 NaN으로 남음)
-    times = live_time.str.extract(
-        r'(?P<LIVE_START_TIME>\d{1,2}:\d{2})\s*~\s*(?P<LIVE_END_TIME>\d{1,2}:\d{2})'
-    )
-    # 3) 타입 변환
-    b_df['LIVE_START_TIME'] = pd.to_datetime(
-        times['LIVE_START_TIME'], format='%H:%M', errors='coerce'
-    ).dt.time
-    b_df['LIVE_END_TIME'] = pd.to_datetime(
-        times['LIVE_END_TIME'], format='%H:%M', errors='coerce'
-    ).dt.time
-    
-    b_df['LIVE_DATE'] = pd.to_datetime(b_df['LIVE_DATE'], format='%Y%m%d')
-    a_df = b_df.drop(columns=['LIVE_TIME'])
-    utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_CURRENT_SCHEDULE') 
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+        # 2) HH:MM ~ HH:MM 패턴만 추출 (매치 실패는 NaN으로 남음)
+        times = live_time.str.extract(
+            r'(?P<LIVE_START_TIME>\d{1,2}:\d{2})\s*~\s*(?P<LIVE_END_TIME>\d{1,2}:\d{2})'
+        )
+        # 3) 타입 변환
+        b_df['LIVE_START_TIME'] = pd.to_datetime(
+            times['LIVE_START_TIME'], format='%H:%M', errors='coerce'
+        ).dt.time
+        b_df['LIVE_END_TIME'] = pd.to_datetime(
+            times['LIVE_END_TIME'], format='%H:%M', errors='coerce'
+        ).dt.time
+        
+        b_df['LIVE_DATE'] = pd.to_datetime(b_df['LIVE_DATE'], format='%Y%m%d')
+        a_df = b_df.drop(columns=['LIVE_TIME'])
+        utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_CURRENT_SCHEDULE') 
 
 def prep_homeshop_prd():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-    b_df = slt_to_cln('HOMESHOPPING_PRODUCT_INFO')
-
-    for i in ['SALE_PRICE','DC_RATE','DC_PRICE']:
-        b_df[i] = (
-            b_df[i]
-            .astype(str)                    
-            .str.replace(r'[^0-9]', '', regex=True)
-        )
-        b_df[i] = pd.to_numeric(b_df[i], errors='coerce')
-        b_df[i] = b_df[i].fillna(0).astype('int64')
+    with utils.pooled_conn('service') as (conn_s, cur_s):
+        for b_df in slt_to_cln('HOMESHOPPING_PRODUCT_INFO'):
+            for i in ['SALE_PRICE','DC_RATE','DC_PRICE']:
+                b_df[i] = (
+                    b_df[i]
+                    .astype(str)                    
+                    .str.replace(r'[^0-9]', '', regex=True)
+                )
+                b_df[i] = pd.to_numeric(b_df[i], errors='coerce')
+                b_df[i] = b_df[i].fillna(0).astype('int64')
 
-    utils.insert_df_into_db(conn_s, b_df, 'FCT_HOMESHOPPING_PRODUCT_INFO', "IGNORE")
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+            utils.insert_df_into_db(conn_s, b_df, 'FCT_HOMESHOPPING_PRODUCT_INFO', "IGNORE")
 def prep_homeshop_dtl():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-    b_df = slt_to_cln('HOMESHOPPING_DETAIL_INFO')
-    a_df = b_df.astype({
-            'PRODUCT_ID':'int64'
-    })
-    utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_DETAIL_INFO', "IGNORE")
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+    with utils.pooled_conn('service') as (conn_s, cur_s):
+        for b_df in slt_to_cln('HOMESHOPPING_DETAIL_INFO'):
+            a_df = b_df.astype({
+                    'PRODUCT_ID':'int64'
+            })
+            utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_DETAIL_INFO', "IGNORE")
 def prep_homeshop_img():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
-
-    b_df = slt_to_cln('HOMESHOPPING_IMG_URL')
-    a_df = b_df.astype({
-            'PRODUCT_ID':'int64'
-    })
-    utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_IMG_URL', "IGNORE")
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+    with utils.pooled_conn('service') as (conn_s, cur_s):
+        for b_df in slt_to_cln('HOMESHOPPING_IMG_URL'):
+            a_df = b_df.astype({
+                    'PRODUCT_ID':'int64'
+            })
+            utils.insert_df_into_db(conn_s, a_df, 'FCT_HOMESHOPPING_IMG_URL', "IGNORE")
 def prep_homeshop_info():
-    conn_o, cur_o = utils.con_to_maria_ods()
-    conn_s, cur_s = utils.con_to_maria_service()
+    with utils.pooled_conn('ods') as (conn_o, cur_o), utils.pooled_conn('service') as (conn_s, cur_s):
 
-    cur_o.execute("""
-        SELECT * FROM HOMESHOPPING_INFO;
-                  """)
-    bdf = cur_o.fetchall()
-    df = pd.DataFrame(bdf, columns=['HOMESHOPPING_ID','HOMESHOPPING_NAME','HOMESHOPPING_CHANNEL','LIVE_URL'])
-    utils.insert_df_into_db(conn_s, df, 'HOMESHOPPING_INFO', "IGNORE")
-    cur_o.close()
-    conn_o.close()
-    cur_s.close()
-    conn_s.close()
+        cur_o.execute("""
+            SELECT * FROM HOMESHOPPING_INFO;
+                      """)
+        bdf = cur_o.fetchall()
+        df = pd.DataFrame(bdf, columns=['HOMESHOPPING_ID','HOMESHOPPING_NAME','HOMESHOPPING_CHANNEL','LIVE_URL'])
+        utils.insert_df_into_db(conn_s, df, 'HOMESHOPPING_INFO', "IGNORE")
 def main(): # 홈쇼핑 데이터 전처리 및 FCT TABLE 적재 통합 코드
     conn_s, cur_s = utils.con_to_maria_service()
     prep_homeshop_info()
@@ -1,7 +1,5 @@
 import sys
 import ETL.utils.utils as utils
-import pandas as pd
-import numpy as np
 
 def create_tables_kok_fct(): # CREATE FCT TABLES IN SERVICE_DB
     # FCT 테이블 생성 쿼리
@@ -81,6 +79,13 @@ def create_tables_kok_fct(): # CREATE FCT TABLES IN SERVICE_DB
             UNIQUE KEY UNIQ_PROD_COL (KOK_PRODUCT_ID, KOK_DISCOUNT_RATE, KOK_DISCOUNTED_PRICE)
         );
     ''']
+    # 가격 변동 재수집분의 FCT 반영 상태 (상품별로 반영한 ODS_KOK_PRICE_DELTA.RENEWED_AT)
+    create_sync = '''
+        CREATE TABLE IF NOT EXISTS FCT_KOK_RENEW_SYNC (
+            KOK_PRODUCT_ID INT PRIMARY KEY,
+            SYNCED_AT TIMESTAMP NULL DEFAULT NULL
+        );
+    '''
 
     # mariaDB : SERVICE_DB 연결
     conn, cur = utils.con_to_maria_service()
@@ -88,6 +93,24 @@ def create_tables_kok_fct(): # CREATE FCT TABLES IN SERVICE_DB
     # 쿼리 실행
     for query in queries:
         cur.execute(query)
+    cur.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'FCT_KOK_RENEW_SYNC';
+    """)
+    sync_exists = cur.fetchone()[0]
+    cur.execute(create_sync)
+    if not sync_exists:
+        # 처음 만들 때: 하루 지난 재수집분은 이미 FCT에 반영된 것으로 간주
+        conn_o, cur_o = utils.con_to_maria_ods()
+        cur_o.execute('''
+            SELECT CAST(KOK_PRODUCT_ID AS INT), RENEWED_AT FROM ODS_KOK_PRICE_DELTA
+            WHERE RENEWED_AT < NOW() - INTERVAL 1 DAY;
+        ''')
+        synced = cur_o.fetchall()
+        cur_o.close()
+        conn_o.close()
+        if synced:
+            cur.executemany("INSERT IGNORE INTO FCT_KOK_RENEW_SYNC (KOK_PRODUCT_ID, SYNCED_AT) VALUES (%s, %s);", synced)
     cur.close()
     conn.close()
 
@@ -137,18 +160,11 @@ def preprocess_kok(): # PREPROCESSING ODS TABLES / INSERT TO FCT TABLES
                 SELECT DISTINCT KOK_PRODUCT_ID FROM FCT_KOK_PRODUCT_INFO;
                     """)
         rows = cur_s.fetchall()
+        # 적재 전 FCT 상품 ID 스냅샷 (이번 실행에 추가되는 상품의 이미지/상세/리뷰도 함께 옮기기 위함)
         dist_list = [r[0] for r in rows]
-        dist_text = ','.join(map(str,dist_list))
 
-        def w_query(dist_text):
-            if dist_text :
-                where_query = f'''WHERE KOK_PRODUCT_ID NOT IN ({dist_text})'''
-            else : 
-                where_query = ''
-            return where_query
-        
-        # SELECT query => DataFrame
-        def select_from_ods_kok_price_info(dist_text, cur_o):
+        # SELECT query => DataFrame 청크 (서버 사이드 커서 스트리밍)
+        def select_from_ods_kok_price_info(cond, cur_o):
             query = f'''
                 SELECT
                     CAST(KOK_PRICE_ID AS INT) AS KOK_PRICE_ID,
@@ -157,12 +173,8 @@ def preprocess_kok(): # PREPROCESSING ODS TABLES / INSERT TO FCT TABLES
                     KOK_DISCOUNTED_PRICE
                 FROM ODS_KOK_PRICE_INFO;
                 '''
-            cur_o.execute(query)
-            rows = cur_o.fetchall()
-            cols = [desc[0] for desc in cur_o.description]  # 컬럼명 가져오기
-            df = pd.DataFrame(rows, columns=cols)
-            return df        
-        def select_from_ods_kok_product_info(dist_text, cur_o):
+            return utils.stream_query(conn_o, query)        
+        def select_from_ods_kok_product_info(cond, cur_o):
             query = f'''
                 SELECT
                     CAST(KOK_PRODUCT_ID AS INT) AS KOK_PRODUCT_ID,
@@ -193,48 +205,32 @@ def preprocess_kok(): # PREPROCESSING ODS TABLES / INSERT TO FCT TABLES
                     KOK_CO_ADDR, 
                     KOK_RETURN_ADDR, 
                     KOK_EXCHANGE_ADDR
-                FROM ODS_KOK_PRODUCT_INFO
-                {w_query(dist_text)};
+                FROM ODS_KOK_PRODUCT_INFO o
+                WHERE {cond};
                 '''
-            cur_o.execute(query)
-            rows = cur_o.fetchall()
-            cols = [desc[0] for desc in cur_o.description]  # 컬럼명 가져오기
-            if not rows:
-                df = pd.DataFrame(columns=cols)
-                return df
-            df = pd.DataFrame(rows, columns=cols, dtype=object)
-            df = df.where(pd.notna(df), None)           # NaN/NaT → None
-            return df
-        def select_from_ods_kok_image_info(dist_text, cur_o):
+            return utils.stream_query(conn_o, query)
+        def select_from_ods_kok_image_info(cond, cur_o):
             query = f'''
                 SELECT
                     CAST(KOK_IMG_ID AS INT) AS KOK_IMG_ID,
                     CAST(KOK_PRODUCT_ID AS INT) AS KOK_PRODUCT_ID,
                     KOK_IMG_URL
-                FROM ODS_KOK_IMAGE_INFO
-                {w_query(dist_text)};
+                FROM ODS_KOK_IMAGE_INFO o
+                WHERE {cond};
                     '''
-            cur_o.execute(query)
-            rows = cur_o.fetchall()
-            cols = [desc[0] for desc in cur_o.description]  # 컬럼명 가져오기
-            df = pd.DataFrame(rows, columns=cols)
-            return df     
-        def select_from_ods_kok_detail_info(dist_text, cur_o):
+            return utils.stream_query(conn_o, query)     
+        def select_from_ods_kok_detail_info(cond, cur_o):
             query = f'''
                 SELECT
                     CAST(KOK_DETAIL_COL_ID AS INT) AS KOK_DETAIL_COL_ID,
                     CAST(KOK_PRODUCT_ID AS INT) AS KOK_PRODUCT_ID,
                     KOK_DETAIL_COL,
                     KOK_DETAIL_VAL
-                FROM ODS_KOK_DETAIL_INFO
-                {w_query(dist_text)};
+                FROM ODS_KOK_DETAIL_INFO o
+                WHERE {cond};
                     '''
-            cur_o.execute(query)
-            rows = cur_o.fetchall()
-            cols = [desc[0] for desc in cur_o.description]  # 컬럼명 가져오기
-            df = pd.DataFrame(rows, columns=cols)
-            return df      
-        def select_from_ods_kok_review_example(dist_text, cur_o):
+            return utils.stream_query(conn_o, query)      
+        def select_from_ods_kok_review_example(cond, cur_o):
             query = f'''
                 SELECT
                     CAST(KOK_REVIEW_ID AS INT) AS KOK_REVIEW_ID,
@@ -246,31 +242,62 @@ def preprocess_kok(): # PREPROCESSING ODS TABLES / INSERT TO FCT TABLES
                     KOK_DELIVERY_EVAL,
                     KOK_TASTE_EVAL, 
                     KOK_REVIEW_TEXT
-                FROM ODS_KOK_REVIEW_EXAMPLE
-                {w_query(dist_text)};
+                FROM ODS_KOK_REVIEW_EXAMPLE o
+                WHERE {cond};
                     '''
-            cur_o.execute(query)
-            rows = cur_o.fetchall()
-            cols = [desc[0] for desc in cur_o.description]  # 컬럼명 가져오기
-            df = pd.DataFrame(rows, columns=cols)
-            return df
+            return utils.stream_query(conn_o, query)
+
+        # 청크 단위로 읽으면서 바로 적재 (ODS 전체를 메모리에 올리지 않음)
+        def insert_chunks(chunks, table_name, IGNORE='IGNORE', **kwargs):
+            for chunk in chunks:
+                utils.insert_df_into_db(
+                    conn_s, chunk, table_name, IGNORE, **kwargs)
 
-        # INSERT TO FCT KOK
-        utils.insert_df_into_db(
-            conn_s, utils.replace_nan_with_none(select_from_ods_kok_price_info(dist_text, cur_o)), 'FCT_KOK_PRICE_INFO', 'IGNORE')
-        print('⭕ [KOK] INSERT TO FCT_KOK_PRICE_INFO')
-        utils.insert_df_into_db(
-            conn_s, utils.replace_nan_with_none(select_from_ods_kok_product_info(dist_text, cur_o)), 'FCT_KOK_PRODUCT_INFO', 'IGNORE')
-        print('⭕ [KOK] INSERT TO FCT_KOK_PRODUCT_INFO')
-        utils.insert_df_into_db(
-            conn_s, utils.replace_nan_with_none(select_from_ods_kok_image_info(dist_text, cur_o)), 'FCT_KOK_IMAGE_INFO', 'IGNORE')
-        print('⭕ [KOK] INSERT TO FCT_KOK_IMAGE_INFO')
-        utils.insert_df_into_db(
-            conn_s, utils.replace_nan_with_none(select_from_ods_kok_detail_info(dist_text, cur_o)), 'FCT_KOK_DETAIL_INFO', 'IGNORE')
-        print('⭕ [KOK] INSERT TO FCT_KOK_DETAIL_INFO')
-        utils.insert_df_into_db(
-            conn_s, utils.replace_nan_with_none(select_from_ods_kok_review_example(dist_text, cur_o)), 'FCT_KOK_REVIEW_EXAMPLE', 'IGNORE')
-        print('⭕ [KOK] INSERT TO FCT_KOK_REVIEW_EXAMPLE')
+        # INSERT TO FCT KOK (스냅샷 ID는 ODS 세션 임시 테이블로 anti-join)
+        with utils.anti_join_filter(conn_o, "CAST(o.KOK_PRODUCT_ID AS INT)", dist_list) as cond:
+            insert_chunks(select_from_ods_kok_price_info(cond, cur_o), 'FCT_KOK_PRICE_INFO', method='load')
+            print('⭕ [KOK] INSERT TO FCT_KOK_PRICE_INFO')
+            insert_chunks(select_from_ods_kok_product_info(cond, cur_o), 'FCT_KOK_PRODUCT_INFO')
+            print('⭕ [KOK] INSERT TO FCT_KOK_PRODUCT_INFO')
+            insert_chunks(select_from_ods_kok_image_info(cond, cur_o), 'FCT_KOK_IMAGE_INFO')
+            print('⭕ [KOK] INSERT TO FCT_KOK_IMAGE_INFO')
+            insert_chunks(select_from_ods_kok_detail_info(cond, cur_o), 'FCT_KOK_DETAIL_INFO')
+            print('⭕ [KOK] INSERT TO FCT_KOK_DETAIL_INFO')
+            insert_chunks(select_from_ods_kok_review_example(cond, cur_o), 'FCT_KOK_REVIEW_EXAMPLE')
+            print('⭕ [KOK] INSERT TO FCT_KOK_REVIEW_EXAMPLE')
+
+        # 가격 변동으로 재수집된 상품(ODS 상세 재적재 완료) 중 FCT_KOK_RENEW_SYNC 기준 아직 반영하지 않은 것
+        cur_o.execute('''
+            SELECT CAST(d.KOK_PRODUCT_ID AS INT), d.RENEWED_AT
+            FROM ODS_KOK_PRICE_DELTA d
+            JOIN ODS_KOK_PRODUCT_INFO i ON i.KOK_PRODUCT_ID = d.KOK_PRODUCT_ID
+            WHERE d.RENEWED_AT IS NOT NULL;
+                      ''')
+        candidates = cur_o.fetchall()
+        cur_s.execute("SELECT KOK_PRODUCT_ID, SYNCED_AT FROM FCT_KOK_RENEW_SYNC;")
+        synced = dict(cur_s.fetchall())
+        pending = [(pid, renewed_at) for pid, renewed_at in candidates
+                   if synced.get(pid) is None or synced[pid] < renewed_at]
+        # 이번 실행에 새로 들어간 상품은 위에서 ODS 최신값으로 적재됐으므로 제외
+        dist_set = set(dist_list)
+        renewed = [pid for pid, _ in pending if pid in dist_set]
+        if renewed:
+            # 상품 정보는 바뀐 컬럼만 UPSERT, 하위 테이블(이미지/상세/리뷰)은 새로 수집된 행으로 교체
+            with utils.anti_join_filter(conn_o, "CAST(o.KOK_PRODUCT_ID AS INT)", renewed, anti=False) as cond, \
+                 utils.anti_join_filter(conn_s, "f.KOK_PRODUCT_ID", renewed, anti=False) as s_cond:
+                insert_chunks(select_from_ods_kok_product_info(cond, cur_o), 'FCT_KOK_PRODUCT_INFO', 'UPSERT')
+                for table_name in ('FCT_KOK_IMAGE_INFO', 'FCT_KOK_DETAIL_INFO', 'FCT_KOK_REVIEW_EXAMPLE'):
+                    cur_s.execute(f"DELETE f FROM {table_name} f WHERE {s_cond};")
+                insert_chunks(select_from_ods_kok_image_info(cond, cur_o), 'FCT_KOK_IMAGE_INFO')
+                insert_chunks(select_from_ods_kok_detail_info(cond, cur_o), 'FCT_KOK_DETAIL_INFO')
+                insert_chunks(select_from_ods_kok_review_example(cond, cur_o), 'FCT_KOK_REVIEW_EXAMPLE')
+            print(f'⭕ [KOK] UPSERT RENEWED PRODUCTS ({len(renewed)})')
+        if pending:
+            # 읽은 시점의 RENEWED_AT까지 반영 완료 표시 (그 사이 다시 재수집되면 다음 실행에서 반영)
+            cur_s.executemany('''
+                INSERT INTO FCT_KOK_RENEW_SYNC (KOK_PRODUCT_ID, SYNCED_AT) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE SYNCED_AT = VALUES(SYNCED_AT);
+                      ''', pending)
         
         # product_name 에서 store_name 삭제
         cur_s.execute('''
@@ -0,0 +1,72 @@
+"""
+data_counting watermark 모드 증분 COUNT / 재기준 테스트 (sqlite로 MariaDB 쿼리 대체)
+
+python -m pytest -q tests/test_data_counting.py
+"""
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+import ETL.utils.utils as utils
+
+TABLE = "ODS_KOK_PRICE_INFO"
+KEY = "ods." + TABLE
+
+class _Cursor:
+    # pymysql 스타일(%s) 파라미터를 sqlite(?)로 바꿔 실행
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+
+    def execute(self, sql, params=()):
+        self._cur.execute(sql.replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute(f"CREATE TABLE {TABLE} (KOK_PRICE_ID INTEGER PRIMARY KEY)")
+
+    @contextmanager
+    def fake_pooled_conn(target, db_name=None):
+        yield conn, _Cursor(conn)
+
+    monkeypatch.setattr(utils, "pooled_conn", fake_pooled_conn)
+    return conn
+
+def _insert(conn, ids):
+    conn.executemany(f"INSERT INTO {TABLE} VALUES (?)", [(i,) for i in ids])
+
+def _count(state):
+    return utils._count_tables("ods", [TABLE], "watermark", state)[TABLE]
+
+def test_watermark_counts_only_new_rows(db):
+    state = {}
+    _insert(db, range(1, 6))
+    assert _count(state) == 5
+    assert state[KEY]["wm"] == 5
+    _insert(db, range(6, 9))
+    assert _count(state) == 8
+    assert state[KEY]["wm"] == 8
+
+def test_emptied_table_rebases_immediately(db):
+    state = {}
+    _insert(db, range(1, 6))
+    assert _count(state) == 5
+    db.execute(f"DELETE FROM {TABLE}")
+    # MAX()가 NULL → 이전 누적값이 아니라 0
+    assert _count(state) == 0
+    assert state[KEY]["wm"] == 0
+
+def test_recreated_table_rebases(db):
+    state = {}
+    _insert(db, range(1, 11))
+    assert _count(state) == 10
+    db.execute(f"DELETE FROM {TABLE}")
+    _insert(db, range(1, 4))
+    assert _count(state) == 3
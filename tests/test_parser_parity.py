@@ -0,0 +1,56 @@
+"""
+html.parser / lxml 파서 결과 동일성 테스트 (HTML_PARSER 기본값 lxml 전환 검증)
+- tests/fixtures/parity/*.html : 실제 페이지 구조를 따른 녹화 HTML
+- 각 파싱 함수 결과 DataFrame이 두 파서에서 같아야 함
+- 파서만 검사하므로 playwright/Chromium 없이 실행됨 (크롤러 모듈의 playwright import는 선택)
+
+python -m pytest -q tests/test_parser_parity.py
+"""
+import os
+import pytest
+
+pytest.importorskip("lxml")
+
+import ETL.ingestion.crawl_utils as crawl_utils
+import ETL.ingestion.crawl_kok as cr_k
+import ETL.ingestion.crawl_homeshop as cr_hs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "parity")
+PARSERS = ("html.parser", "lxml")
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def _assert_parity(parse_fn, html, *args):
+    same, results = crawl_utils.check_parser_parity(parse_fn, html, *args, parsers=PARSERS)
+    assert same, {name: result for name, result in results.items()}
+    return results["lxml"]
+
+def test_crawl_basic_info_parity():
+    df = _assert_parity(cr_k.crawl_basic_info, _fixture("kok_detail.html"), "10293")
+    row = df.iloc[0]
+    assert row["KOK_STORE_NAME"] == "농협안심한우"
+    assert row["KOK_THUMBNAIL"] == "https://img.kok.example/thumb/og_10293.jpg"
+    assert row["KOK_EXCHANGE_ADDR"] == "경기도 이천시 물류로 3"
+
+def test_crawl_schedule_page_parity():
+    df = _assert_parity(cr_hs.crawl_schedule_page, _fixture("hns_schedule.html"))
+    assert len(df) == 4
+    assert df["PRODUCT_ID"].tolist() == ["2041234567", "2041234568", "2041234569", "2049999999"]
+    assert df.loc[2, "DC_PRICE"] == "상담 예약 상품"
+
+def test_parse_hmall_product_parity():
+    url = "https://www.hmall.com/md/pda/itemPtc?slitmCd=2238123456"
+    # (상품정보, 이미지, 상세정보) 세 프레임 모두 비교
+    results = _assert_parity(cr_hs.parse_hmall_product, _fixture("hyundai_detail.html"), url, 2)
+    df_product_info, df_img_url, df_detail_info = results
+    assert df_product_info.loc[0, "DELIVERY_CO"] == "CJ대한통운"
+    assert len(df_img_url) == 2
+    assert len(df_detail_info) == 2
+
+def test_ns_info_crawl_parity():
+    df = _assert_parity(cr_hs.ns_info_crawl, _fixture("ns_detail.html"), 4)
+    row = df.iloc[0]
+    assert row["PRODUCT_ID"] == "58123456"
+    assert (row["SALE_PRICE"], row["DC_PRICE"], row["DC_RATE"]) == (49900, 39900, 20)
@@ -0,0 +1,32 @@
+"""
+편성표 응답 → ODS_HOMESHOPPING_LIST 프레임 빌더 테스트
+
+python -m pytest -q tests/test_schedule_builders.py
+"""
+import ETL.ingestion.crawl_homeshop as cr_hs
+
+def _hyundai_item(**extra) -> dict:
+    item = {
+        "brodDt": "20250101",
+        "brodStrtDtm": "20250101090000",
+        "brodEndDtm": "20250101100000",
+        "prmoTxtCntn": "새해 특가",
+        "slitmCd": 2238123456,
+        "slitmNm": "한우 선물세트",
+        "sellPrc": 99000,
+        "bbprc": 79000,
+        "copnRate": 20,
+        "brodImgNm": "",
+    }
+    item.update(extra)
+    return item
+
+def test_hyundai_live_date_without_new_brod_dt():
+    # 응답 어디에도 newBrodDt가 없으면 brodDt 사용
+    df = cr_hs.build_hyundai_schedule_df([_hyundai_item()], 4)
+    assert df.loc[0, "LIVE_DATE"] == "20250101"
+
+def test_hyundai_live_date_prefers_new_brod_dt():
+    items = [_hyundai_item(newBrodDt="20250102"), _hyundai_item(newBrodDt=""), _hyundai_item()]
+    df = cr_hs.build_hyundai_schedule_df(items, 4)
+    assert df["LIVE_DATE"].tolist() == ["20250102", "20250101", "20250101"]